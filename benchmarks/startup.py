@@ -0,0 +1,220 @@
+"""Бенчмарк запуска: время до окна и до готовой главной страницы.
+
+Запускает ``main.py`` несколько раз в отдельных процессах с
+``QT_QPA_PLATFORM=offscreen``, заглушенными провайдерами (без сети и
+keyring) и синтетической библиотекой во временной папке. Каждый запуск
+собирает метки из ``utils.startup_metrics``:
+
+- imports_done — импорты ``main.py`` завершены;
+- qapplication_ready — создан ``QApplication``;
+- stylesheet_applied — применен ``apply_stylesheet``;
+- window_constructed — построен ``NeonMusic``;
+- first_paint — первая отрисовка окна;
+- home_populated — главная страница заполнена.
+
+Результат (min/median/max по меткам и сырые запуски) пишется в JSON.
+
+Пример::
+
+    python benchmarks/startup.py --runs 5 --tracks 2000 --output startup.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+_CHILD_TIMEOUT_SEC = 60
+
+
+# ═══════ синтетическая библиотека ═══════
+
+def build_library(root: Path, tracks: int, playlists: int, playlist_size: int, history: int) -> None:
+    """Создает рабочую папку приложения с синтетическими данными."""
+    for name in ("assets", "playlist_covers", "user_theme.xml"):
+        link = root / name
+        if not link.exists():
+            link.symlink_to(REPO_ROOT / name)
+
+    music_dir = root / "music"
+    music_dir.mkdir(exist_ok=True)
+    for i in range(tracks):
+        (music_dir / f"{100000 + i}_Track {i}_Artist {i % 97}.mp3").touch()
+
+    playlists_dir = root / "playlists"
+    playlists_dir.mkdir(exist_ok=True)
+    for p in range(playlists):
+        payload = {
+            "name": f"Playlist {p}",
+            "tracks": [
+                {"id": str(100000 + (p * playlist_size + i) % max(1, tracks)),
+                 "title": f"Track {i}", "author": f"Artist {i % 97}"}
+                for i in range(playlist_size)
+            ],
+        }
+        (playlists_dir / f"Playlist {p}.json").write_text(
+            json.dumps(payload, ensure_ascii=False), encoding="utf-8",
+        )
+
+    _build_history(root / "player_history.db", history)
+
+
+def _build_history(db_path: Path, rows: int) -> None:
+    sys.path.insert(0, str(REPO_ROOT))
+    from database import AsyncDatabase
+
+    async def init_schema() -> None:
+        db = AsyncDatabase(db_path.as_posix())
+        await db.ensure_initialized()
+        await db.close()
+
+    asyncio.run(init_schema())
+    now = int(time.time())
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            """
+            INSERT OR REPLACE INTO track_history (
+                track_key, title, author, source, position_ms, duration_ms,
+                listen_count, last_played_at
+            ) VALUES (?, ?, ?, 'yandex', 0, 180000, ?, ?);
+            """,
+            (
+                (f"yandex:{100000 + i}", f"Track {i}", f"Artist {i % 97}", i % 13, now - i * 60)
+                for i in range(rows)
+            ),
+        )
+
+
+# ═══════ дочерний процесс ═══════
+
+def run_child(workdir: Path, result_path: Path) -> None:
+    """Запускает приложение и выходит, как только главная заполнена."""
+    os.chdir(workdir)
+    sys.path.insert(0, str(REPO_ROOT))
+    sys.argv = [str(REPO_ROOT / "main.py")]
+
+    from utils import startup_metrics
+
+    from config.clients import GetClients
+
+    # Провайдеры заглушены: клиенты "готовы" сразу и отсутствуют.
+    GetClients._FACTORIES = {name: (lambda: None) for name in GetClients._FACTORIES}
+
+    def on_milestone(name: str, _elapsed_ms: float) -> None:
+        if name != startup_metrics.HOME_POPULATED:
+            return
+        result_path.write_text(json.dumps({
+            "origin_wall_time": startup_metrics.origin_wall_time(),
+            "milestones_ms": startup_metrics.milestones(),
+        }), encoding="utf-8")
+        from PySide6.QtCore import QTimer
+        from PySide6.QtWidgets import QApplication
+
+        QTimer.singleShot(0, QApplication.quit)
+
+    startup_metrics.add_listener(on_milestone)
+
+    import runpy
+
+    runpy.run_path(str(REPO_ROOT / "main.py"), run_name="__main__")
+
+
+# ═══════ родительский процесс ═══════
+
+def run_once(workdir: Path) -> dict:
+    with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+        result_path = Path(tmp.name)
+    env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+    try:
+        spawned_at = time.time()
+        subprocess.run(
+            [sys.executable, __file__, "--child", str(workdir), str(result_path)],
+            env=env,
+            check=True,
+            timeout=_CHILD_TIMEOUT_SEC,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        exited_at = time.time()
+        data = json.loads(result_path.read_text(encoding="utf-8") or "{}")
+    finally:
+        result_path.unlink(missing_ok=True)
+    if not data:
+        raise RuntimeError("Приложение завершилось, не дойдя до заполненной главной страницы")
+    # Смещение от запуска процесса до начала отсчета в main.py (старт интерпретатора).
+    interpreter_ms = (data["origin_wall_time"] - spawned_at) * 1000
+    milestones = {
+        name: round(interpreter_ms + value, 2) for name, value in data["milestones_ms"].items()
+    }
+    milestones["process_exit"] = round((exited_at - spawned_at) * 1000, 2)
+    return {"interpreter_startup_ms": round(interpreter_ms, 2), "milestones_ms": milestones}
+
+
+def summarize(runs: list[dict]) -> dict:
+    names = sorted({name for run in runs for name in run["milestones_ms"]},
+                   key=lambda n: statistics.median(
+                       run["milestones_ms"].get(n, 0.0) for run in runs))
+    summary = {}
+    for name in names:
+        values = [run["milestones_ms"][name] for run in runs if name in run["milestones_ms"]]
+        summary[name] = {
+            "min": min(values),
+            "median": round(statistics.median(values), 2),
+            "max": max(values),
+        }
+    return summary
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--tracks", type=int, default=2000, help="файлов в music/")
+    parser.add_argument("--playlists", type=int, default=20)
+    parser.add_argument("--playlist-size", type=int, default=200)
+    parser.add_argument("--history", type=int, default=5000, help="записей в track_history")
+    parser.add_argument("--output", default="startup_benchmark.json")
+    parser.add_argument("--child", nargs=2, metavar=("WORKDIR", "RESULT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(Path(args.child[0]), Path(args.child[1]))
+        return 0
+
+    with tempfile.TemporaryDirectory(prefix="cleanplayer-bench-") as tmp:
+        workdir = Path(tmp)
+        build_library(workdir, args.tracks, args.playlists, args.playlist_size, args.history)
+        # Первый запуск прогревает кэши ОС и байткод, в статистику не входит.
+        run_once(workdir)
+        runs = [run_once(workdir) for _ in range(max(1, args.runs))]
+
+    result = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "library": {
+            "tracks": args.tracks,
+            "playlists": args.playlists,
+            "playlist_size": args.playlist_size,
+            "history": args.history,
+        },
+        "summary_ms": summarize(runs),
+        "runs": runs,
+    }
+    Path(args.output).write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    for name, stats in result["summary_ms"].items():
+        print(f"{name:>20}: {stats['median']:8.1f} мс (min {stats['min']:.1f}, max {stats['max']:.1f})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
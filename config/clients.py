@@ -6,84 +6,177 @@
 - SoundCloud (TODO)
 - Vk Music (TODO)
 
+Клиенты создаются лениво и в фоне: конструкторы ходят в keyring и в сеть
+(YTMusic запрашивает visitor data), поэтому на старте приложения их
+нельзя строить синхронно. Для каждого провайдера хранится future
+готовности — зависящие от него функции просто ждут ее.
+
+Библиотеки провайдеров (``yandex_music``, ``ytmusicapi``, ``pylast``,
+``keyring``) импортируются внутри фабрик, то есть тоже в фоне.
 """
 
-from typing import List, Union
+from __future__ import annotations
 
-from yandex_music import ClientAsync
-from yandex_music.exceptions import TimedOutError, NetworkError as NetworkErrorYandex
-from pylast import WSError, NetworkError as NetworkErrorLastFm
-from pylast import LastFMNetwork
-from ytmusicapi import YTMusic
-from keyring import get_password
+import asyncio
+import logging
+import os
+import sys
+from typing import TYPE_CHECKING, Callable
 
 from config.constants import SERVICE_NAME_YANDEX, SERVICE_NAME_LASTFM_API, SERVICE_NAME_LASTFM_SECRET, USER
 
+if TYPE_CHECKING:
+    from pylast import LastFMNetwork
+    from yandex_music import ClientAsync
+    from ytmusicapi import YTMusic
+
+logger = logging.getLogger(__name__)
 
 
 class InitClients:
-    """Класс, инициализирующий клиенты:
-    _yandex_client - Асинхронная версия яндекс музыки
-    _ytmusic_client - синхронный клиент ютуб музыки
-    _lastfm_client - синхронный клиент LastFm
+    """Фабрики клиентов:
+    create_yandex_client - Асинхронная версия яндекс музыки
+    create_ytmusic_client - синхронный клиент ютуб музыки
+    create_lastfm_client - синхронный клиент LastFm
+
+    Методы блокирующие (keyring, сеть) и вызываются в пуле потоков.
+    Если клиент создать нельзя, возвращается ``None``.
     """
 
-    def __init__(self) -> None:
-        """Инициализация клиентов
-        """
-        self._init_yandex_client()
-        self._init_ytmusic_client()
-        self._init_lastfm_client()
-        
-    def _init_yandex_client(self) -> None:
+    @staticmethod
+    def create_yandex_client() -> ClientAsync | None:
+        from keyring import get_password
+        from yandex_music import ClientAsync
+        from yandex_music.exceptions import TimedOutError, NetworkError as NetworkErrorYandex
+
         try:
-            self._yandex_client = ClientAsync(get_password(SERVICE_NAME_YANDEX, USER))
+            return ClientAsync(get_password(SERVICE_NAME_YANDEX, USER))
         except TimedOutError:
-            self._yandex_client = None
+            return None
         except NetworkErrorYandex:
-            self._yandex_client = None
-    
-    def _init_lastfm_client(self) -> None:
+            return None
+
+    @staticmethod
+    def create_lastfm_client() -> LastFMNetwork | None:
+        from keyring import get_password
+        from pylast import LastFMNetwork, WSError, NetworkError as NetworkErrorLastFm
+
         LASTFM_API_KEY = get_password(SERVICE_NAME_LASTFM_API, USER)
         LASTFM_API_SECRET = get_password(SERVICE_NAME_LASTFM_SECRET, USER)
         if LASTFM_API_KEY is None or LASTFM_API_SECRET is None:
-            raise Exception("LastFm API key or secret is not set")
+            logger.info("Ключи Last.fm не заданы, клиент не создан")
+            return None
         try:
-            self._lastfm_client = LastFMNetwork(LASTFM_API_KEY, LASTFM_API_SECRET)
+            return LastFMNetwork(LASTFM_API_KEY, LASTFM_API_SECRET)
         except WSError:
-            pass
+            return None
         except NetworkErrorLastFm:
-            pass
-        else:
-            pass
-    
-    def _init_ytmusic_client(self) -> None:
+            return None
+
+    @staticmethod
+    def create_ytmusic_client() -> YTMusic | None:
+        _prepare_frozen_ytmusicapi()
+        from ytmusicapi import YTMusic
+
         # language=en, location="" — регион по серверу (по IP), иначе в РФ по "кино" и др. пусто
-        self._ytmusic_client = YTMusic(language="ru", location="")
+        try:
+            return YTMusic(language="ru", location="")
+        except Exception:
+            logger.exception("Не удалось инициализировать клиент YouTube Music")
+            return None
+
+
+def _prepare_frozen_ytmusicapi() -> None:
+    """Подготавливает ytmusicapi к работе внутри exe (PyInstaller).
+
+    Вызывается перед первым созданием YTMusic, а не при старте приложения,
+    чтобы импорт ytmusicapi не попадал на критический путь запуска.
+    """
+    if not getattr(sys, "frozen", False):
+        return
+    meipass = getattr(sys, "_MEIPASS", os.path.dirname(sys.executable))
+    # Чтобы ytmusicapi нашёл locales (в т.ч. ru), подменяем __file__ модуля ytmusic
+    try:
+        import ytmusicapi.ytmusic as ytm_mod
+        ytm_mod.__file__ = os.path.join(meipass, "ytmusicapi", "ytmusic.py")
+    except Exception:
+        pass
+    # Запрос за X-Goog-Visitor-Id к music.youtube.com часто получает пустую страницу при старом UA.
+    # Подменяем User-Agent на актуальный Chrome, чтобы сервер отдал страницу с ytcfg (VISITOR_DATA).
+    try:
+        import ytmusicapi.helpers as ytm_helpers
+        orig_init_headers = ytm_helpers.initialize_headers
+        chrome_ua = (
+            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
+            "Chrome/131.0.0.0 Safari/537.36"
+        )
+        def patched_init_headers():
+            h = orig_init_headers()
+            h["user-agent"] = chrome_ua
+            return h
+        ytm_helpers.initialize_headers = patched_init_headers
+    except Exception:
+        pass
 
-    def return_clients(self) -> List[Union[ClientAsync | None, YTMusic, LastFMNetwork]]:
-        return [self._yandex_client, self._ytmusic_client, self._lastfm_client]
-        
 
 class GetClients:
-    
+    """Синглтон с futures готовности клиентов.
+
+    Клиент провайдера создается при первом обращении к нему или заранее
+    через :meth:`warm_up`. Повторные обращения ждут тот же future.
+    """
+
+    YANDEX = "yandex"
+    YOUTUBE = "youtube"
+    LASTFM = "lastfm"
+
+    _FACTORIES: dict[str, Callable[[], object]] = {
+        YANDEX: InitClients.create_yandex_client,
+        YOUTUBE: InitClients.create_ytmusic_client,
+        LASTFM: InitClients.create_lastfm_client,
+    }
+
     def __new__(cls):
         if not hasattr(cls, "instance"):
             cls.instance = super().__new__(cls)
         return cls.instance
-    
+
     def __init__(self) -> None:
-        self.__yandex : ClientAsync
-        self.__youtube: YTMusic
-        self.__lastfm: LastFMNetwork
-        for name, client in zip(["__yandex", "__youtube", "__lastfm"], InitClients().return_clients()):
-            setattr(self, "_GetClients" + name, client)
-    
-    def get_yandex_client(self) -> ClientAsync | None:
-        return self.__yandex
-    
-    def get_youtube_client(self) -> YTMusic:
-        return self.__youtube
-    
-    def get_lastfm_client(self) -> LastFMNetwork:
-        return self.__lastfm
\ No newline at end of file
+        if getattr(self, "_initialized", False):
+            return
+        self._futures: dict[str, asyncio.Future] = {}
+        self._initialized = True
+
+    def warm_up(self) -> None:
+        """Запускает фоновое создание всех клиентов, не дожидаясь результата."""
+        for provider in self._FACTORIES:
+            self.ready(provider)
+
+    def ready(self, provider: str) -> asyncio.Future:
+        """Возвращает future готовности клиента, запуская его создание при необходимости."""
+        future = self._futures.get(provider)
+        if future is None:
+            loop = asyncio.get_event_loop()
+            future = loop.run_in_executor(None, self._create_safely, provider)
+            self._futures[provider] = future
+        return future
+
+    async def get_yandex_client(self) -> ClientAsync | None:
+        return await self._wait(self.YANDEX)
+
+    async def get_youtube_client(self) -> YTMusic | None:
+        return await self._wait(self.YOUTUBE)
+
+    async def get_lastfm_client(self) -> LastFMNetwork | None:
+        return await self._wait(self.LASTFM)
+
+    async def _wait(self, provider: str):
+        # shield: отмена одного ожидающего не должна отменять общий future.
+        return await asyncio.shield(self.ready(provider))
+
+    def _create_safely(self, provider: str):
+        try:
+            return self._FACTORIES[provider]()
+        except Exception:
+            logger.exception("Не удалось инициализировать клиент %s", provider)
+            return None
@@ -1,10 +1,37 @@
 """Пакет работы с базой данных."""
 
 from database.async_database import AsyncDatabase
-from database.track_history_repository import TrackHistoryEntry, TrackHistoryRepository
+from database.library_repository import LibraryFile, LibraryRepository
+from database.local_track_repository import LocalTrackRepository, LocalTrackRow
+from database.play_event_repository import PlayEvent, PlayEventRepository, PlayStats
+from database.playlist_repository import PlaylistRecord, PlaylistRepository, PlaylistTrackRow
+from database.track_history_repository import (
+    HistoryCursor,
+    TrackHistoryEntry,
+    TrackHistoryRepository,
+    TrackProgressUpdate,
+)
+from database.track_metadata_repository import TrackMetadata, TrackMetadataRepository
+from database.track_search_repository import TrackSearchHit, TrackSearchRepository
 
 __all__ = [
     "AsyncDatabase",
+    "HistoryCursor",
+    "LibraryFile",
+    "LibraryRepository",
+    "LocalTrackRepository",
+    "LocalTrackRow",
+    "PlayEvent",
+    "PlayEventRepository",
+    "PlayStats",
+    "PlaylistRecord",
+    "PlaylistRepository",
+    "PlaylistTrackRow",
     "TrackHistoryEntry",
     "TrackHistoryRepository",
+    "TrackMetadata",
+    "TrackMetadataRepository",
+    "TrackProgressUpdate",
+    "TrackSearchHit",
+    "TrackSearchRepository",
 ]
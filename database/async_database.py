@@ -2,30 +2,342 @@
 
 Модуль реализует низкоуровневый доступ к базе данных без бизнес-логики.
 Для асинхронной работы используется ``aiosqlite``.
+
+Строки возвращаются кортежами в порядке колонок ``SELECT``. Чтобы сразу
+получить объекты, в ``fetchone``/``fetchall``/``iterate`` передается
+``factory`` — он вызывается как ``factory(*row)``. Выборка по длинному
+списку ключей (``IN (...)``) делается через ``fetchall_in``.
+
+Соединения: одно на запись и небольшой пул read-only соединений для
+чтения. В режиме WAL читатели не ждут писателя, поэтому выборки для UI
+не встают в очередь за транзакциями записи.
 """
 
 from __future__ import annotations
 
 import asyncio
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, AsyncIterator, Callable, Iterable, Sequence, TypeVar
 
 import aiosqlite
 
+T = TypeVar("T")
+
+# Размер кэша подготовленных выражений sqlite3 (по умолчанию 128).
+_CACHED_STATEMENTS = 256
+# Сколько строк забирать из курсора за раз при потоковом чтении.
+_ITERATE_BATCH_SIZE = 256
+# Сколько ключей подставлять в один ``IN (...)``: ограничение SQLite
+# на число параметров в запросе — с запасом.
+_IN_CHUNK = 500
+# Число read-only соединений по умолчанию.
+_DEFAULT_READERS = 2
+
+# Журнал прослушиваний (append-only) и агрегаты по нему.
+# Агрегаты обновляются в той же транзакции, что и вставка событий,
+# поэтому аналитика читает только их и не сканирует журнал.
+_PLAY_EVENTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS play_events (
+    id INTEGER PRIMARY KEY,
+    track_key TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    source TEXT NOT NULL,
+    started_at INTEGER NOT NULL,
+    ended_at INTEGER NOT NULL,
+    position_ms INTEGER NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    listened_ms INTEGER NOT NULL,
+    skipped INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_play_events_started ON play_events(started_at);
+CREATE INDEX IF NOT EXISTS idx_play_events_track ON play_events(track_key, started_at);
+
+CREATE TABLE IF NOT EXISTS daily_totals (
+    day TEXT PRIMARY KEY,
+    plays INTEGER NOT NULL,
+    skips INTEGER NOT NULL,
+    listened_ms INTEGER NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_track_stats (
+    day TEXT NOT NULL,
+    track_key TEXT NOT NULL,
+    plays INTEGER NOT NULL,
+    skips INTEGER NOT NULL,
+    listened_ms INTEGER NOT NULL,
+    PRIMARY KEY (day, track_key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_artist_stats (
+    day TEXT NOT NULL,
+    artist TEXT NOT NULL,
+    plays INTEGER NOT NULL,
+    skips INTEGER NOT NULL,
+    listened_ms INTEGER NOT NULL,
+    PRIMARY KEY (day, artist)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS track_totals (
+    track_key TEXT PRIMARY KEY,
+    plays INTEGER NOT NULL,
+    skips INTEGER NOT NULL,
+    listened_ms INTEGER NOT NULL,
+    last_played_at INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_track_totals_listened ON track_totals(listened_ms DESC);
+
+CREATE TABLE IF NOT EXISTS artist_totals (
+    artist TEXT PRIMARY KEY,
+    plays INTEGER NOT NULL,
+    skips INTEGER NOT NULL,
+    listened_ms INTEGER NOT NULL,
+    last_played_at INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_artist_totals_listened ON artist_totals(listened_ms DESC);
+"""
+
+# Пользовательские плейлисты. JSON-файлы — только импорт/экспорт;
+# ``playlist_imports`` помнит, какие файлы уже импортированы и в каком виде.
+_PLAYLISTS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS playlists (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    created_at INTEGER NOT NULL,
+    opened_at INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_playlists_opened ON playlists(opened_at DESC);
+
+CREATE TABLE IF NOT EXISTS playlist_tracks (
+    playlist_id INTEGER NOT NULL REFERENCES playlists(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    track_key TEXT NOT NULL,
+    track_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    added_at INTEGER NOT NULL,
+    PRIMARY KEY (playlist_id, position),
+    UNIQUE (playlist_id, track_key)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS playlist_imports (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Индекс скачанных файлов: ``track_key`` -> файл. ``library_dirs`` хранит
+# mtime папок на момент последнего обхода — без изменений папка не читается.
+_LIBRARY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS library_files (
+    track_key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    format TEXT NOT NULL,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS library_dirs (
+    path TEXT PRIMARY KEY,
+    mtime_ns INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Треки из папок пользователя. ``dir`` — папка файла: при повторном обходе
+# перечитываются только папки, у которых изменился mtime (см. ``library_dirs``).
+_LOCAL_TRACKS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS local_tracks (
+    track_id TEXT PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    dir TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    album TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_local_tracks_dir ON local_tracks(dir);
+"""
+
+
+# Сведения о треках от провайдеров и плеера: длительность, URL обложки,
+# альбом. ``fetched_at`` — время последнего ответа провайдера (0 — строку
+# заполнил только плеер); по нему сервис решает, пора ли спросить заново.
+_TRACK_METADATA_SCHEMA = """
+CREATE TABLE IF NOT EXISTS track_metadata (
+    track_key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL,
+    album TEXT NOT NULL,
+    duration_ms INTEGER NOT NULL,
+    cover_url TEXT NOT NULL,
+    fetched_at INTEGER NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Длительности, которые уже знает история, — при создании таблицы.
+_TRACK_METADATA_BACKFILL = """
+INSERT INTO track_metadata (track_key, title, author, album, duration_ms, cover_url, fetched_at)
+SELECT track_key, '', '', '', duration_ms, '', 0 FROM track_history WHERE duration_ms > 0
+ON CONFLICT(track_key) DO NOTHING;
+"""
+
+# Полнотекстовый поиск по своей библиотеке: трек попадает в ``search_tracks``
+# из истории, плейлистов, скачанных файлов и локальных папок, а FTS5-таблица
+# ``search_fts`` индексирует его название и исполнителя. Обе таблицы ведут
+# триггеры — сервисам ничего не нужно обновлять вручную. Трек убирается из
+# поиска, когда его ключа не осталось ни в одном из источников.
+# ``search_log`` — прошлые запросы строки поиска (ключ — запрос в casefold)
+# для подсказок.
+_SEARCH_SOURCES = (
+    # (таблица, выражение ключа, условие поиска строки по ключу)
+    ("track_history", "{row}.track_key", "track_key = {key}"),
+    ("playlist_tracks", "{row}.track_key", "track_key = {key}"),
+    ("library_files", "{row}.track_key", "track_key = {key}"),
+    ("local_tracks", "'local:' || {row}.track_id", "track_id = substr({key}, 7)"),
+)
+
+
+def _search_schema() -> str:
+    still_used = " AND ".join(
+        f"NOT EXISTS (SELECT 1 FROM {table} WHERE {lookup.format(key='old_key')})"
+        for table, _, lookup in _SEARCH_SOURCES
+    )
+    parts = [
+        """
+CREATE INDEX IF NOT EXISTS idx_playlist_tracks_key ON playlist_tracks(track_key);
+
+CREATE TABLE IF NOT EXISTS search_tracks (
+    id INTEGER PRIMARY KEY,
+    track_key TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    author TEXT NOT NULL
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS search_fts USING fts5(
+    title, author,
+    content='search_tracks', content_rowid='id',
+    tokenize="unicode61 remove_diacritics 2",
+    prefix='2 3'
+);
+
+CREATE TABLE IF NOT EXISTS search_log (
+    query_key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    searches INTEGER NOT NULL,
+    last_searched_at INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_search_log_last ON search_log(last_searched_at DESC);
+
+CREATE TRIGGER IF NOT EXISTS search_tracks_ai AFTER INSERT ON search_tracks BEGIN
+    INSERT INTO search_fts (rowid, title, author) VALUES (new.id, new.title, new.author);
+END;
+CREATE TRIGGER IF NOT EXISTS search_tracks_ad AFTER DELETE ON search_tracks BEGIN
+    INSERT INTO search_fts (search_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+END;
+CREATE TRIGGER IF NOT EXISTS search_tracks_au AFTER UPDATE ON search_tracks BEGIN
+    INSERT INTO search_fts (search_fts, rowid, title, author) VALUES ('delete', old.id, old.title, old.author);
+    INSERT INTO search_fts (rowid, title, author) VALUES (new.id, new.title, new.author);
+END;
+"""
+    ]
+    for table, key, lookup in _SEARCH_SOURCES:
+        # Имена из скачанных файлов — разобранные имена файлов; они не
+        # перетирают названия из истории и плейлистов.
+        on_conflict = (
+            "DO NOTHING"
+            if table == "library_files"
+            else "DO UPDATE SET title = excluded.title, author = excluded.author"
+        )
+        upsert = f"""
+    INSERT INTO search_tracks (track_key, title, author)
+    VALUES ({key.format(row='new')}, new.title, new.author)
+    ON CONFLICT(track_key) {on_conflict};"""
+        forget = f"""
+    DELETE FROM search_tracks WHERE track_key = {key.format(row='old')}
+        AND {still_used.replace('old_key', key.format(row='old'))};"""
+        parts.append(
+            f"""
+CREATE TRIGGER IF NOT EXISTS {table}_search_ai AFTER INSERT ON {table} BEGIN{upsert}
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_search_au AFTER UPDATE OF title, author ON {table}
+WHEN old.title IS NOT new.title OR old.author IS NOT new.author BEGIN{upsert}
+END;
+CREATE TRIGGER IF NOT EXISTS {table}_search_ad AFTER DELETE ON {table} BEGIN{forget}
+END;
+"""
+        )
+    return "".join(parts)
+
+
+_SEARCH_SCHEMA = _search_schema()
+
+# Первичное заполнение поиска для БД, созданной до появления индекса.
+_SEARCH_BACKFILL = [
+    f"""
+    INSERT INTO search_tracks (track_key, title, author)
+    SELECT {key.format(row=table)}, title, author FROM {table} WHERE true
+    ON CONFLICT(track_key) DO NOTHING;
+    """
+    for table, key, _ in _SEARCH_SOURCES
+]
+
+
+class Transaction:
+    """Открытая транзакция записи, см. :meth:`AsyncDatabase.transaction`."""
+
+    def __init__(self, conn: aiosqlite.Connection) -> None:
+        self._conn = conn
+
+    async def execute(self, query: str, params: Sequence[Any] = ()) -> int:
+        """Выполняет запрос и возвращает число затронутых строк."""
+        async with self._conn.execute(query, params) as cursor:
+            return cursor.rowcount
+
+    async def executemany(self, query: str, params_seq: Iterable[Sequence[Any]]) -> None:
+        await self._conn.executemany(query, params_seq)
+
+    async def fetchone(self, query: str, params: Sequence[Any] = ()) -> tuple | None:
+        """Читает внутри транзакции (видит ее незафиксированные изменения)."""
+        async with self._conn.execute(query, params) as cursor:
+            return await cursor.fetchone()
+
 
 class AsyncDatabase:
     """Низкоуровневый асинхронный клиент SQLite.
 
     Ответственность класса:
-    - лениво открыть соединение;
+    - лениво открыть соединения (писатель + читатели);
     - создать схему БД;
-    - выполнять SQL-запросы асинхронно.
+    - выполнять SQL-запросы асинхронно;
+    - группировать запись в транзакции.
     """
 
-    def __init__(self, db_path: str = "player_history.db") -> None:
+    _shared: dict[Path, AsyncDatabase] = {}
+
+    @classmethod
+    def shared(cls, db_path: str = "player_history.db") -> AsyncDatabase:
+        """Общий клиент для файла БД: все сервисы приложения пишут через одного писателя."""
+        key = Path(db_path)
+        db = cls._shared.get(key)
+        if db is None:
+            db = cls._shared[key] = cls(db_path)
+        return db
+
+    def __init__(self, db_path: str = "player_history.db", readers: int = _DEFAULT_READERS) -> None:
         self._db_path = Path(db_path)
         self._conn: aiosqlite.Connection | None = None
+        self._reader_count = max(1, readers)
+        self._readers: list[aiosqlite.Connection] = []
+        self._idle_readers: asyncio.Queue[aiosqlite.Connection] = asyncio.Queue()
         self._init_lock = asyncio.Lock()
+        # Одна транзакция записи за раз: иначе запросы из разных задач
+        # перемешаются в общей транзакции соединения.
+        self._write_lock = asyncio.Lock()
         self._initialized = False
 
     async def ensure_initialized(self) -> None:
@@ -37,33 +349,152 @@ class AsyncDatabase:
                 return
             await self._connect_sync()
             await self._init_schema_sync()
+            await self._connect_readers()
             self._initialized = True
 
-    async def execute(self, query: str, params: Iterable[Any] = ()) -> None:
-        """Выполняет SQL-запрос без возвращаемого результата."""
-        await self.ensure_initialized()
-        await self._execute_sync(query, tuple(params))
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[Transaction]:
+        """Открывает транзакцию записи: commit при выходе, rollback при ошибке.
+
+        Пример::
 
-    async def fetchone(self, query: str, params: Iterable[Any] = ()) -> dict[str, Any] | None:
-        """Возвращает одну запись в виде словаря или ``None``."""
-        await self.ensure_initialized()
-        return await self._fetchone_sync(query, tuple(params))
+            async with db.transaction() as tx:
+                await tx.executemany("INSERT ...", rows)
+                await tx.execute("UPDATE ...", params)
+        """
+        if not self._initialized:
+            await self.ensure_initialized()
+        async with self._write_lock:
+            assert self._conn is not None
+            await self._conn.execute("BEGIN IMMEDIATE;")
+            try:
+                yield Transaction(self._conn)
+            except BaseException:
+                await self._conn.rollback()
+                raise
+            await self._conn.commit()
 
-    async def fetchall(self, query: str, params: Iterable[Any] = ()) -> list[dict[str, Any]]:
-        """Возвращает список записей в виде словарей."""
-        await self.ensure_initialized()
-        return await self._fetchall_sync(query, tuple(params))
+    async def execute(self, query: str, params: Sequence[Any] = ()) -> int:
+        """Выполняет SQL-запрос отдельной транзакцией, возвращает число затронутых строк."""
+        async with self.transaction() as tx:
+            return await tx.execute(query, params)
+
+    async def executemany(self, query: str, params_seq: Iterable[Sequence[Any]]) -> None:
+        """Выполняет SQL-запрос для каждого набора параметров в одной транзакции."""
+        async with self.transaction() as tx:
+            await tx.executemany(query, params_seq)
+
+    async def fetchone(
+        self,
+        query: str,
+        params: Sequence[Any] = (),
+        factory: Callable[..., T] | None = None,
+    ) -> tuple | T | None:
+        """Возвращает одну запись (кортеж или ``factory(*row)``) или ``None``."""
+        if not self._initialized:
+            await self.ensure_initialized()
+        async with self._reader() as conn:
+            return await self._fetchone_sync(conn, query, params, factory)
+
+    async def fetchall(
+        self,
+        query: str,
+        params: Sequence[Any] = (),
+        factory: Callable[..., T] | None = None,
+    ) -> list[tuple] | list[T]:
+        """Возвращает список записей (кортежи или ``factory(*row)``)."""
+        if not self._initialized:
+            await self.ensure_initialized()
+        async with self._reader() as conn:
+            return await self._fetchall_sync(conn, query, params, factory)
+
+    async def fetchall_in(
+        self,
+        query: str,
+        keys: Iterable[Any],
+        params: Sequence[Any] = (),
+        factory: Callable[..., T] | None = None,
+    ) -> list[tuple] | list[T]:
+        """Выборка по списку ключей любой длины.
+
+        ``{keys}`` в запросе заменяется плейсхолдерами части ключей; запрос
+        выполняется по частям, параметры — ключи части, затем ``params``.
+        """
+        keys = list(keys)
+        result: list = []
+        for start in range(0, len(keys), _IN_CHUNK):
+            chunk = keys[start:start + _IN_CHUNK]
+            result.extend(
+                await self.fetchall(
+                    query.replace("{keys}", ", ".join("?" * len(chunk))),
+                    (*chunk, *params),
+                    factory,
+                )
+            )
+        return result
+
+    async def iterate(
+        self,
+        query: str,
+        params: Sequence[Any] = (),
+        factory: Callable[..., T] | None = None,
+        batch_size: int = _ITERATE_BATCH_SIZE,
+    ) -> AsyncIterator[tuple] | AsyncIterator[T]:
+        """Потоково отдает записи, не загружая всю выборку в память.
+
+        Читатель занят до конца итерации, поэтому цикл лучше не прерывать
+        надолго (и закрывать итератор, если он брошен на середине).
+        """
+        if not self._initialized:
+            await self.ensure_initialized()
+        async with self._reader() as conn:
+            async with conn.execute(query, params) as cursor:
+                while True:
+                    rows = await cursor.fetchmany(batch_size)
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield factory(*row) if factory is not None else row
 
     async def close(self) -> None:
-        """Закрывает соединение."""
+        """Закрывает все соединения."""
+        readers, self._readers = self._readers, []
+        self._idle_readers = asyncio.Queue()
+        for reader in readers:
+            await reader.close()
         if self._conn is not None:
             await self._conn.close()
             self._conn = None
+        self._initialized = False
+
+    @asynccontextmanager
+    async def _reader(self) -> AsyncIterator[aiosqlite.Connection]:
+        """Берет свободное read-only соединение из пула."""
+        idle = self._idle_readers
+        conn = await idle.get()
+        try:
+            yield conn
+        finally:
+            # После close() соединение в новый пул не возвращается.
+            if idle is self._idle_readers:
+                idle.put_nowait(conn)
+
+    async def _connect_readers(self) -> None:
+        # URI с mode=ro: читатель физически не может писать в БД.
+        uri = f"{self._db_path.resolve().as_uri()}?mode=ro"
+        for _ in range(self._reader_count):
+            conn = await aiosqlite.connect(uri, uri=True, cached_statements=_CACHED_STATEMENTS)
+            await conn.execute("PRAGMA query_only=ON;")
+            await conn.execute("PRAGMA temp_store=MEMORY;")
+            self._readers.append(conn)
+            self._idle_readers.put_nowait(conn)
 
     async def _connect_sync(self) -> None:
         self._db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._conn = await aiosqlite.connect(self._db_path.as_posix())
-        self._conn.row_factory = aiosqlite.Row
+        self._conn = await aiosqlite.connect(
+            self._db_path.as_posix(),
+            cached_statements=_CACHED_STATEMENTS,
+        )
 
         # Настройки для быстрого и безопасного режима SQLite.
         await self._conn.execute("PRAGMA journal_mode=WAL;")
@@ -95,21 +526,50 @@ class AsyncDatabase:
             ON track_history(last_played_at DESC);
             """
         )
+        await self._conn.executescript(_PLAY_EVENTS_SCHEMA)
+        await self._conn.executescript(_PLAYLISTS_SCHEMA)
+        await self._conn.executescript(_LIBRARY_SCHEMA)
+        await self._conn.executescript(_LOCAL_TRACKS_SCHEMA)
+        metadata_exists = await self._table_exists("track_metadata")
+        await self._conn.executescript(_TRACK_METADATA_SCHEMA)
+        if not metadata_exists:
+            await self._conn.execute(_TRACK_METADATA_BACKFILL)
+        search_exists = await self._table_exists("search_tracks")
+        await self._conn.executescript(_SEARCH_SCHEMA)
+        if not search_exists:
+            for query in _SEARCH_BACKFILL:
+                await self._conn.execute(query)
         await self._conn.commit()
 
-    async def _execute_sync(self, query: str, params: tuple[Any, ...]) -> None:
+    async def _table_exists(self, name: str) -> bool:
         assert self._conn is not None
-        await self._conn.execute(query, params)
-        await self._conn.commit()
+        async with self._conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?;", (name,)
+        ) as cursor:
+            return await cursor.fetchone() is not None
 
-    async def _fetchone_sync(self, query: str, params: tuple[Any, ...]) -> dict[str, Any] | None:
-        assert self._conn is not None
-        async with self._conn.execute(query, params) as cursor:
+    @staticmethod
+    async def _fetchone_sync(
+        conn: aiosqlite.Connection,
+        query: str,
+        params: Sequence[Any],
+        factory: Callable[..., T] | None,
+    ) -> tuple | T | None:
+        async with conn.execute(query, params) as cursor:
             row = await cursor.fetchone()
-        return dict(row) if row is not None else None
+        if row is None or factory is None:
+            return row
+        return factory(*row)
 
-    async def _fetchall_sync(self, query: str, params: tuple[Any, ...]) -> list[dict[str, Any]]:
-        assert self._conn is not None
-        async with self._conn.execute(query, params) as cursor:
+    @staticmethod
+    async def _fetchall_sync(
+        conn: aiosqlite.Connection,
+        query: str,
+        params: Sequence[Any],
+        factory: Callable[..., T] | None,
+    ) -> list[tuple] | list[T]:
+        async with conn.execute(query, params) as cursor:
             rows = await cursor.fetchall()
-        return [dict(row) for row in rows]
+        if factory is None:
+            return rows
+        return [factory(*row) for row in rows]
@@ -0,0 +1,96 @@
+"""Репозиторий индекса скачанных треков.
+
+``library_files`` — по строке на скачанный трек (``track_key`` -> файл
+и метаданные), ``library_dirs`` — mtime папок на момент последнего
+обхода. Содержит только SQL-операции.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from database.async_database import AsyncDatabase
+
+
+@dataclass(slots=True)
+class LibraryFile:
+    """Скачанный файл трека."""
+
+    track_key: str
+    path: str
+    size: int
+    mtime_ns: int
+    format: str
+    title: str
+    author: str
+
+
+class LibraryRepository:
+    """Репозиторий для чтения и обновления индекса скачанных треков."""
+
+    def __init__(self, db: AsyncDatabase) -> None:
+        self._db = db
+
+    async def get_files(self) -> list[LibraryFile]:
+        """Все файлы индекса."""
+        return await self._db.fetchall(
+            """
+            SELECT track_key, path, size, mtime_ns, format, title, author
+            FROM library_files;
+            """,
+            factory=LibraryFile,
+        )
+
+    async def get_dir_mtime(self, path: str) -> int | None:
+        """mtime папки при последнем обходе или ``None``, если обхода не было."""
+        row = await self._db.fetchone("SELECT mtime_ns FROM library_dirs WHERE path = ?;", (path,))
+        return None if row is None else int(row[0])
+
+    async def upsert_file(self, file: LibraryFile) -> None:
+        """Добавляет или обновляет файл трека."""
+        await self._db.execute(_UPSERT_FILE, _file_params(file))
+
+    async def delete_file(self, track_key: str) -> None:
+        """Убирает трек из индекса."""
+        await self._db.execute("DELETE FROM library_files WHERE track_key = ?;", (track_key,))
+
+    async def apply_scan(
+        self,
+        dir_path: str,
+        dir_mtime_ns: int,
+        upserts: Iterable[LibraryFile],
+        removed_keys: Iterable[str],
+    ) -> None:
+        """Записывает результат обхода папки одной транзакцией."""
+        async with self._db.transaction() as tx:
+            await tx.executemany(
+                "DELETE FROM library_files WHERE track_key = ?;",
+                [(track_key,) for track_key in removed_keys],
+            )
+            await tx.executemany(_UPSERT_FILE, [_file_params(file) for file in upserts])
+            await tx.execute(
+                """
+                INSERT INTO library_dirs (path, mtime_ns)
+                VALUES (?, ?)
+                ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns;
+                """,
+                (dir_path, dir_mtime_ns),
+            )
+
+
+_UPSERT_FILE = """
+INSERT INTO library_files (track_key, path, size, mtime_ns, format, title, author)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(track_key) DO UPDATE SET
+    path = excluded.path,
+    size = excluded.size,
+    mtime_ns = excluded.mtime_ns,
+    format = excluded.format,
+    title = excluded.title,
+    author = excluded.author;
+"""
+
+
+def _file_params(file: LibraryFile) -> tuple:
+    return (file.track_key, file.path, file.size, file.mtime_ns, file.format, file.title, file.author)
@@ -0,0 +1,156 @@
+"""Репозиторий локальных треков из папок пользователя.
+
+Строка ``local_tracks`` — аудиофайл с прочитанными тегами. Время
+изменения папок хранится в общей таблице ``library_dirs``: поддерево
+папки выбирается диапазоном по первичному ключу (``root/`` .. ``root0``).
+Содержит только SQL-операции.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+from database.async_database import AsyncDatabase
+
+
+
+@dataclass(slots=True)
+class LocalTrackRow:
+    """Локальный аудиофайл с тегами."""
+
+    track_id: str
+    path: str
+    dir: str
+    size: int
+    mtime_ns: int
+    title: str
+    author: str
+    album: str
+    duration_ms: int
+
+
+_COLUMNS = "track_id, path, dir, size, mtime_ns, title, author, album, duration_ms"
+
+
+def _subtree_bounds(root: str) -> tuple[str, str]:
+    """Границы ключей для всех путей внутри ``root`` ('/' < '0' в ASCII)."""
+    return f"{root}/", f"{root}0"
+
+
+class LocalTrackRepository:
+    """Репозиторий для индексации и поиска локальных треков."""
+
+    def __init__(self, db: AsyncDatabase) -> None:
+        self._db = db
+
+    async def get_dir_mtimes(self, roots: Iterable[str]) -> dict[str, int]:
+        """Сохраненные mtime папок внутри ``roots`` (включая сами корни)."""
+        result: dict[str, int] = {}
+        for root in roots:
+            low, high = _subtree_bounds(root)
+            rows = await self._db.fetchall(
+                "SELECT path, mtime_ns FROM library_dirs WHERE path = ? OR (path > ? AND path < ?);",
+                (root, low, high),
+            )
+            result.update(rows)
+        return result
+
+    async def get_file_states(self, dirs: Iterable[str]) -> dict[str, tuple[str, int, int]]:
+        """Проиндексированные файлы папок: ``path -> (track_id, size, mtime_ns)``."""
+        rows = await self._db.fetchall_in(
+            "SELECT path, track_id, size, mtime_ns FROM local_tracks WHERE dir IN ({keys});",
+            dirs,
+        )
+        return {path: (track_id, size, mtime_ns) for path, track_id, size, mtime_ns in rows}
+
+    async def apply_changes(
+        self,
+        upserts: Iterable[LocalTrackRow],
+        removed_paths: Iterable[str],
+        removed_dirs: Iterable[str],
+        dir_mtimes: Mapping[str, int],
+    ) -> None:
+        """Записывает изменения обхода одной транзакцией.
+
+        mtime папки пишется вместе с ее файлами: если обход прервется,
+        папка будет перечитана в следующий раз.
+        """
+        async with self._db.transaction() as tx:
+            await tx.executemany(
+                "DELETE FROM local_tracks WHERE path = ?;",
+                [(path,) for path in removed_paths],
+            )
+            removed_dirs = [(path,) for path in removed_dirs]
+            await tx.executemany("DELETE FROM local_tracks WHERE dir = ?;", removed_dirs)
+            await tx.executemany("DELETE FROM library_dirs WHERE path = ?;", removed_dirs)
+            await tx.executemany(
+                f"""
+                INSERT INTO local_tracks ({_COLUMNS})
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(track_id) DO UPDATE SET
+                    size = excluded.size,
+                    mtime_ns = excluded.mtime_ns,
+                    title = excluded.title,
+                    author = excluded.author,
+                    album = excluded.album,
+                    duration_ms = excluded.duration_ms;
+                """,
+                [
+                    (
+                        row.track_id, row.path, row.dir, row.size, row.mtime_ns,
+                        row.title, row.author, row.album, row.duration_ms,
+                    )
+                    for row in upserts
+                ],
+            )
+            await tx.executemany(
+                """
+                INSERT INTO library_dirs (path, mtime_ns)
+                VALUES (?, ?)
+                ON CONFLICT(path) DO UPDATE SET mtime_ns = excluded.mtime_ns;
+                """,
+                list(dir_mtimes.items()),
+            )
+
+    async def remove_root(self, root: str) -> int:
+        """Удаляет из индекса папку со всеми вложенными и возвращает число удаленных треков."""
+        low, high = _subtree_bounds(root)
+        async with self._db.transaction() as tx:
+            removed = await tx.execute(
+                "DELETE FROM local_tracks WHERE dir = ? OR (dir > ? AND dir < ?);",
+                (root, low, high),
+            )
+            await tx.execute(
+                "DELETE FROM library_dirs WHERE path = ? OR (path > ? AND path < ?);",
+                (root, low, high),
+            )
+        return removed
+
+    async def get_track(self, track_id: str) -> LocalTrackRow | None:
+        """Трек по id или ``None``."""
+        return await self._db.fetchone(
+            f"SELECT {_COLUMNS} FROM local_tracks WHERE track_id = ?;",
+            (track_id,),
+            factory=LocalTrackRow,
+        )
+
+    async def get_path(self, track_id: str) -> str | None:
+        """Путь к файлу трека или ``None``."""
+        row = await self._db.fetchone("SELECT path FROM local_tracks WHERE track_id = ?;", (track_id,))
+        return None if row is None else row[0]
+
+    async def search(self, query: str, limit: int, offset: int = 0) -> list[LocalTrackRow]:
+        """Треки, у которых название, исполнитель или альбом содержат ``query``."""
+        pattern = f"%{query}%"
+        return await self._db.fetchall(
+            f"""
+            SELECT {_COLUMNS}
+            FROM local_tracks
+            WHERE title LIKE ? OR author LIKE ? OR album LIKE ?
+            ORDER BY author, album, title
+            LIMIT ? OFFSET ?;
+            """,
+            (pattern, pattern, pattern, limit, offset),
+            factory=LocalTrackRow,
+        )
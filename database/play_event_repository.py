@@ -0,0 +1,365 @@
+"""Репозиторий журнала прослушиваний и агрегатов по нему.
+
+Журнал ``play_events`` только дополняется. Вместе с каждой пачкой событий
+в той же транзакции обновляются агрегаты: итоги по дням, по трекам и
+артистам за день, а также итоги за все время. Запросы аналитики читают
+только агрегаты, поэтому их стоимость зависит от размера результата, а не
+от длины журнала.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterable
+
+from database.async_database import AsyncDatabase
+
+
+
+@dataclass(slots=True)
+class PlayEvent:
+    """Одно прослушивание трека.
+
+    ``position_ms`` — докуда дослушали, ``listened_ms`` — сколько реально
+    играло (сумма приростов позиции без перемоток), ``skipped`` — трек переключили, не дослушав.
+    """
+
+    track_key: str
+    artist: str
+    source: str
+    started_at: int
+    ended_at: int
+    position_ms: int
+    duration_ms: int
+    listened_ms: int
+    skipped: bool
+
+    @property
+    def day(self) -> str:
+        """Локальная дата начала прослушивания, ``YYYY-MM-DD``."""
+        return date.fromtimestamp(self.started_at).isoformat()
+
+
+@dataclass(slots=True)
+class PlayStats:
+    """Агрегированная статистика: по дню, треку или артисту.
+
+    ``label`` — подпись для UI (для треков — "название — исполнитель").
+    """
+
+    key: str
+    plays: int
+    skips: int
+    listened_ms: int
+    label: str = ""
+
+
+class PlayEventRepository:
+    """Репозиторий для записи событий и чтения агрегатов."""
+
+    def __init__(self, db: AsyncDatabase) -> None:
+        self._db = db
+
+    async def record_events(self, events: Iterable[PlayEvent]) -> None:
+        """Добавляет события в журнал и обновляет агрегаты одной транзакцией."""
+        events = list(events)
+        if not events:
+            return
+        rows = [
+            (
+                event.day,
+                event.track_key,
+                event.artist,
+                1,
+                int(event.skipped),
+                max(0, event.listened_ms),
+                event.started_at,
+            )
+            for event in events
+        ]
+        async with self._db.transaction() as tx:
+            await tx.executemany(
+                """
+                INSERT INTO play_events (
+                    track_key, artist, source, started_at, ended_at,
+                    position_ms, duration_ms, listened_ms, skipped
+                )
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?);
+                """,
+                [
+                    (
+                        event.track_key,
+                        event.artist,
+                        event.source,
+                        event.started_at,
+                        event.ended_at,
+                        max(0, event.position_ms),
+                        max(0, event.duration_ms),
+                        max(0, event.listened_ms),
+                        int(event.skipped),
+                    )
+                    for event in events
+                ],
+            )
+            await tx.executemany(
+                """
+                INSERT INTO daily_totals (day, plays, skips, listened_ms)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(day) DO UPDATE SET
+                    plays = plays + excluded.plays,
+                    skips = skips + excluded.skips,
+                    listened_ms = listened_ms + excluded.listened_ms;
+                """,
+                [(day, plays, skips, listened) for day, _, _, plays, skips, listened, _ in rows],
+            )
+            await tx.executemany(
+                """
+                INSERT INTO daily_track_stats (day, track_key, plays, skips, listened_ms)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(day, track_key) DO UPDATE SET
+                    plays = plays + excluded.plays,
+                    skips = skips + excluded.skips,
+                    listened_ms = listened_ms + excluded.listened_ms;
+                """,
+                [(day, key, plays, skips, listened) for day, key, _, plays, skips, listened, _ in rows],
+            )
+            await tx.executemany(
+                """
+                INSERT INTO daily_artist_stats (day, artist, plays, skips, listened_ms)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(day, artist) DO UPDATE SET
+                    plays = plays + excluded.plays,
+                    skips = skips + excluded.skips,
+                    listened_ms = listened_ms + excluded.listened_ms;
+                """,
+                [(day, artist, plays, skips, listened) for day, _, artist, plays, skips, listened, _ in rows],
+            )
+            await tx.executemany(
+                """
+                INSERT INTO track_totals (track_key, plays, skips, listened_ms, last_played_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(track_key) DO UPDATE SET
+                    plays = plays + excluded.plays,
+                    skips = skips + excluded.skips,
+                    listened_ms = listened_ms + excluded.listened_ms,
+                    last_played_at = max(last_played_at, excluded.last_played_at);
+                """,
+                [(key, plays, skips, listened, at) for _, key, _, plays, skips, listened, at in rows],
+            )
+            await tx.executemany(
+                """
+                INSERT INTO artist_totals (artist, plays, skips, listened_ms, last_played_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(artist) DO UPDATE SET
+                    plays = plays + excluded.plays,
+                    skips = skips + excluded.skips,
+                    listened_ms = listened_ms + excluded.listened_ms,
+                    last_played_at = max(last_played_at, excluded.last_played_at);
+                """,
+                [(artist, plays, skips, listened, at) for _, _, artist, plays, skips, listened, at in rows],
+            )
+
+    async def get_events(self, since: int, until: int, limit: int = 200) -> list[PlayEvent]:
+        """Возвращает события за интервал ``[since, until)``, новые первыми."""
+        rows = await self._db.fetchall(
+            """
+            SELECT track_key, artist, source, started_at, ended_at,
+                   position_ms, duration_ms, listened_ms, skipped
+            FROM play_events
+            WHERE started_at >= ? AND started_at < ?
+            ORDER BY started_at DESC
+            LIMIT ?;
+            """,
+            (since, until, max(1, limit)),
+        )
+        return [PlayEvent(*row[:8], skipped=bool(row[8])) for row in rows]
+
+    async def get_daily_totals(self, since_day: str, until_day: str) -> list[PlayStats]:
+        """Итоги по дням в диапазоне ``[since_day, until_day]`` (``YYYY-MM-DD``)."""
+        return await self._db.fetchall(
+            """
+            SELECT day, plays, skips, listened_ms
+            FROM daily_totals
+            WHERE day BETWEEN ? AND ?
+            ORDER BY day;
+            """,
+            (since_day, until_day),
+            factory=PlayStats,
+        )
+
+    async def get_active_days(self) -> list[str]:
+        """Все дни (``YYYY-MM-DD``) с прослушиваниями по возрастанию — для серий."""
+        rows = await self._db.fetchall(
+            "SELECT day FROM daily_totals WHERE plays > 0 ORDER BY day;",
+        )
+        return [row[0] for row in rows]
+
+    async def get_top_tracks(self, since_day: str, until_day: str, limit: int = 10) -> list[PlayStats]:
+        """Самые слушаемые треки за период (по дневным агрегатам)."""
+        return await self._with_track_labels(
+            """
+            SELECT track_key, SUM(plays) AS plays, SUM(skips) AS skips, SUM(listened_ms) AS listened
+            FROM daily_track_stats
+            WHERE day BETWEEN ? AND ?
+            GROUP BY track_key
+            ORDER BY listened DESC
+            LIMIT ?
+            """,
+            (since_day, until_day, max(1, limit)),
+        )
+
+    async def get_top_artists(self, since_day: str, until_day: str, limit: int = 10) -> list[PlayStats]:
+        """Самые слушаемые артисты за период (по дневным агрегатам)."""
+        return await self._db.fetchall(
+            """
+            SELECT artist, SUM(plays), SUM(skips), SUM(listened_ms) AS listened, artist
+            FROM daily_artist_stats
+            WHERE day BETWEEN ? AND ?
+            GROUP BY artist
+            ORDER BY listened DESC
+            LIMIT ?;
+            """,
+            (since_day, until_day, max(1, limit)),
+            factory=PlayStats,
+        )
+
+    async def get_track_totals(self, limit: int = 10) -> list[PlayStats]:
+        """Самые слушаемые треки за все время."""
+        return await self._with_track_labels(
+            """
+            SELECT track_key, plays, skips, listened_ms AS listened
+            FROM track_totals
+            ORDER BY listened_ms DESC
+            LIMIT ?
+            """,
+            (max(1, limit),),
+        )
+
+    async def get_artist_totals(self, limit: int = 10) -> list[PlayStats]:
+        """Самые слушаемые артисты за все время."""
+        return await self._db.fetchall(
+            """
+            SELECT artist, plays, skips, listened_ms, artist
+            FROM artist_totals
+            ORDER BY listened_ms DESC
+            LIMIT ?;
+            """,
+            (max(1, limit),),
+            factory=PlayStats,
+        )
+
+    async def get_overall_totals(self) -> PlayStats:
+        """Итоги за все время (по ``track_totals``, которые очистка не трогает)."""
+        row = await self._db.fetchone(
+            """
+            SELECT COALESCE(SUM(plays), 0), COALESCE(SUM(skips), 0), COALESCE(SUM(listened_ms), 0)
+            FROM track_totals;
+            """,
+        )
+        return PlayStats("", int(row[0]), int(row[1]), int(row[2]))
+
+    async def get_track_stats(
+        self, track_keys: Iterable[str], since_day: str | None, until_day: str
+    ) -> list[PlayStats]:
+        """Итоги треков из списка за период (``since_day=None`` — за все время)."""
+        if since_day is None:
+            query = """
+                SELECT track_key, plays, skips, listened_ms AS listened
+                FROM track_totals
+                WHERE track_key IN ({keys})
+            """
+            params: tuple = ()
+        else:
+            query = """
+                SELECT track_key, SUM(plays) AS plays, SUM(skips) AS skips, SUM(listened_ms) AS listened
+                FROM daily_track_stats
+                WHERE track_key IN ({keys}) AND day BETWEEN ? AND ?
+                GROUP BY track_key
+            """
+            params = (since_day, until_day)
+        return await self._db.fetchall_in(_labeled_top_query(query), track_keys, params, factory=PlayStats)
+
+    async def get_artist_stats(
+        self, artists: Iterable[str], since_day: str | None, until_day: str
+    ) -> list[PlayStats]:
+        """Итоги артистов из списка за период (``since_day=None`` — за все время)."""
+        if since_day is None:
+            query = """
+                SELECT artist, plays, skips, listened_ms, artist
+                FROM artist_totals
+                WHERE artist IN ({keys});
+            """
+            params: tuple = ()
+        else:
+            query = """
+                SELECT artist, SUM(plays), SUM(skips), SUM(listened_ms), artist
+                FROM daily_artist_stats
+                WHERE artist IN ({keys}) AND day BETWEEN ? AND ?
+                GROUP BY artist;
+            """
+            params = (since_day, until_day)
+        return await self._db.fetchall_in(query, artists, params, factory=PlayStats)
+
+    async def prune(self, events_before: int, daily_before: str) -> None:
+        """Применяет политику хранения.
+
+        Удаляет сырые события старше ``events_before`` (unix-время) и дневные
+        агрегаты старше ``daily_before``. Итоги за все время
+        (``track_totals``/``artist_totals``) не трогаются: статистику за все
+        время надо читать из них (:meth:`get_overall_totals`,
+        :meth:`get_track_totals`, :meth:`get_artist_totals`), а не
+        складывать дневные агрегаты.
+        """
+        async with self._db.transaction() as tx:
+            await tx.execute("DELETE FROM play_events WHERE started_at < ?;", (events_before,))
+            await tx.execute("DELETE FROM daily_totals WHERE day < ?;", (daily_before,))
+            await tx.execute("DELETE FROM daily_track_stats WHERE day < ?;", (daily_before,))
+            await tx.execute("DELETE FROM daily_artist_stats WHERE day < ?;", (daily_before,))
+
+    async def compact(self, before_day: str) -> None:
+        """Сворачивает дневные агрегаты по трекам и артистам до ``before_day`` в месячные.
+
+        Строки месяца складываются в строку его первого дня, поэтому
+        выборки по диапазону дней, покрывающему месяц целиком, не меняются.
+        ``before_day`` должен быть первым днем месяца. ``daily_totals`` не
+        сворачиваются: по ним строятся график и серии дней.
+        """
+        async with self._db.transaction() as tx:
+            for table, column in (("daily_track_stats", "track_key"), ("daily_artist_stats", "artist")):
+                await tx.execute(
+                    f"""
+                    INSERT INTO {table} (day, {column}, plays, skips, listened_ms)
+                    SELECT substr(day, 1, 8) || '01', {column}, SUM(plays), SUM(skips), SUM(listened_ms)
+                    FROM {table}
+                    WHERE day < ? AND substr(day, 9, 2) <> '01'
+                    GROUP BY substr(day, 1, 8), {column}
+                    ON CONFLICT(day, {column}) DO UPDATE SET
+                        plays = plays + excluded.plays,
+                        skips = skips + excluded.skips,
+                        listened_ms = listened_ms + excluded.listened_ms;
+                    """,
+                    (before_day,),
+                )
+                await tx.execute(
+                    f"DELETE FROM {table} WHERE day < ? AND substr(day, 9, 2) <> '01';",
+                    (before_day,),
+                )
+
+    async def _with_track_labels(self, top_query: str, params: tuple) -> list[PlayStats]:
+        """Выполняет выборку топа треков и подписывает их из ``track_history``."""
+        return await self._db.fetchall(_labeled_top_query(top_query), params, factory=PlayStats)
+
+
+def _labeled_top_query(top_query: str) -> str:
+    """Запрос, подписывающий треки выборки ``top_query`` из ``track_history``.
+
+    Соединение делается уже после ``LIMIT``, то есть только для строк результата.
+    """
+    return f"""
+        SELECT top.track_key, top.plays, top.skips, top.listened,
+               COALESCE(h.title || ' — ' || h.author, top.track_key)
+        FROM ({top_query}) AS top
+        LEFT JOIN track_history AS h ON h.track_key = top.track_key
+        ORDER BY top.listened DESC;
+    """
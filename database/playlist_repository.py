@@ -0,0 +1,210 @@
+"""Репозиторий пользовательских плейлистов.
+
+Плейлист — строка ``playlists`` (имя уникально без учета регистра),
+треки — строки ``playlist_tracks`` с позицией. Поиск по имени, добавление,
+удаление и проверка дубликата идут по индексам и не зависят от числа
+плейлистов. Содержит только SQL-операции.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from time import time
+from typing import Iterable
+
+from database.async_database import AsyncDatabase, Transaction
+
+
+@dataclass(slots=True)
+class PlaylistRecord:
+    """Плейлист без треков."""
+
+    id: int
+    name: str
+    created_at: int
+    opened_at: int
+
+
+@dataclass(slots=True)
+class PlaylistTrackRow:
+    """Трек в плейлисте (в порядке позиций)."""
+
+    track_key: str
+    track_id: str
+    title: str
+    author: str
+
+
+class PlaylistRepository:
+    """Репозиторий для чтения и изменения пользовательских плейлистов."""
+
+    def __init__(self, db: AsyncDatabase) -> None:
+        self._db = db
+
+    async def list_playlists(self) -> list[PlaylistRecord]:
+        """Все плейлисты, недавно открытые первыми."""
+        return await self._db.fetchall(
+            """
+            SELECT id, name, created_at, opened_at
+            FROM playlists
+            ORDER BY opened_at DESC, id DESC;
+            """,
+            factory=PlaylistRecord,
+        )
+
+    async def get_playlist(self, name: str) -> PlaylistRecord | None:
+        """Плейлист по имени (без учета регистра) или ``None``."""
+        return await self._db.fetchone(
+            "SELECT id, name, created_at, opened_at FROM playlists WHERE name = ?;",
+            (name,),
+            factory=PlaylistRecord,
+        )
+
+    async def get_tracks(self, playlist_id: int) -> list[PlaylistTrackRow]:
+        """Треки плейлиста по порядку."""
+        return await self._db.fetchall(
+            """
+            SELECT track_key, track_id, title, author
+            FROM playlist_tracks
+            WHERE playlist_id = ?
+            ORDER BY position;
+            """,
+            (playlist_id,),
+            factory=PlaylistTrackRow,
+        )
+
+    async def get_all_tracks(self) -> dict[int, list[PlaylistTrackRow]]:
+        """Треки всех плейлистов одним проходом: ``playlist_id -> треки``."""
+        result: dict[int, list[PlaylistTrackRow]] = {}
+        async for row in self._db.iterate(
+            """
+            SELECT playlist_id, track_key, track_id, title, author
+            FROM playlist_tracks
+            ORDER BY playlist_id, position;
+            """,
+        ):
+            result.setdefault(row[0], []).append(PlaylistTrackRow(*row[1:]))
+        return result
+
+    async def create_playlist(self, name: str, tracks: Iterable[PlaylistTrackRow] = ()) -> int:
+        """Создает плейлист (при необходимости сразу с треками) и возвращает его id.
+
+        Raises:
+            sqlite3.IntegrityError: Если плейлист с таким именем уже есть.
+        """
+        now = int(time())
+        async with self._db.transaction() as tx:
+            await tx.execute(
+                "INSERT INTO playlists (name, created_at, opened_at) VALUES (?, ?, ?);",
+                (name, now, now),
+            )
+            row = await tx.fetchone("SELECT last_insert_rowid();")
+            playlist_id = int(row[0])
+            await self._insert_tracks(tx, playlist_id, tracks, now)
+        return playlist_id
+
+    async def replace_tracks(self, playlist_id: int, tracks: Iterable[PlaylistTrackRow]) -> None:
+        """Заменяет все треки плейлиста (используется при импорте)."""
+        async with self._db.transaction() as tx:
+            await tx.execute("DELETE FROM playlist_tracks WHERE playlist_id = ?;", (playlist_id,))
+            await self._insert_tracks(tx, playlist_id, tracks, int(time()))
+
+    async def rename_playlist(self, playlist_id: int, name: str) -> None:
+        """Переименовывает плейлист.
+
+        Raises:
+            sqlite3.IntegrityError: Если имя занято другим плейлистом.
+        """
+        await self._db.execute("UPDATE playlists SET name = ? WHERE id = ?;", (name, playlist_id))
+
+    async def delete_playlist(self, playlist_id: int) -> None:
+        """Удаляет плейлист вместе с треками."""
+        await self._db.execute("DELETE FROM playlists WHERE id = ?;", (playlist_id,))
+
+    async def touch_playlist(self, playlist_id: int) -> None:
+        """Отмечает плейлист открытым сейчас (он поднимается вверх списка)."""
+        await self._db.execute(
+            "UPDATE playlists SET opened_at = ? WHERE id = ?;",
+            (int(time()), playlist_id),
+        )
+
+    async def add_track(self, playlist_id: int, track: PlaylistTrackRow) -> bool:
+        """Добавляет трек в конец плейлиста.
+
+        Returns:
+            ``True``, если трек добавлен; ``False``, если он уже был в плейлисте.
+        """
+        # MAX(position) берется из первичного ключа (playlist_id, position).
+        changed = await self._db.execute(
+            """
+            INSERT INTO playlist_tracks (
+                playlist_id, position, track_key, track_id, title, author, added_at
+            )
+            SELECT ?, COALESCE(MAX(position) + 1, 0), ?, ?, ?, ?, ?
+            FROM playlist_tracks
+            WHERE playlist_id = ?
+            ON CONFLICT(playlist_id, track_key) DO NOTHING;
+            """,
+            (
+                playlist_id,
+                track.track_key,
+                track.track_id,
+                track.title,
+                track.author,
+                int(time()),
+                playlist_id,
+            ),
+        )
+        return changed > 0
+
+    async def remove_track(self, playlist_id: int, track_key: str) -> bool:
+        """Удаляет трек из плейлиста.
+
+        Returns:
+            ``True``, если трек был удален; ``False``, если его не было.
+        """
+        changed = await self._db.execute(
+            "DELETE FROM playlist_tracks WHERE playlist_id = ? AND track_key = ?;",
+            (playlist_id, track_key),
+        )
+        return changed > 0
+
+    async def get_imported_files(self) -> dict[str, tuple[int, int]]:
+        """Уже импортированные JSON-файлы: ``path -> (mtime_ns, size)``."""
+        rows = await self._db.fetchall("SELECT path, mtime_ns, size FROM playlist_imports;")
+        return {path: (mtime_ns, size) for path, mtime_ns, size in rows}
+
+    async def record_import(self, path: str, mtime_ns: int, size: int) -> None:
+        """Запоминает импортированную версию файла, чтобы не импортировать ее повторно."""
+        await self._db.execute(
+            """
+            INSERT INTO playlist_imports (path, mtime_ns, size)
+            VALUES (?, ?, ?)
+            ON CONFLICT(path) DO UPDATE SET
+                mtime_ns = excluded.mtime_ns,
+                size = excluded.size;
+            """,
+            (path, mtime_ns, size),
+        )
+
+    @staticmethod
+    async def _insert_tracks(
+        tx: Transaction,
+        playlist_id: int,
+        tracks: Iterable[PlaylistTrackRow],
+        added_at: int,
+    ) -> None:
+        # Дубликаты в исходном списке пропускаются (остается первое вхождение).
+        await tx.executemany(
+            """
+            INSERT INTO playlist_tracks (
+                playlist_id, position, track_key, track_id, title, author, added_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(playlist_id, track_key) DO NOTHING;
+            """,
+            [
+                (playlist_id, position, track.track_key, track.track_id, track.title, track.author, added_at)
+                for position, track in enumerate(tracks)
+            ],
+        )
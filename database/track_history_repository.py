@@ -7,10 +7,40 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from time import time
+from typing import Iterable
 
 from database.async_database import AsyncDatabase
 
 
+# Курсор keyset-пагинации истории: (last_played_at, rowid) последней записи страницы.
+HistoryCursor = tuple[int, int]
+
+# Колонки в порядке полей TrackHistoryEntry.
+_ENTRY_COLUMNS = (
+    "track_key, title, author, source, position_ms, duration_ms, listen_count, last_played_at"
+)
+
+_UPSERT_PROGRESS_SQL = """
+    INSERT INTO track_history (
+        track_key, title, author, source, position_ms, duration_ms,
+        listen_count, last_played_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(track_key) DO UPDATE SET
+        title = excluded.title,
+        author = excluded.author,
+        source = excluded.source,
+        position_ms = excluded.position_ms,
+        -- 0 — длительность еще неизвестна (трек только запущен).
+        duration_ms = CASE
+            WHEN excluded.duration_ms > 0 THEN excluded.duration_ms
+            ELSE track_history.duration_ms
+        END,
+        listen_count = track_history.listen_count + excluded.listen_count,
+        last_played_at = excluded.last_played_at;
+"""
+
+
 @dataclass(slots=True)
 class TrackHistoryEntry:
     """Запись истории воспроизведения трека."""
@@ -25,6 +55,24 @@ class TrackHistoryEntry:
     last_played_at: int
 
 
+@dataclass(slots=True)
+class TrackProgressUpdate:
+    """Обновление прогресса трека, ожидающее записи в БД.
+
+    ``listen_increment`` — прирост счетчика прослушиваний,
+    ``played_at`` — unix-время события (а не момента записи).
+    """
+
+    track_key: str
+    title: str
+    author: str
+    source: str
+    position_ms: int
+    duration_ms: int
+    listen_increment: int
+    played_at: int
+
+
 class TrackHistoryRepository:
     """Репозиторий для чтения и записи истории треков."""
 
@@ -46,31 +94,66 @@ class TrackHistoryRepository:
         ``listen_increment`` увеличивает счетчик прослушиваний на указанное
         значение и используется на событии завершения трека.
         """
-        await self._db.execute(
+        await self.upsert_progress_many(
+            [
+                TrackProgressUpdate(
+                    track_key=track_key,
+                    title=title,
+                    author=author,
+                    source=source,
+                    position_ms=position_ms,
+                    duration_ms=duration_ms,
+                    listen_increment=listen_increment,
+                    played_at=int(time()),
+                )
+            ]
+        )
+
+    async def upsert_progress_many(self, updates: Iterable[TrackProgressUpdate]) -> None:
+        """Записывает пачку обновлений прогресса одной транзакцией."""
+        await self._db.executemany(
+            _UPSERT_PROGRESS_SQL,
+            (
+                (
+                    update.track_key,
+                    update.title,
+                    update.author,
+                    update.source,
+                    max(0, update.position_ms),
+                    max(0, update.duration_ms),
+                    max(0, update.listen_increment),
+                    update.played_at,
+                )
+                for update in updates
+            ),
+        )
+
+    async def import_entries(self, entries: Iterable[TrackHistoryEntry]) -> None:
+        """Записывает готовые записи истории одной транзакцией.
+
+        Существующие записи с теми же ключами перезаписываются целиком
+        (используется для импорта и перестройки истории).
+        """
+        await self._db.executemany(
             """
-            INSERT INTO track_history (
+            INSERT OR REPLACE INTO track_history (
                 track_key, title, author, source, position_ms, duration_ms,
                 listen_count, last_played_at
             )
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ON CONFLICT(track_key) DO UPDATE SET
-                title = excluded.title,
-                author = excluded.author,
-                source = excluded.source,
-                position_ms = excluded.position_ms,
-                duration_ms = excluded.duration_ms,
-                listen_count = track_history.listen_count + excluded.listen_count,
-                last_played_at = excluded.last_played_at;
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?);
             """,
             (
-                track_key,
-                title,
-                author,
-                source,
-                max(0, position_ms),
-                max(0, duration_ms),
-                max(0, listen_increment),
-                int(time()),
+                (
+                    entry.track_key,
+                    entry.title,
+                    entry.author,
+                    entry.source,
+                    max(0, entry.position_ms),
+                    max(0, entry.duration_ms),
+                    max(0, entry.listen_count),
+                    entry.last_played_at,
+                )
+                for entry in entries
             ),
         )
 
@@ -82,11 +165,34 @@ class TrackHistoryRepository:
         )
         if row is None:
             return 0
-        return int(row.get("position_ms", 0))
+        return int(row[0])
+
+    async def get_saved_progress(self, track_key: str) -> tuple[int, int]:
+        """Возвращает ``(position_ms, duration_ms)`` трека (нули, если записи нет)."""
+        row = await self._db.fetchone(
+            "SELECT position_ms, duration_ms FROM track_history WHERE track_key = ?;",
+            (track_key,),
+        )
+        if row is None:
+            return 0, 0
+        return int(row[0]), int(row[1])
+
+    async def get_recent_positions(self, limit: int) -> list[tuple[str, int, int]]:
+        """``(track_key, position_ms, duration_ms)`` последних ``limit`` треков, новые первыми."""
+        return await self._db.fetchall(
+            """
+            SELECT track_key, position_ms, duration_ms
+            FROM track_history
+            ORDER BY last_played_at DESC
+            LIMIT ?;
+            """,
+            (max(1, limit),),
+        )
 
     async def get_recent_entries(self, limit: int = 30) -> list[TrackHistoryEntry]:
         """Возвращает недавно прослушанные треки в порядке убывания времени."""
-        rows = await self._db.fetchall(
+        # Порядок колонок совпадает с полями TrackHistoryEntry.
+        return await self._db.fetchall(
             """
             SELECT track_key, title, author, source, position_ms, duration_ms,
                    listen_count, last_played_at
@@ -95,17 +201,69 @@ class TrackHistoryRepository:
             LIMIT ?;
             """,
             (max(1, limit),),
+            factory=TrackHistoryEntry,
         )
-        return [
-            TrackHistoryEntry(
-                track_key=row["track_key"],
-                title=row["title"],
-                author=row["author"],
-                source=row["source"],
-                position_ms=int(row["position_ms"]),
-                duration_ms=int(row["duration_ms"]),
-                listen_count=int(row["listen_count"]),
-                last_played_at=int(row["last_played_at"]),
+
+    async def get_recent_page(
+        self,
+        limit: int = 30,
+        before: HistoryCursor | None = None,
+    ) -> tuple[list[TrackHistoryEntry], HistoryCursor | None]:
+        """Возвращает страницу истории по убыванию времени (keyset-пагинация).
+
+        Ключ страницы — пара ``(last_played_at, rowid)``: выборка идет по
+        индексу ``idx_track_history_last_played`` без OFFSET и без сортировки
+        (внутри индекса записи с равным временем лежат по возрастанию rowid),
+        поэтому стоимость страницы не зависит от ее номера.
+
+        Returns:
+            Записи страницы и курсор для следующей (``None``, если страниц больше нет).
+        """
+        limit = max(1, limit)
+        if before is None:
+            rows = await self._db.fetchall(
+                f"""
+                SELECT {_ENTRY_COLUMNS}, rowid
+                FROM track_history
+                ORDER BY last_played_at DESC, rowid
+                LIMIT ?;
+                """,
+                (limit,),
+            )
+        else:
+            rows = await self._db.fetchall(
+                f"""
+                SELECT {_ENTRY_COLUMNS}, rowid
+                FROM track_history
+                WHERE last_played_at <= ? AND (last_played_at < ? OR rowid > ?)
+                ORDER BY last_played_at DESC, rowid
+                LIMIT ?;
+                """,
+                (before[0], before[0], before[1], limit),
             )
-            for row in rows
-        ]
+        entries = [TrackHistoryEntry(*row[:-1]) for row in rows]
+        if len(rows) < limit:
+            return entries, None
+        last = rows[-1]
+        return entries, (last[7], last[8])
+
+    async def get_entries_since(self, played_at: int) -> list[TrackHistoryEntry]:
+        """Записи, прослушанные не раньше ``played_at`` (новые первыми)."""
+        return await self._db.fetchall(
+            f"""
+            SELECT {_ENTRY_COLUMNS}
+            FROM track_history
+            WHERE last_played_at >= ?
+            ORDER BY last_played_at DESC, rowid;
+            """,
+            (played_at,),
+            factory=TrackHistoryEntry,
+        )
+
+    async def get_listen_counts(self, track_keys: Iterable[str]) -> dict[str, int]:
+        """Число прослушиваний треков из списка: ``track_key -> count`` (неизвестные пропускаются)."""
+        rows = await self._db.fetchall_in(
+            "SELECT track_key, listen_count FROM track_history WHERE track_key IN ({keys});",
+            track_keys,
+        )
+        return {track_key: int(count) for track_key, count in rows}
@@ -0,0 +1,84 @@
+"""Репозиторий сведений о треках (``track_metadata``).
+
+Строка дополняется по частям: провайдер знает название, альбом и
+обложку, плеер — длительность. Пустые поля новой записи не затирают
+уже известные. Содержит только SQL-операции.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable
+
+from database.async_database import AsyncDatabase
+
+
+_COLUMNS = "track_key, title, author, album, duration_ms, cover_url, fetched_at"
+
+_UPSERT_SQL = f"""
+    INSERT INTO track_metadata ({_COLUMNS})
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(track_key) DO UPDATE SET
+        title = CASE WHEN excluded.title <> '' THEN excluded.title ELSE track_metadata.title END,
+        author = CASE WHEN excluded.author <> '' THEN excluded.author ELSE track_metadata.author END,
+        album = CASE WHEN excluded.album <> '' THEN excluded.album ELSE track_metadata.album END,
+        duration_ms = CASE
+            WHEN excluded.duration_ms > 0 THEN excluded.duration_ms
+            ELSE track_metadata.duration_ms
+        END,
+        cover_url = CASE
+            WHEN excluded.cover_url <> '' THEN excluded.cover_url
+            ELSE track_metadata.cover_url
+        END,
+        fetched_at = MAX(track_metadata.fetched_at, excluded.fetched_at);
+"""
+
+
+@dataclass(slots=True)
+class TrackMetadata:
+    """Известные сведения о треке; пустая строка или 0 — неизвестно."""
+
+    track_key: str
+    title: str = ""
+    author: str = ""
+    album: str = ""
+    duration_ms: int = 0
+    cover_url: str = ""
+    fetched_at: int = 0
+
+
+class TrackMetadataRepository:
+    """Репозиторий для чтения и дополнения сведений о треках."""
+
+    def __init__(self, db: AsyncDatabase) -> None:
+        self._db = db
+
+    async def get(self, track_key: str) -> TrackMetadata | None:
+        """Сведения о треке или ``None``."""
+        return await self._db.fetchone(
+            f"SELECT {_COLUMNS} FROM track_metadata WHERE track_key = ?;",
+            (track_key,),
+            factory=TrackMetadata,
+        )
+
+    async def get_many(self, track_keys: Iterable[str]) -> list[TrackMetadata]:
+        """Сведения о треках из списка (неизвестные пропускаются)."""
+        return await self._db.fetchall_in(
+            f"SELECT {_COLUMNS} FROM track_metadata WHERE track_key IN ({{keys}});",
+            track_keys,
+            factory=TrackMetadata,
+        )
+
+    async def upsert_many(self, items: Iterable[TrackMetadata]) -> None:
+        """Дополняет сведения о треках одной транзакцией."""
+        async with self._db.transaction() as tx:
+            await tx.executemany(
+                _UPSERT_SQL,
+                [
+                    (
+                        item.track_key, item.title, item.author, item.album,
+                        item.duration_ms, item.cover_url, item.fetched_at,
+                    )
+                    for item in items
+                ],
+            )
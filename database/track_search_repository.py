@@ -0,0 +1,113 @@
+"""Репозиторий полнотекстового поиска по своей библиотеке.
+
+Таблицы ``search_tracks``/``search_fts`` заполняют триггеры (см.
+``database.async_database``), здесь только запросы к индексу.
+``search_log`` — журнал запросов строки поиска для подсказок.
+Содержит только SQL-операции.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from database.async_database import AsyncDatabase
+
+# Вес названия относительно исполнителя в ранжировании bm25.
+_TITLE_WEIGHT = 2.0
+_AUTHOR_WEIGHT = 1.0
+# Префикс из одной-двух букв ("l") совпадает с половиной библиотеки, а bm25
+# для всех совпадений — десятки мс на 100 тыс. треков. Если в запросе нет
+# слова длиннее, ранжируются только последние добавленные совпадения (обход
+# по rowid в FTS5 идет без сортировки). Слово от трех букв сужает выборку
+# по индексу префиксов, и ранжируются все совпадения.
+_SHORT_TERM = 3
+_RANK_CANDIDATES = 1000
+
+
+@dataclass(slots=True)
+class TrackSearchHit:
+    """Трек из поискового индекса."""
+
+    track_key: str
+    title: str
+    author: str
+
+
+def build_match_query(query: str) -> str:
+    """Запрос FTS5: каждое слово — префикс, все слова обязательны.
+
+    Слова берутся в кавычки, поэтому операторы FTS5 (``OR``, ``NEAR``,
+    ``*``, ``-``) в тексте пользователя ищутся как обычные слова.
+    """
+    terms = (term.replace('"', '""') for term in query.split())
+    return " ".join(f'"{term}"*' for term in terms if term.strip('"'))
+
+
+class TrackSearchRepository:
+    """Репозиторий для поиска треков по названию и исполнителю."""
+
+    def __init__(self, db: AsyncDatabase) -> None:
+        self._db = db
+
+    async def search(self, query: str, limit: int) -> list[TrackSearchHit]:
+        """Лучшие совпадения по префиксам слов ``query``."""
+        match = build_match_query(query)
+        if not match:
+            return []
+        if max(len(term) for term in query.split()) >= _SHORT_TERM:
+            return await self._db.fetchall(
+                """
+                SELECT t.track_key, t.title, t.author
+                FROM search_fts
+                JOIN search_tracks AS t ON t.id = search_fts.rowid
+                WHERE search_fts MATCH ?
+                ORDER BY bm25(search_fts, ?, ?)
+                LIMIT ?;
+                """,
+                (match, _TITLE_WEIGHT, _AUTHOR_WEIGHT, limit),
+                factory=TrackSearchHit,
+            )
+        return await self._db.fetchall(
+            """
+            WITH hits AS (
+                SELECT rowid AS id, bm25(search_fts, ?, ?) AS score
+                FROM search_fts
+                WHERE search_fts MATCH ?
+                ORDER BY rowid DESC
+                LIMIT ?
+            )
+            SELECT t.track_key, t.title, t.author
+            FROM hits
+            JOIN search_tracks AS t ON t.id = hits.id
+            ORDER BY hits.score
+            LIMIT ?;
+            """,
+            (_TITLE_WEIGHT, _AUTHOR_WEIGHT, match, _RANK_CANDIDATES, limit),
+            factory=TrackSearchHit,
+        )
+
+    async def log_query(self, query_key: str, query: str, searched_at: int) -> None:
+        """Записывает запрос в журнал поиска."""
+        await self._db.execute(
+            """
+            INSERT INTO search_log (query_key, query, searches, last_searched_at)
+            VALUES (?, ?, 1, ?)
+            ON CONFLICT(query_key) DO UPDATE SET
+                query = excluded.query,
+                searches = search_log.searches + 1,
+                last_searched_at = excluded.last_searched_at;
+            """,
+            (query_key, query, searched_at),
+        )
+
+    async def get_queries(self, limit: int) -> list[tuple[str, int]]:
+        """Последние запросы: ``(query, searches)``, новые первыми."""
+        return await self._db.fetchall(
+            """
+            SELECT query, searches
+            FROM search_log
+            ORDER BY last_searched_at DESC
+            LIMIT ?;
+            """,
+            (limit,),
+        )
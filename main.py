@@ -1,32 +1,19 @@
 import sys
 import os
+
+# Профилировщик импорта (CLEANPLAYER_IMPORT_PROFILE) ставится до тяжелых импортов.
+from utils.import_profiler import install_import_profiler
+
+install_import_profiler()
+
 import asyncio
 
-# В exe: путь к локалям ytmusicapi и CA-бандл для requests
+from utils import startup_metrics
+
+# В exe: CA-бандл для requests
 if getattr(sys, "frozen", False):
     _meipass = getattr(sys, "_MEIPASS", os.path.dirname(sys.executable))
-    # Чтобы ytmusicapi нашёл locales (в т.ч. ru), подменяем __file__ модуля ytmusic
-    try:
-        import ytmusicapi.ytmusic as _ytm_mod
-        _ytm_mod.__file__ = os.path.join(_meipass, "ytmusicapi", "ytmusic.py")
-    except Exception:
-        pass
-    # Запрос за X-Goog-Visitor-Id к music.youtube.com часто получает пустую страницу при старом UA.
-    # Подменяем User-Agent на актуальный Chrome, чтобы сервер отдал страницу с ytcfg (VISITOR_DATA).
-    try:
-        import ytmusicapi.helpers as _ytm_helpers
-        _orig_init_headers = _ytm_helpers.initialize_headers
-        _chrome_ua = (
-            "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) "
-            "Chrome/131.0.0.0 Safari/537.36"
-        )
-        def _patched_init_headers():
-            h = _orig_init_headers()
-            h["user-agent"] = _chrome_ua
-            return h
-        _ytm_helpers.initialize_headers = _patched_init_headers
-    except Exception:
-        pass
+    # Подготовка ytmusicapi к exe выполняется лениво: config.clients._prepare_frozen_ytmusicapi.
     _cert_paths = (
         os.path.join(_meipass, "certifi", "cacert.pem"),
         os.path.join(_meipass, "certifi", "certifi", "cacert.pem"),
@@ -57,9 +44,11 @@ from qasync import QEventLoop
 from PySide6.QtWidgets import QApplication
 from qt_material import apply_stylesheet
 
-from services import TrackHistoryService
+from config import GetClients
+from services import CoverStore, LocalLibrary, TrackHistoryService, TrackMetadataService
 from ui import NeonMusic
 
+startup_metrics.mark(startup_metrics.IMPORTS_DONE)
 
 if __name__ == "__main__":
     # onefile: рабочая папка = папка с exe (там лежат assets/, user_theme.xml)
@@ -75,17 +64,26 @@ if __name__ == "__main__":
         except Exception:
             pass
     app = QApplication(sys.argv)
+    startup_metrics.mark(startup_metrics.QAPPLICATION_READY)
     apply_stylesheet(app, "user_theme.xml", invert_secondary=True)
+    startup_metrics.mark(startup_metrics.STYLESHEET_APPLIED)
 
     loop = QEventLoop(app)
     asyncio.set_event_loop(loop)
 
     window = NeonMusic()
+    startup_metrics.mark(startup_metrics.WINDOW_CONSTRUCTED)
     window.show()
+    # Клиенты провайдеров поднимаются в фоне уже после показа окна.
+    GetClients().warm_up()
+    TrackHistoryService().warm_up()
 
     with loop:
         try:
             loop.run_forever()
         finally:
             # Закрываем соединение с SQLite, чтобы процесс завершался корректно.
+            LocalLibrary().close()
+            CoverStore().close()
+            loop.run_until_complete(TrackMetadataService().flush())
             loop.run_until_complete(TrackHistoryService().close())
\ No newline at end of file
@@ -7,7 +7,8 @@
 Плейлисты пользователя - это плейлисты, которые создают пользователи.
 Плейлисты системы - это плейлисты, которые создаются системой.
 
-Плейлисты пользователя хранятся в файле playlists/user_playlists.json
+Плейлисты пользователя хранятся в БД (см. services.PlaylistService),
+JSON-файлы в playlists/ используются для импорта и экспорта.
 
 Классы:
 1. Playlist - абстрактный класс плейлиста
@@ -22,8 +23,8 @@ import os.path
 from typing import Iterable, Tuple
 from abc import ABC, abstractmethod
 
-from models import Track, YandexTrack, YoutubeTrack, UpgradeCycle
-from providers import TrackManager
+from models import Track, UpgradeCycle
+from providers import LibraryIndex, TrackManager
 
 class Playlist(ABC):
 
@@ -65,11 +66,13 @@ class Playlist(ABC):
         Returns:
             bool: ``True`` если трек найден и удален, иначе ``False``.
         """
+        values = self.tracks.values
         try:
-            del self.tracks.values[self.tracks.values.index(track)]
-            return True
+            index = values.index(track)
         except ValueError:
             return False
+        self.tracks.values = values[:index] + values[index + 1:]
+        return True
     
     @staticmethod
     def load_playlist(playlist_path: str):
@@ -141,7 +144,7 @@ class UserPlaylist(Playlist):
 
 
 class DownloadPlaylist(Playlist):
-    """плейлист скачанных треков из music """
+    """плейлист скачанных треков (см. providers.LibraryIndex)"""
 
     def __init__(self, name: str = "Скачанные", tracks: Iterable[Track] | None = None, cover_path: str  = "playlist_covers/download.png") -> None:
         super().__init__(name, tracks or (), cover_path)
@@ -164,37 +167,32 @@ class DownloadPlaylist(Playlist):
         Returns:
             DownloadPlaylist: плейлист
         """
-        return DownloadPlaylist(name="Скачанные", tracks=cls.get_tracks_from_music_dir())
+        return DownloadPlaylist(name="Скачанные", tracks=cls.get_tracks_from_library())
 
     @staticmethod
-    def get_tracks_from_music_dir() -> Tuple[Track]:
-        """Получаем список треков из директории music
+    def get_tracks_from_library() -> Tuple[Track]:
+        """Получаем список скачанных треков из индекса (папка music не читается)
 
         Returns:
-            Tuple[Track]: список треков
+            Tuple[Track]: список треков, недавно скачанные первыми
         """
-        music_dir = "music"
-        if not os.path.isdir(music_dir):
-            return ()
-        tracks = []
-        for track_file in os.listdir(music_dir):
-            try:
-                name, ext = os.path.splitext(track_file)
-                parts = name.split("_", 2)
-                if len(parts) < 3:
-                    continue
-                track_id, track_title, track_author = parts
-                if ext == ".mp3":
-                    tracks.append(YandexTrack(track_id=track_id, title=track_title, author=track_author, downloaded=True))
-                elif ext == ".m4a":
-                    tracks.append(YoutubeTrack(track_id=track_id, title=track_title, author=track_author, downloaded=True))
-            except Exception:
-                continue
-        return tuple(tracks)
+        track_manager = TrackManager()
+        files = sorted(LibraryIndex().files(), key=lambda file: file.mtime_ns, reverse=True)
+        return tuple(
+            track_manager.get_track_from_playlist(
+                file.track_key.partition(":")[2], file.title, file.author, file.track_key.partition(":")[0]
+            )
+            for file in files
+        )
 
 
 class RecentlyPlayedPlaylist(Playlist):
-    """Системный плейлист недавно прослушанных треков."""
+    """Системный плейлист недавно прослушанных треков.
+
+    История подгружается страницами: ``next_cursor`` — непрозрачный курсор
+    следующей страницы (``None`` — страниц больше нет), ``newest_played_at`` —
+    время самой свежей загруженной записи для догрузки новых сверху.
+    """
 
     def __init__(
         self,
@@ -203,6 +201,13 @@ class RecentlyPlayedPlaylist(Playlist):
         cover_path: str = "playlist_covers/heart.png",
     ) -> None:
         super().__init__(name, tracks or (), cover_path)
+        self.next_cursor = None
+        self.newest_played_at = 0
+
+    @property
+    def has_more(self) -> bool:
+        """Есть ли еще не загруженные страницы истории."""
+        return self.next_cursor is not None
 
     def get_tracks(self) -> Tuple[Track]:
         """Возвращает треки недавно прослушанного плейлиста."""
@@ -1,18 +1,26 @@
 """Модель трека
 
-Треки могут быть двух типов:
+Треки могут быть трех типов:
 1. Треки Яндекса
 2. Треки YouTube
+3. Локальные файлы из папок пользователя
 
 Классы:
 1. Track - абстрактный класс трека
 2. YandexTrack - класс трека Яндекса
 3. YoutubeTrack - класс трека YouTube
+4. LocalTrack - класс локального трека
+
+Трек неизменяем и хранится в ``__slots__``: списки истории и библиотеки
+держат десятки тысяч треков. Ключ ``source:track_id`` (как в истории,
+плейлистах и индексе скачанных) считается один раз при создании; по нему
+треки сравниваются и хешируются.
 """
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False, repr=False)
 class Track:
     """Абстрактный класс трека"""
     track_id: int | str
@@ -21,30 +29,41 @@ class Track:
     downloaded: bool = False
     source: str = ""
     listen_count: int = 0
-    
+    key: str = field(init=False, compare=False)
+
+    def __post_init__(self):
+        # Источников несколько, а треков — тысячи: строка источника общая.
+        source = sys.intern(self.source)
+        object.__setattr__(self, "source", source)
+        object.__setattr__(self, "key", f"{source}:{self.track_id}")
+
     def __repr__(self):
-        return f"{self.source}:{self.track_id}"
+        return self.key
     
     def __str__(self):
         return f"{self.source} : {self.title} - {self.author}"
     
     def __eq__(self, value):
-        if isinstance(value, self.__class__):
-            return self.track_id == value.track_id
-        if hasattr(value, "title") and hasattr(value, "author"):
-            return (self.title, self.author) == (value.title, value.author)
-        return False
+        if isinstance(value, Track):
+            return self.key == value.key
+        return NotImplemented
     
     def __hash__(self):
-        return hash(self.track_id)
+        return hash(self.key)
     
     
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False, repr=False)
 class YandexTrack(Track):
     """Класс трека Яндекса"""
     source: str = "yandex"
     
-@dataclass
+@dataclass(frozen=True, slots=True, eq=False, repr=False)
 class YoutubeTrack(Track):
     """Класс трека YouTube"""
-    source: str = "youtube"
\ No newline at end of file
+    source: str = "youtube"
+
+@dataclass(frozen=True, slots=True, eq=False, repr=False)
+class LocalTrack(Track):
+    """Класс локального трека (файл из папки пользователя, всегда на диске)"""
+    downloaded: bool = True
+    source: str = "local"
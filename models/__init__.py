@@ -1,3 +1,3 @@
-from models.Tracks import Track, YoutubeTrack, YandexTrack
+from models.Tracks import Track, YoutubeTrack, YandexTrack, LocalTrack
 from models.upgrade_cycle import UpgradeCycle
 from models.Playlists import UserPlaylist, DownloadPlaylist, RecentlyPlayedPlaylist
\ No newline at end of file
@@ -7,7 +7,7 @@ Interface segregation - True
 Dependency - from Iterable (but this is okay)
 """
 
-from typing import Iterable, Any, Optional
+from typing import Iterable, Any, Optional, Callable, Hashable
 
 class UpgradeCycle:
 
@@ -75,3 +75,31 @@ class UpgradeCycle:
         if self._index != 0:
             return self.values[self._index - 1]
         return self.values[len(self.values) - 1]
+
+    def extend(self, values: Iterable[Any]) -> None:
+        """Добавляем значения в конец цикла (текущая позиция не меняется)
+
+        Args:
+            values (Iterable[Any]): новые значения
+        """
+        self.values = self.values + tuple(values)
+
+    def move_to_front(self, values: Iterable[Any], key: Callable[[Any], Hashable] | None = None) -> None:
+        """Ставим значения в начало цикла, убирая их прежние вхождения
+
+        Текущим остается тот же элемент, что и до вызова.
+
+        Args:
+            values (Iterable[Any]): значения для начала цикла
+            key (Callable | None): по чему сравнивать значения (по умолчанию — сами значения)
+        """
+        front = tuple(values)
+        if not front:
+            return
+        key = key or (lambda value: value)
+        current = key(self.values[self._index]) if self.values else None
+        moved = {key(value) for value in front}
+        self.values = front + tuple(value for value in self.values if key(value) not in moved)
+        if current is not None:
+            keys = [key(value) for value in self.values]
+            self._index = keys.index(current)
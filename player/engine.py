@@ -4,14 +4,22 @@
   - playback_player  — воспроизведение звука (обычный вывод)
   - analysis_player  — захват PCM через callbacks (без вывода звука)
 
+VLC-объекты (и сам модуль ``vlc``) создаются лениво — при первом
+обращении к плеерам, а не при сборке UI. Зависимые компоненты
+подписываются на запуск через :meth:`VLCEngine.on_started`.
+
 Паттерн: Singleton
 Single Responsibility: жизненный цикл VLC-объектов + синхронизация медии.
 """
 
 from __future__ import annotations
 
+from typing import TYPE_CHECKING, Callable
+
 from PySide6.QtCore import QTimer
-from vlc import Instance, MediaPlayer, Media
+
+if TYPE_CHECKING:
+    from vlc import Instance, MediaPlayer, Media
 
 # Задержка запуска analysis_player (мс).
 _ANALYSIS_DELAY_MS = 1500
@@ -31,10 +39,10 @@ class VLCEngine:
         if getattr(self, "_initialized", False):
             return
 
-        self._vlc_instance: Instance = Instance()
-
-        self._playback_player: MediaPlayer = self._vlc_instance.media_player_new()
-        self._analysis_player: MediaPlayer = self._vlc_instance.media_player_new()
+        self._vlc_instance: Instance | None = None
+        self._playback_player: MediaPlayer | None = None
+        self._analysis_player: MediaPlayer | None = None
+        self._start_hooks: list[Callable[[VLCEngine], None]] = []
 
         self._analysis_timer = QTimer()
         self._analysis_timer.setSingleShot(True)
@@ -42,40 +50,64 @@ class VLCEngine:
 
         self._initialized = True
 
+    @property
+    def started(self) -> bool:
+        """``True``, если VLC-объекты уже созданы."""
+        return self._vlc_instance is not None
+
+    def on_started(self, hook: Callable[[VLCEngine], None]) -> None:
+        """Регистрирует callback, вызываемый сразу после создания VLC-объектов.
+
+        Если движок уже запущен, callback вызывается немедленно.
+        """
+        if self.started:
+            hook(self)
+        else:
+            self._start_hooks.append(hook)
 
     @property
     def instance(self) -> Instance:
+        self._ensure_started()
         return self._vlc_instance
 
     @property
     def playback_player(self) -> MediaPlayer:
+        self._ensure_started()
         return self._playback_player
 
     @property
     def analysis_player(self) -> MediaPlayer:
+        self._ensure_started()
         return self._analysis_player
 
-    def load_media(self, source: str) -> Media:
+    def load_media(self, source: str, start_ms: int = 0) -> Media:
         """Создаёт Media из пути или URL.
-        
+
         Args:
             source (str): Путь к медиа-файлу или URL.
+            start_ms (int): С какой позиции начинать воспроизведение, мс.
+                Передается опцией медиа, поэтому VLC сразу читает (и для
+                стрима — запрашивает) данные с этого места, без seek после старта.
 
         Returns:
             Media: Объект Media.
         """
-        return self._vlc_instance.media_new(source)
+        media = self.instance.media_new(source)
+        if start_ms > 0:
+            media.add_option(f":start-time={start_ms / 1000:.3f}")
+        return media
 
-    def play_both(self, source: str) -> None:
+    def play_both(self, source: str, start_ms: int = 0) -> None:
         """Запускает playback сразу, analysis с задержкой для синхронизации.
-        
+
         Args:
             source (str): Путь к медиа-файлу или URL.
+            start_ms (int): Позиция старта обоих плееров, мс.
         """
         self._analysis_timer.stop()
 
-        media_play = self.load_media(source)
-        media_analysis = self.load_media(source)
+        media_play = self.load_media(source, start_ms)
+        media_analysis = self.load_media(source, start_ms)
 
         self._playback_player.set_media(media_play)
         self._analysis_player.set_media(media_analysis)
@@ -89,9 +121,27 @@ class VLCEngine:
 
     def pause_both(self) -> None:
         self._analysis_timer.stop()
+        if not self.started:
+            return
         self._playback_player.pause()
         self._analysis_player.pause()
 
     def resume_both(self) -> None:
+        if not self.started:
+            return
         self._playback_player.play()
-        self._analysis_player.play()
\ No newline at end of file
+        self._analysis_player.play()
+
+    def _ensure_started(self) -> None:
+        """Импортирует ``vlc`` и создает Instance и плееры при первом обращении."""
+        if self._vlc_instance is not None:
+            return
+        import vlc
+
+        self._vlc_instance = vlc.Instance()
+        self._playback_player = self._vlc_instance.media_player_new()
+        self._analysis_player = self._vlc_instance.media_player_new()
+
+        hooks, self._start_hooks = self._start_hooks, []
+        for hook in hooks:
+            hook(self)
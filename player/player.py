@@ -11,13 +11,13 @@ Dependency Inversion: зависит от VLCEngine, а не создаёт VLC-
 from __future__ import annotations
 
 import asyncio
+import os
 
 from PySide6.QtCore import QObject, QTimer, Signal
-from vlc import EventType
 
 from models import Track
 from providers import PathProvider
-from services import AsyncStreamer, TrackHistoryService
+from services import AsyncStreamer, LocalLibrary, MusicLibrary, TrackHistoryService, TrackMetadataService
 from player.engine import VLCEngine
 
 
@@ -41,13 +41,21 @@ class Player(QObject):
         self._engine = VLCEngine()
         self._path_provider = PathProvider()
         self._streamer = AsyncStreamer()
+        self._local_library = LocalLibrary()
+        self._music_library = MusicLibrary()
         self._history_service = TrackHistoryService()
+        self._metadata = TrackMetadataService()
 
         self.current_track: Track | None = None
         self.on_pause: bool = False
+        # Громкость, выставленная до запуска VLC, применяется при его старте.
+        self._volume: int | None = None
 
-        self.events = self._engine.playback_player.event_manager()
-        self.events.event_attach(EventType.MediaPlayerEndReached, self._on_end)
+        self.events = None
+        self._engine.on_started(self._on_engine_started)
+        # _on_end вызывается из потока VLC; запись истории делается уже
+        # в главном потоке, куда сигнал доставляется очередью Qt.
+        self.track_finished.connect(self._record_track_finished)
 
         self._persist_timer = QTimer(self)
         self._persist_timer.setInterval(5000)
@@ -60,8 +68,10 @@ class Player(QObject):
 
     async def play_track(self, track: Track) -> None:
         """Загружает и проигрывает трек (локальный или стрим)."""
-        if self.current_track is not None and self.current_track != track:
-            self._save_progress_background(self.current_track, force=True)
+        if self.current_track is not None:
+            self._history_service.end_play(max(0, self.time), max(0, self.duration), finished=False)
+            if self.current_track != track:
+                self._save_progress_background(self.current_track, force=True)
 
         self.on_pause = False
         self.current_track = track
@@ -70,11 +80,19 @@ class Player(QObject):
         if source is None:
             return
 
-        self._engine.play_both(source)
+        # Позиция продолжения нужна до старта: VLC сразу начинает с нее.
+        # В БД идем, только если ее нет в памяти.
+        resume_pos = self._history_service.peek_resume_position(track)
+        if resume_pos is None:
+            resume_pos = await self._history_service.get_resume_position(track)
+            if self.current_track is not track:
+                return
+
+        self._engine.play_both(source, start_ms=resume_pos)
+        self._history_service.begin_play(track, position_ms=resume_pos)
         # Сразу создаем/обновляем запись в истории, чтобы трек появлялся
         # в "Недавно прослушанных" уже во время прослушивания.
-        self._save_progress_background(track, force=True)
-        self._start_resume_restore(track)
+        self._history_service.mark_track_started(track, position_ms=resume_pos)
         self.track_changed.emit(track)
 
     def pause(self) -> None:
@@ -82,59 +100,92 @@ class Player(QObject):
         self._engine.pause_both()
         if self.current_track is not None:
             self._save_progress_background(self.current_track, force=True)
+            # На паузе буфер истории сбрасывается на диск.
+            self._run_background(self._history_service.flush())
 
     def resume(self) -> None:
         self.on_pause = False
         self._engine.resume_both()
 
     def is_playing(self) -> bool:
+        if not self._engine.started:
+            return False
         return self._engine.playback_player.is_playing()
     
     def _on_end(self, _event=None) -> None:
         """Обрабатывает завершение трека от VLC и эмитит сигнал окончания."""
-        if self.current_track is not None:
-            duration = max(0, self.duration)
-            self._run_background(
-                self._history_service.mark_track_finished(
-                    self.current_track,
-                    position_ms=duration,
-                    duration_ms=duration,
-                )
-            )
         self.track_finished.emit()
 
+    def _record_track_finished(self) -> None:
+        """Сохраняет финальное состояние дослушанного трека."""
+        if self.current_track is None:
+            return
+        duration = max(0, self.duration)
+        self._history_service.end_play(duration, duration, finished=True)
+        self._run_background(
+            self._history_service.mark_track_finished(
+                self.current_track,
+                position_ms=duration,
+                duration_ms=duration,
+            )
+        )
+
     @property
     def volume(self) -> int:
+        if not self._engine.started:
+            return self._volume if self._volume is not None else -1
         return self._engine.playback_player.audio_get_volume()
 
     @volume.setter
     def volume(self, value: int) -> None:
-        self._engine.playback_player.audio_set_volume(value)
+        self._volume = value
+        if self._engine.started:
+            self._engine.playback_player.audio_set_volume(value)
 
     @property
     def time(self) -> int:
         """Текущая позиция воспроизведения в мс."""
+        if not self._engine.started:
+            return 0
         return self._engine.playback_player.get_time()
 
     @time.setter
     def time(self, time_in_ms: int) -> None:
+        if not self._engine.started:
+            return
         self._engine.playback_player.set_time(time_in_ms)
         self._engine.analysis_player.set_time(time_in_ms)
 
     @property
     def duration(self) -> int:
         """Длительность текущего трека в мс."""
+        if not self._engine.started:
+            return 0
         return self._engine.playback_player.get_length()
 
     # --- Internal ---
 
+    def _on_engine_started(self, engine: VLCEngine) -> None:
+        """Подписывается на события VLC после ленивого запуска движка."""
+        from vlc import EventType
+
+        self.events = engine.playback_player.event_manager()
+        self.events.event_attach(EventType.MediaPlayerEndReached, self._on_end)
+        if self._volume is not None:
+            engine.playback_player.audio_set_volume(self._volume)
+
     async def _resolve_source(self, track: Track) -> str | None:
         """Возвращает путь к файлу или URL стрима."""
-        if track.downloaded:
-            try:
-                return self._path_provider.get_track_path(track)
-            except FileNotFoundError:
-                return None
+        if track.source == "local":
+            return await self._local_library.get_path(track)
+        # Путь берется из индекса скачанных: расширение у файлов разное,
+        # а трек мог быть скачан уже после создания объекта.
+        track_path = self._path_provider.find_track_path(track)
+        if track_path is not None:
+            if os.path.isfile(track_path):
+                return track_path
+            # Файл удалили вручную — трек больше не считается скачанным.
+            await self._music_library.forget(track)
         return await self._streamer.get_stream_url(track)
 
     def _persist_current_progress(self) -> None:
@@ -156,19 +207,8 @@ class Player(QObject):
                 force=force,
             )
         )
-
-    def _start_resume_restore(self, track: Track) -> None:
-        """Запускает восстановление позиции воспроизведения в фоне."""
-        self._run_background(self._restore_track_position(track))
-
-    async def _restore_track_position(self, track: Track) -> None:
-        """Восстанавливает позицию для трека после запуска playback."""
-        await asyncio.sleep(0.35)
-        if self.current_track != track:
-            return
-        resume_pos = await self._history_service.get_resume_position(track)
-        if resume_pos > 0:
-            self.time = resume_pos
+        # Длительность, которую знает VLC, нужна спискам треков.
+        self._run_background(self._metadata.remember_duration(track, duration))
 
     @staticmethod
     def _run_background(coro) -> None:
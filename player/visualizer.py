@@ -12,12 +12,13 @@ from __future__ import annotations
 
 import ctypes
 import threading
-from typing import Optional, Tuple
-
-import numpy as np
+from typing import TYPE_CHECKING, Optional, Tuple
 
 from player.engine import VLCEngine
 
+if TYPE_CHECKING:
+    import numpy as np
+
 # --- Константы ---
 DEFAULT_SAMPLE_RATE: int = 44100
 DEFAULT_CHANNELS: int = 2
@@ -61,7 +62,7 @@ class VizualPlayer:
             None, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int64
         )(self._play_callback)
 
-        self._attach()
+        self._engine.on_started(lambda _engine: self._attach())
         self._initialized = True
 
     # --- Public API ---
@@ -71,6 +72,8 @@ class VizualPlayer:
         buf = self._snapshot_buffer()
         if buf is None:
             return None
+        # numpy нужен только при наличии аудио — импорт не попадает на старт.
+        import numpy as np
 
         samples = self._pcm_to_mono(buf)
         if samples is None or samples.size < MIN_FFT_SIZE:
@@ -101,6 +104,8 @@ class VizualPlayer:
 
     def detach(self) -> None:
         """Отключает callbacks от analysis_player."""
+        if not self._engine.started:
+            return
         try:
             self._engine.analysis_player.audio_set_callbacks(
                 None, None, None, None, None, self._opaque
@@ -157,6 +162,8 @@ class VizualPlayer:
             return bytes(self._buffer)
 
     def _pcm_to_mono(self, buf: bytes) -> Optional[np.ndarray]:
+        import numpy as np
+
         try:
             arr = np.frombuffer(buf, dtype=np.int16)
         except Exception:
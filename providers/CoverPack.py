@@ -0,0 +1,293 @@
+"""Упакованное хранилище обложек.
+
+Вместо тысяч маленьких файлов ``covers/ab/cd/<sha1>.jpg`` обложки лежат
+в двух файлах в корне ``covers/``:
+
+* ``covers.pack`` — данные обложек подряд, файл только дописывается;
+* ``covers.idx`` — записи ``sha1(track_key) | offset | length`` по
+  32 байта, тоже только дописывается. Из нескольких записей одного
+  ключа действует последняя.
+
+Индекс читается целиком одним чтением, ``covers.pack`` отображается в
+память (``mmap``), так что чтение обложки — срез ``memoryview`` без
+открытия файлов. Перезаписанные обложки оставляют в ``covers.pack``
+мертвые байты; их убирает сжатие: :meth:`CoverPack.start_compaction`
+(основной поток) -> :meth:`Compaction.write` (рабочий поток) ->
+:meth:`CoverPack.finish_compaction` (основной поток).
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+from dataclasses import dataclass
+
+from providers.path_provider import PathProvider
+
+logger = logging.getLogger(__name__)
+
+PACK_NAME = "covers.pack"
+INDEX_NAME = "covers.idx"
+
+_RECORD = struct.Struct("<20sQI")
+_TMP_SUFFIX = ".tmp"
+
+
+def cover_digest(track_key: str) -> bytes:
+    """Ключ записи в индексе (тот же sha1, что и в раскладке по хешу)."""
+    return hashlib.sha1(track_key.encode("utf-8")).digest()
+
+
+@dataclass(slots=True)
+class Compaction:
+    """Снимок упаковки для сжатия.
+
+    ``write`` выполняется в рабочем потоке и пишет только временные файлы;
+    подменяет упаковку :meth:`CoverPack.finish_compaction`.
+    """
+
+    generation: int
+    entries: dict[bytes, tuple[int, int]]
+    source: mmap.mmap | None
+    pack_path: str
+    index_path: str
+    written: dict[bytes, tuple[int, int]] | None = None
+
+    def write(self) -> None:
+        """Пишет живые обложки во временные файлы рядом с упаковкой."""
+        written: dict[bytes, tuple[int, int]] = {}
+        records = bytearray()
+        offset = 0
+        with open(self.pack_path + _TMP_SUFFIX, "wb") as pack:
+            # Порядок по смещению: исходный файл читается последовательно.
+            for digest, (start, length) in sorted(self.entries.items(), key=lambda item: item[1][0]):
+                pack.write(self.source[start:start + length])
+                written[digest] = (offset, length)
+                records += _RECORD.pack(digest, offset, length)
+                offset += length
+            pack.flush()
+            os.fsync(pack.fileno())
+        with open(self.index_path + _TMP_SUFFIX, "wb") as index:
+            index.write(records)
+            index.flush()
+            os.fsync(index.fileno())
+        self.written = written
+
+    def discard(self) -> None:
+        """Удаляет временные файлы."""
+        for path in (self.pack_path, self.index_path):
+            try:
+                os.remove(path + _TMP_SUFFIX)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.exception("Не удалось удалить временный файл %s", path + _TMP_SUFFIX)
+
+
+class CoverPack:
+    """Обложки в одном отображенном в память файле.
+
+    Индекс загружается лениво при первом обращении. Методы потокобезопасны:
+    сжатие пишет копию упаковки в рабочем потоке, пока основной поток
+    читает и дописывает ее.
+    """
+
+    _instance: CoverPack | None = None
+
+    def __new__(cls, *args, **kwargs) -> CoverPack:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self, directory: str = PathProvider.COVERS_FOLDER) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        directory = directory.replace("\\", "/").rstrip("/")
+        self._pack_path = f"{directory}/{PACK_NAME}"
+        self._index_path = f"{directory}/{INDEX_NAME}"
+        self._lock = threading.Lock()
+        self._entries: dict[bytes, tuple[int, int]] | None = None
+        self._map: mmap.mmap | None = None
+        self._mapped_size = 0
+        self._pack_size = 0
+        self._live_bytes = 0
+        # Растет с каждой записью: сжатие, начатое до записи, отменяется.
+        self._generation = 0
+        self._initialized = True
+
+    def __contains__(self, track_key: str) -> bool:
+        with self._lock:
+            return cover_digest(track_key) in self._load()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._load())
+
+    @property
+    def dead_ratio(self) -> float:
+        """Доля мертвых байтов в ``covers.pack``."""
+        with self._lock:
+            self._load()
+            if not self._pack_size:
+                return 0.0
+            return 1 - self._live_bytes / self._pack_size
+
+    def get(self, track_key: str) -> memoryview | None:
+        """Данные обложки (срез отображения, без копирования) или ``None``.
+
+        Срез нужно отпустить сразу после декодирования: пока он жив,
+        отображение нельзя закрыть при сжатии.
+        """
+        with self._lock:
+            entry = self._load().get(cover_digest(track_key))
+            if entry is None:
+                return None
+            offset, length = entry
+            if offset + length > self._mapped_size and not self._remap():
+                return None
+            return memoryview(self._map)[offset:offset + length]
+
+    def put(self, track_key: str, data: bytes) -> None:
+        """Дописывает обложку в упаковку."""
+        if not data:
+            return
+        digest = cover_digest(track_key)
+        with self._lock:
+            entries = self._load()
+            os.makedirs(os.path.dirname(self._pack_path) or ".", exist_ok=True)
+            with open(self._pack_path, "ab") as pack:
+                offset = pack.tell()
+                pack.write(data)
+            # Запись индекса идет после данных: оборванная запись данных
+            # без записи индекса просто не видна.
+            with open(self._index_path, "ab") as index:
+                index.write(_RECORD.pack(digest, offset, len(data)))
+            previous = entries.get(digest)
+            if previous is not None:
+                self._live_bytes -= previous[1]
+            entries[digest] = (offset, len(data))
+            self._live_bytes += len(data)
+            self._pack_size = offset + len(data)
+            self._generation += 1
+
+    def start_compaction(self) -> Compaction | None:
+        """Снимок для сжатия или ``None``, если сжимать нечего."""
+        with self._lock:
+            entries = self._load()
+            if self._live_bytes == self._pack_size:
+                return None
+            if self._pack_size > self._mapped_size and not self._remap():
+                return None
+            return Compaction(
+                generation=self._generation,
+                entries=dict(entries),
+                source=self._map,
+                pack_path=self._pack_path,
+                index_path=self._index_path,
+            )
+
+    def finish_compaction(self, compaction: Compaction) -> bool:
+        """Подменяет упаковку сжатой копией.
+
+        Returns:
+            ``False``, если после снимка были записи или отображение еще
+            используется — тогда временные файлы удаляются, а сжатие
+            повторится позже.
+        """
+        with self._lock:
+            if compaction.written is None or compaction.generation != self._generation:
+                compaction.discard()
+                return False
+            compaction.source = None
+            try:
+                self._close_map()
+            except BufferError:
+                compaction.discard()
+                return False
+            try:
+                os.replace(self._pack_path + _TMP_SUFFIX, self._pack_path)
+            except OSError:
+                logger.exception("Не удалось заменить упаковку обложек")
+                compaction.discard()
+                return False
+            try:
+                os.replace(self._index_path + _TMP_SUFFIX, self._index_path)
+            except OSError:
+                # Данные уже новые, индекс старый — упаковка потеряна.
+                # Обложки кэшируемые: они скачаются заново.
+                logger.exception("Не удалось заменить индекс упаковки обложек")
+                compaction.discard()
+                self._reset()
+                return False
+            self._entries = compaction.written
+            self._pack_size = self._live_bytes = sum(length for _, length in self._entries.values())
+            self._generation += 1
+            return True
+
+    def close(self) -> None:
+        """Закрывает отображение (при выходе из приложения)."""
+        with self._lock:
+            try:
+                self._close_map()
+            except BufferError:
+                pass
+
+    # --- internal ---
+
+    def _load(self) -> dict[bytes, tuple[int, int]]:
+        if self._entries is not None:
+            return self._entries
+        entries: dict[bytes, tuple[int, int]] = {}
+        try:
+            pack_size = os.path.getsize(self._pack_path)
+            with open(self._index_path, "rb") as index:
+                data = index.read()
+        except FileNotFoundError:
+            pack_size, data = 0, b""
+        data = data[: len(data) - len(data) % _RECORD.size]
+        for digest, offset, length in _RECORD.iter_unpack(data):
+            # Запись за концом данных — след оборванной записи.
+            if offset + length <= pack_size:
+                entries[digest] = (offset, length)
+        self._entries = entries
+        self._pack_size = pack_size
+        self._live_bytes = sum(length for _, length in entries.values())
+        return entries
+
+    def _remap(self) -> bool:
+        """Отображает ``covers.pack`` заново (файл вырос после отображения)."""
+        try:
+            with open(self._pack_path, "rb") as pack:
+                mapped = mmap.mmap(pack.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            logger.exception("Не удалось отобразить упаковку обложек %s", self._pack_path)
+            return False
+        # Старое отображение не закрывается явно: на него могут ссылаться
+        # срезы, выданные get(); оно закроется, когда они будут освобождены.
+        self._map = mapped
+        self._mapped_size = len(mapped)
+        return True
+
+    def _reset(self) -> None:
+        for path in (self._index_path, self._pack_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                logger.exception("Не удалось удалить файл упаковки %s", path)
+        self._entries = {}
+        self._pack_size = self._live_bytes = 0
+        self._generation += 1
+
+    def _close_map(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+            self._mapped_size = 0
@@ -0,0 +1,147 @@
+"""Индекс скачанных треков в памяти.
+
+``track_key`` -> :class:`database.LibraryFile`: проверка "скачан ли трек"
+и поиск пути к файлу — обращение к словарю, без чтения диска. Индекс
+загружает из БД и сверяет с диском ``services.MusicLibrary``.
+
+Файлы лежат в раскладке по хешу (см. ``providers.path_provider``);
+разбор имен ``{track_id}_{title}_{author}.{format}`` нужен только для
+файлов старой плоской раскладки, которые переносит
+``providers.storage_migrator``.
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Iterable
+
+from database import LibraryFile
+from providers.local_files import LOCAL_ID_PREFIX
+
+# Форматы, которые дают загрузчики (YouTube bestaudio — m4a/webm/opus).
+AUDIO_FORMATS = frozenset({"mp3", "m4a", "webm", "opus"})
+
+
+def source_for_id(track_id: str) -> str:
+    """Источник трека по его id: у Яндекса id числовые, у локальных — с префиксом."""
+    track_id = str(track_id)
+    if track_id.isdigit():
+        return "yandex"
+    if track_id.startswith(LOCAL_ID_PREFIX):
+        return "local"
+    return "youtube"
+
+
+def build_track_key(source: str, track_id: int | str) -> str:
+    """Ключ трека (совпадает с ключом истории и плейлистов)."""
+    return f"{source}:{track_id}"
+
+
+def parse_file_name(file_name: str) -> tuple[str, str, str, str] | None:
+    """Разбирает имя файла старой раскладки.
+
+    Returns:
+        ``(track_id, title, author, format)`` или ``None``, если имя
+        не похоже на скачанный трек.
+    """
+    stem, ext = os.path.splitext(file_name)
+    file_format = ext[1:].lower()
+    if file_format not in AUDIO_FORMATS:
+        return None
+    parts = stem.split("_", 2)
+    if len(parts) < 3 or not parts[0]:
+        return None
+    track_id, title, author = parts
+    return track_id, title, author, file_format
+
+
+def file_from_entry(path: str, stat: os.stat_result) -> LibraryFile | None:
+    """Запись индекса для файла на диске или ``None``, если это не трек."""
+    parsed = parse_file_name(os.path.basename(path))
+    if parsed is None:
+        return None
+    track_id, title, author, file_format = parsed
+    return LibraryFile(
+        track_key=build_track_key(source_for_id(track_id), track_id),
+        path=path,
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        format=file_format,
+        title=title,
+        author=author,
+    )
+
+
+def scan_directory(directory: str, known: dict[str, LibraryFile]) -> list[LibraryFile]:
+    """Один проход ``os.scandir`` по папке (без вложенных папок).
+
+    Args:
+        directory: Папка со скачанными треками.
+        known: Уже проиндексированные файлы ``path -> LibraryFile``; для них
+            ``stat`` не вызывается.
+
+    Returns:
+        Все треки папки.
+    """
+    files: list[LibraryFile] = []
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            path = os.path.join(directory, entry.name).replace("\\", "/")
+            file = known.get(path)
+            if file is None:
+                if not entry.is_file() or parse_file_name(entry.name) is None:
+                    continue
+                try:
+                    file = file_from_entry(path, entry.stat())
+                except OSError:
+                    continue
+            files.append(file)
+    return files
+
+
+class LibraryIndex:
+    """Скачанные треки по ``track_key``."""
+
+    _instance: LibraryIndex | None = None
+
+    def __new__(cls, *args, **kwargs) -> LibraryIndex:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._files: dict[str, LibraryFile] = {}
+        # False, пока индекс не загружен из БД: до этого все треки "не скачаны".
+        self.loaded = False
+        self._initialized = True
+
+    def __contains__(self, track_key: str) -> bool:
+        return track_key in self._files
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get(self, track_key: str) -> LibraryFile | None:
+        """Файл трека или ``None``."""
+        return self._files.get(track_key)
+
+    def files(self) -> list[LibraryFile]:
+        """Все файлы индекса."""
+        return list(self._files.values())
+
+    def replace(self, files: Iterable[LibraryFile]) -> None:
+        """Заменяет содержимое индекса целиком."""
+        self._files = {file.track_key: file for file in files}
+        self.loaded = True
+
+    def put(self, file: LibraryFile) -> None:
+        """Добавляет или обновляет файл трека."""
+        self._files[file.track_key] = file
+
+    def discard(self, track_key: str) -> None:
+        """Убирает трек из индекса."""
+        self._files.pop(track_key, None)
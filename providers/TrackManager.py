@@ -1,5 +1,5 @@
-from models import YandexTrack, YoutubeTrack
-from pathlib import Path
+from models import LocalTrack, YandexTrack, YoutubeTrack
+from providers.LibraryIndex import LibraryIndex, build_track_key, source_for_id
 
 
 class TrackManager:
@@ -11,51 +11,47 @@ class TrackManager:
             cls._instance = super().__new__(cls, *args, **kwargs)
         return cls._instance
 
-    def __init__(self, music_dir="music/"):
-        self.music_dir = Path(music_dir)
-        self._ids_cache = None
-
-    @property
-    def ids(self):
-        if self._ids_cache is None:
-            self._ids_cache = self._load_ids()
-        return self._ids_cache
-
-    def _load_ids(self):
-        ids = set()
-        if not self.music_dir.exists():
-            return ids
-        for track_file in self.music_dir.iterdir():
-            if track_file.suffix in (".mp3", ".m4a"):
-                track_id = track_file.stem.split("_")[0]
-                ids.add(track_id)
-        return ids
-
-    def is_downloaded(self, track_id):
-        return track_id in self.ids
-
-    def get_track_from_playlist(self, track_id: str, title: str, author: str) -> YandexTrack | YoutubeTrack:
+    def __init__(self):
+        self._library = LibraryIndex()
+
+    def is_downloaded(self, track_id, source: str | None = None) -> bool:
+        """Скачан ли трек (проверка по индексу, без обращения к диску).
+
+        Args:
+            track_id: id трека
+            source: источник трека; если не указан, определяется по id
+        """
+        source = source or source_for_id(str(track_id))
+        return build_track_key(source, track_id) in self._library
+
+    def get_track_from_playlist(
+        self, track_id: str, title: str, author: str, source: str | None = None
+    ) -> YandexTrack | YoutubeTrack | LocalTrack:
         """Получаем трек по его id, названию и автору
 
         Args:
             track_id (str): id трека
             title (str): название трека
             author (str): автор трека
+            source (str | None): источник трека; если не указан, определяется по id
 
         Returns:
-            YandexTrack | YoutubeTrack: трек
+            YandexTrack | YoutubeTrack | LocalTrack: трек
         """
-        if track_id.isdigit():
+        source = source or source_for_id(track_id)
+        if source == "local":
+            return LocalTrack(track_id=track_id, title=title, author=author)
+        if source == "yandex":
             return YandexTrack(
                 track_id=int(track_id),
                 title=title,
                 author=author,
-                downloaded=self.is_downloaded(track_id),
+                downloaded=self.is_downloaded(track_id, "yandex"),
             )
         else:
             return YoutubeTrack(
                 track_id=track_id,
                 title=title,
                 author=author,
-                downloaded=self.is_downloaded(track_id),
+                downloaded=self.is_downloaded(track_id, "youtube"),
             )
\ No newline at end of file
@@ -1,3 +1,5 @@
 from providers.path_provider import PathProvider
+from providers.LibraryIndex import LibraryIndex
+from providers.CoverPack import CoverPack
 from providers.TrackManager import TrackManager
 from providers.PlaylistManager import PlaylistManager
\ No newline at end of file
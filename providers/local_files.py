@@ -0,0 +1,130 @@
+"""Обход папок пользователя и чтение тегов локальных файлов.
+
+Функции синхронные и вызываются из рабочих потоков ``services.LocalLibrary``.
+
+Обход инкрементальный: папка, mtime которой совпадает с сохраненным,
+не читается — состав ее файлов не менялся. В такие папки обход спускается
+по сохраненному списку подпапок, так что повторный обход без изменений —
+это один ``stat`` на папку.
+
+Теги читаются через ``mutagen``, если он установлен; иначе название и
+исполнитель берутся из имени файла ``Исполнитель - Название``.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+from dataclasses import dataclass, field
+
+# Расширения, которые индексируются (VLC проигрывает все).
+LOCAL_FORMATS = frozenset({".mp3", ".m4a", ".flac", ".ogg", ".opus", ".wav", ".aac", ".wma"})
+# Префикс id локальных треков: по нему источник узнается без ключа.
+LOCAL_ID_PREFIX = "local-"
+
+_UNKNOWN_AUTHOR = "Неизвестный исполнитель"
+
+
+def normalize_dir(path: str) -> str:
+    """Абсолютный путь папки с ``/`` в качестве разделителя и без ``/`` на конце."""
+    return os.path.abspath(path).replace("\\", "/").rstrip("/")
+
+
+def local_track_id(path: str) -> str:
+    """Стабильный id локального трека по пути к файлу."""
+    return LOCAL_ID_PREFIX + hashlib.sha1(path.encode("utf-8")).hexdigest()[:16]
+
+
+@dataclass(slots=True)
+class WalkResult:
+    """Результат обхода.
+
+    Attributes:
+        dir_mtimes: Все существующие папки и их текущий mtime.
+        changed: Изменившиеся папки -> аудиофайлы ``(path, size, mtime_ns)``.
+    """
+
+    dir_mtimes: dict[str, int] = field(default_factory=dict)
+    changed: dict[str, list[tuple[str, int, int]]] = field(default_factory=dict)
+
+
+def walk_changed(roots: list[str], saved_mtimes: dict[str, int]) -> WalkResult:
+    """Обходит ``roots`` и собирает файлы изменившихся папок.
+
+    Args:
+        roots: Нормализованные корневые папки (см. :func:`normalize_dir`).
+        saved_mtimes: mtime папок с прошлого обхода.
+    """
+    saved_children: dict[str, list[str]] = {}
+    for path in saved_mtimes:
+        saved_children.setdefault(path.rpartition("/")[0], []).append(path)
+
+    result = WalkResult()
+    stack = list(roots)
+    while stack:
+        directory = stack.pop()
+        if directory in result.dir_mtimes:
+            continue
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            continue
+        result.dir_mtimes[directory] = mtime_ns
+        if saved_mtimes.get(directory) == mtime_ns:
+            stack.extend(saved_children.get(directory, ()))
+            continue
+        files: list[tuple[str, int, int]] = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    path = f"{directory}/{entry.name}"
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(path)
+                        elif os.path.splitext(entry.name)[1].lower() in LOCAL_FORMATS:
+                            stat = entry.stat()
+                            files.append((path, stat.st_size, stat.st_mtime_ns))
+                    except OSError:
+                        continue
+        except OSError:
+            continue
+        result.changed[directory] = files
+    return result
+
+
+def read_tags(path: str) -> tuple[str, str, str, int]:
+    """Читает теги файла.
+
+    Returns:
+        ``(title, author, album, duration_ms)``; отсутствующие теги
+        заменяются данными из имени файла.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    author, sep, title = stem.partition(" - ")
+    if not sep:
+        author, title = _UNKNOWN_AUTHOR, stem
+    album, duration_ms = "", 0
+    try:
+        import mutagen
+    except ImportError:
+        return title.strip(), author.strip(), album, duration_ms
+
+    try:
+        audio = mutagen.File(path, easy=True)
+    except Exception:
+        audio = None
+    if audio is not None:
+        title = _first_tag(audio, "title") or title
+        author = _first_tag(audio, "artist") or author
+        album = _first_tag(audio, "album")
+        length = getattr(audio.info, "length", 0) or 0
+        duration_ms = int(length * 1000)
+    return title.strip(), author.strip(), album.strip(), duration_ms
+
+
+def _first_tag(audio, name: str) -> str:
+    try:
+        values = audio.get(name)
+    except Exception:
+        return ""
+    return str(values[0]) if values else ""
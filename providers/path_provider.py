@@ -1,5 +1,22 @@
-from os import path
+"""Пути к скачанным трекам и обложкам.
+
+Файлы раскладываются по хешу ключа трека (``source:track_id``) в два
+уровня подпапок: ``music/ab/cd/abcd….mp3``, ``covers/ab/cd/abcd….jpg``.
+В имени нет названия и автора — они хранятся в индексе библиотеки
+(см. ``providers.LibraryIndex``), а в одной папке никогда не копятся
+десятки тысяч файлов.
+"""
+
+import hashlib
+
 from models import Track
+from providers.LibraryIndex import LibraryIndex
+
+
+def sharded_path(folder: str, track_key: str, extension: str) -> str:
+    """Путь файла трека в раскладке по хешу: ``folder/ab/cd/<sha1>.<extension>``."""
+    digest = hashlib.sha1(track_key.encode("utf-8")).hexdigest()
+    return f"{folder.rstrip('/')}/{digest[:2]}/{digest[2:4]}/{digest}.{extension}"
 
 
 class PathProvider:
@@ -13,7 +30,13 @@ class PathProvider:
         return cls._instance
 
     def get_track_path(self, track: Track, extension: str = "mp3") -> str:
-        return path.join(self.MUSIC_FOLDER, f"{track.track_id}_{track.title}_{track.author}.{extension}")
-    
+        """Путь, куда скачивается трек (для уже скачанного см. ``find_track_path``)."""
+        return sharded_path(self.MUSIC_FOLDER, track.key, extension)
+
+    def find_track_path(self, track: Track) -> str | None:
+        """Путь к скачанному файлу трека по индексу или ``None``."""
+        file = LibraryIndex().get(track.key)
+        return None if file is None else file.path
+
     def get_cover_path(self, track: Track, extension: str = "jpg") -> str:
-        return path.join(self.COVERS_FOLDER, f"{track.track_id}.{extension}")
\ No newline at end of file
+        return sharded_path(self.COVERS_FOLDER, track.key, extension)
\ No newline at end of file
@@ -0,0 +1,88 @@
+"""Перенос файлов из плоской раскладки в раскладку по хешу.
+
+Старая раскладка: ``music/{id}_{title}_{author}.{ext}`` и
+``covers/{id}.jpg`` прямо в корне папок. Файл переносится через
+``os.replace`` внутри той же папки — без копирования данных, поэтому
+прерванный перенос безопасно продолжить при следующем запуске.
+
+Функции синхронные и вызываются в рабочем потоке.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from dataclasses import replace
+from typing import Iterable
+
+from database import LibraryFile
+from providers.LibraryIndex import build_track_key, source_for_id
+from providers.path_provider import sharded_path
+
+logger = logging.getLogger(__name__)
+
+_COVER_FORMATS = frozenset({".jpg", ".jpeg", ".png"})
+
+
+def migrate_tracks(
+    files: Iterable[LibraryFile], music_dir: str
+) -> tuple[list[LibraryFile], list[str]]:
+    """Переносит файлы треков в раскладку по хешу.
+
+    Returns:
+        Записи с новыми путями и ключи треков, файлов которых больше нет.
+    """
+    moved: list[LibraryFile] = []
+    missing: list[str] = []
+    for file in files:
+        target = sharded_path(music_dir, file.track_key, file.format)
+        path = _move(file.path, target)
+        if path is None:
+            missing.append(file.track_key)
+        elif path != file.path:
+            moved.append(replace(file, path=path))
+    return moved, missing
+
+
+def migrate_covers(covers_dir: str) -> int:
+    """Переносит обложки ``{id}.jpg`` из корня папки в раскладку по хешу.
+
+    Returns:
+        Число перенесенных файлов.
+    """
+    covers_dir = covers_dir.rstrip("/")
+    moved = 0
+    try:
+        with os.scandir(covers_dir) as entries:
+            names = [entry.name for entry in entries if entry.is_file()]
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        track_id, ext = os.path.splitext(name)
+        if not track_id or ext.lower() not in _COVER_FORMATS:
+            continue
+        track_key = build_track_key(source_for_id(track_id), track_id)
+        target = sharded_path(covers_dir, track_key, ext[1:].lower())
+        if _move(f"{covers_dir}/{name}", target) == target:
+            moved += 1
+    return moved
+
+
+def _move(source: str, target: str) -> str | None:
+    """Переносит файл.
+
+    Returns:
+        Путь, по которому файл лежит теперь (``source``, если перенос не
+        удался), или ``None``, если файла нет ни там, ни там.
+    """
+    if source == target:
+        return target if os.path.isfile(target) else None
+    try:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+    except FileNotFoundError:
+        return target if os.path.isfile(target) else None
+    except OSError:
+        logger.exception("Не удалось перенести файл %s -> %s", source, target)
+        return source
+    return target
@@ -9,9 +9,8 @@ from pathlib import Path
 from config import GetClients
 from models.Tracks import Track
 from providers import PathProvider
-
-import aiohttp
-from yt_dlp import YoutubeDL
+from services.MusicLibrary import MusicLibrary
+from services.TrackMetadataService import TrackMetadataService, yandex_metadata
 
 F = TypeVar('F', bound=Callable[..., Any])
 logger = logging.getLogger(__name__)
@@ -33,11 +32,28 @@ def log(method: F) -> F:
     return wrapper
 
 
+async def download_file(url: str, path: str) -> bool:
+    """Скачивает файл по URL; ``False``, если сервер ответил не 200."""
+    import aiohttp
+
+    async with aiohttp.ClientSession() as session:
+        async with session.get(url) as response:
+            if response.status != 200:
+                return False
+            data = await response.read()
+
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as file:
+        file.write(data)
+    return True
+
+
 class AsyncDownloaderInterface(ABC):
     """Абстрактный класс для Downloader'ов"""
     
     @abstractmethod
-    async def download_track(self, track: Track) -> None:
+    async def download_track(self, track: Track) -> str | None:
+        """Скачивает трек и возвращает путь к файлу (``None`` — не удалось)."""
         ...
     
     @abstractmethod
@@ -50,23 +66,43 @@ class AsyncYandexDownloader(AsyncDownloaderInterface):
 
     def __init__(self):
         self.path_provider = PathProvider()
-        self.client = GetClients().get_yandex_client()
-    
-    async def download_track(self, track: Track) -> None:
+        self._clients = GetClients()
+        self.client = None
+        self._metadata = TrackMetadataService()
+
+    async def _get_client(self):
         if self.client is None:
-            return
+            self.client = await self._clients.get_yandex_client()
+        return self.client
+    
+    async def download_track(self, track: Track) -> str | None:
+        if await self._get_client() is None:
+            return None
+        track_path = self.path_provider.get_track_path(track)
         try:
             track_info = await self.client.tracks(track.track_id)
-            await track_info[0].download_async(self.path_provider.get_track_path(track))
+            self._metadata.remember(yandex_metadata(track_info[0]))
+            Path(track_path).parent.mkdir(parents=True, exist_ok=True)
+            await track_info[0].download_async(track_path)
         except Exception:
             logger.exception("Не удалось скачать трек с Яндекс.Музыки: %s", track)
+            return None
+        return track_path
 
     async def download_cover(self, track: Track) -> None:
-        if self.client is None:
+        cover_path = self.path_provider.get_cover_path(track)
+        # URL обложки из выдачи поиска: трек не запрашивается заново.
+        meta = await self._metadata.get_fresh(track.key)
+        if meta is not None and meta.cover_url:
+            if await download_file(meta.cover_url, cover_path):
+                return
+        if await self._get_client() is None:
             return
         try:
             track_info = await self.client.tracks(track.track_id)
-            await track_info[0].downloadCoverAsync(self.path_provider.get_cover_path(track), "200x200")
+            self._metadata.remember(yandex_metadata(track_info[0]))
+            Path(cover_path).parent.mkdir(parents=True, exist_ok=True)
+            await track_info[0].downloadCoverAsync(cover_path, "200x200")
         except Exception:
             logger.exception("Не удалось скачать обложку с Яндекс.Музыки: %s", track)
         
@@ -85,40 +121,46 @@ class AsyncYoutubeDownloader(AsyncDownloaderInterface):
         }
         adv_opts = self.opts
         adv_opts["skip_download"] = True
-        self.yt = YoutubeDL(adv_opts)
+        self._yt = None
         self.path_provider = PathProvider()
+
+    @property
+    def yt(self):
+        """Экземпляр YoutubeDL; yt_dlp импортируется при первом обращении."""
+        if self._yt is None:
+            from yt_dlp import YoutubeDL
+
+            self._yt = YoutubeDL(self.opts)
+        return self._yt
     
-    async def download_track(self, track: Track) -> None:
-        # Формируем единый шаблон имени файла для корректного чтения плейлистов.
+    async def download_track(self, track: Track) -> str | None:
+        # Расширение выбирает yt_dlp; путь — в раскладке по хешу ключа трека.
         self.opts["outtmpl"] = self.path_provider.get_track_path(track, extension="%(ext)s")
         with ThreadPoolExecutor() as pool:
-            await get_running_loop().run_in_executor(pool, self.sync_download, self.opts, track.track_id)
-        track.track_path = self.opts["outtmpl"]
+            track_path = await get_running_loop().run_in_executor(
+                pool, self.sync_download, self.opts, track.track_id
+            )
+        return track_path
             
     async def download_cover(self, track: Track) -> None:
         cover_url = f"https://img.youtube.com/vi/{track.track_id}/hqdefault.jpg"
-        track.cover_path = self.path_provider.get_cover_path(track)
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(cover_url) as response:
-                if response.status != 200:
-                    return
-                data = await response.read()
-
-                Path(track.cover_path).parent.mkdir(parents=True, exist_ok=True)
-                with open(track.cover_path, "wb") as file:
-                    file.write(data)
+        await download_file(cover_url, self.path_provider.get_cover_path(track))
     
     @staticmethod
-    def sync_download(opts: dict, track_id: str) -> None:
+    def sync_download(opts: dict, track_id: str) -> str | None:
+        """Скачивает трек и возвращает фактический путь (расширение выбирает yt_dlp)."""
+        from yt_dlp import YoutubeDL
+
         try:
             with YoutubeDL(opts) as ydl:
-                ydl.extract_info(
+                info = ydl.extract_info(
                     f"https://youtube.com/watch?v={track_id}",
                     download=True
                 )
+                return ydl.prepare_filename(info)
         except Exception:
             logger.exception("Не удалось скачать трек с YouTube: %s", track_id)
+            return None
 
 
 class AsyncDownloader(AsyncDownloaderInterface):
@@ -126,13 +168,20 @@ class AsyncDownloader(AsyncDownloaderInterface):
     def __init__(self):
         self._yandex_downloader = AsyncYandexDownloader()
         self._youtube_downloader = AsyncYoutubeDownloader()
+        self._library = MusicLibrary()
 
-    async def download_track(self, track: Track) -> None:
+    async def download_track(self, track: Track) -> str | None:
         match track.source:
             case "yandex":
-                await self._yandex_downloader.download_track(track)
+                track_path = await self._yandex_downloader.download_track(track)
             case "youtube":
-                await self._youtube_downloader.download_track(track)
+                track_path = await self._youtube_downloader.download_track(track)
+            case _:
+                return None
+        if track_path is not None:
+            # Индекс обновляется сразу, не дожидаясь события от файловой системы.
+            await self._library.add_download(track, track_path)
+        return track_path
 
     async def download_cover(self, track: Track) -> None:
         match track.source:
@@ -1,23 +1,27 @@
 """
 Асинхронный поиск треков по платформам:
+Локальная музыка
 Yandex
 Youtube
 """
 
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
-from asyncio import get_running_loop
-
-import yandex_music.exceptions
+from asyncio import gather, get_running_loop
 
+from database import TrackMetadata
 from models import Track, YandexTrack, YoutubeTrack
 from config import GetClients
+from providers.LibraryIndex import build_track_key, source_for_id
+from services.LocalLibrary import LocalLibrary
+from services.TrackMetadataService import TrackMetadataService, yandex_metadata, youtube_metadata
 
 
 class AsyncFinderInterface(ABC):
 
     @abstractmethod
-    async def get_tracks(self, title: str, value: int = 5) -> list[Track]:
+    async def get_tracks(self, title: str, value: int = 5, page: int = 0) -> list[Track]:
+        """Ищет треки. ``page`` — номер страницы выдачи, начиная с нуля."""
         ...
 
     @abstractmethod
@@ -28,13 +32,26 @@ class AsyncFinderInterface(ABC):
 class AsyncYandexFinder(AsyncFinderInterface):
 
     def __init__(self):
-        self.client = GetClients().get_yandex_client()
+        self._clients = GetClients()
+        self.client = None
+        self._metadata = TrackMetadataService()
 
-    async def get_tracks(self, title: str, value: int = 5) -> list[Track]:
+    async def _get_client(self):
         if self.client is None:
+            self.client = await self._clients.get_yandex_client()
+        return self.client
+
+    async def get_tracks(self, title: str, value: int = 5, page: int = 0) -> list[Track]:
+        if await self._get_client() is None:
             return []
+        # Модуль уже загружен вместе с клиентом — импорт здесь ничего не стоит.
+        import yandex_music.exceptions
+
         try:
-            tracks = await self.client.search(title)
+            tracks = await self.client.search(title, page=page)
+            if tracks["tracks"] is None:
+                return []
+            self._metadata.remember_many(yandex_metadata(track) for track in tracks["tracks"]["results"])
             return [YandexTrack(
                                 track["id"],
                                 track["title"],
@@ -49,11 +66,18 @@ class AsyncYandexFinder(AsyncFinderInterface):
             return []
 
     async def get_track(self, id: int) -> Track | None:
-        if self.client is None:
+        # Трек, который уже попадался в выдаче, берется из track_metadata.
+        meta = await self._metadata.get_fresh(build_track_key("yandex", id))
+        if meta is not None and meta.title:
+            return YandexTrack(id, meta.title, meta.author, downloaded=False)
+        if await self._get_client() is None:
             return None
+        import yandex_music.exceptions
+
         try:
             track_info = await self.client.tracks(id)
             track = track_info[0]
+            self._metadata.remember(yandex_metadata(track))
             return YandexTrack(
                                 track["id"],
                                 track["title"],
@@ -68,27 +92,50 @@ class AsyncYandexFinder(AsyncFinderInterface):
 class AsyncYoutubeFinder(AsyncFinderInterface):
 
     def __init__(self) -> None:
-        self.client = GetClients().get_youtube_client()
+        self._clients = GetClients()
+        self.client = None
+        self._metadata = TrackMetadataService()
 
-    async def get_tracks(self, title: str, value: int = 5) -> list[Track]:
+    async def _get_client(self):
+        if self.client is None:
+            self.client = await self._clients.get_youtube_client()
+        return self.client
+
+    async def get_tracks(self, title: str, value: int = 5, page: int = 0) -> list[Track]:
+        if await self._get_client() is None:
+            return []
         with ThreadPoolExecutor() as pool:
             loop = get_running_loop()
-            tracks = await loop.run_in_executor(pool, self.sync_get_tracks, title, value)
+            tracks, metadata = await loop.run_in_executor(pool, self.sync_get_tracks, title, value, page)
+        self._metadata.remember_many(metadata)
         return tracks
 
     async def get_track(self, id: int) -> Track | None:
+        meta = await self._metadata.get_fresh(build_track_key("youtube", id))
+        if meta is not None and meta.title:
+            return YoutubeTrack(track_id=id, title=meta.title, author=meta.author, downloaded=False)
+        if await self._get_client() is None:
+            return None
         with ThreadPoolExecutor() as pool:
             loop = get_running_loop()
-            track = await loop.run_in_executor(pool, self.sync_get_track, id)
+            track, meta = await loop.run_in_executor(pool, self.sync_get_track, id)
+        if meta is not None:
+            self._metadata.remember(meta)
         return track
 
-    def sync_get_tracks(self, title: str, value: int = 5) -> list[Track]:
+    def sync_get_tracks(
+        self, title: str, value: int = 5, page: int = 0
+    ) -> tuple[list[Track], list[TrackMetadata]]:
+        """Треки страницы выдачи и попутные сведения о них (длительность, обложка, альбом)."""
+        # У YTMusic нет смещения — запрашиваем с запасом и отрезаем нужную страницу.
+        offset = max(0, page) * value
         try:
-            results = self.client.search(query=title, filter="songs", limit=value)
+            results = self.client.search(query=title, filter="songs", limit=offset + value)
         except Exception:
-            return []
+            return [], []
         tracks = []
-        for track in results:
+        metadata = []
+        for track in results[offset:offset + value]:
             track_id = track.get("videoId")
             track_title = track.get("title")
             authors = " | ".join([author["name"] for author in track["artists"]])
@@ -100,30 +147,53 @@ class AsyncYoutubeFinder(AsyncFinderInterface):
                     downloaded=False
                 )
             )
-        return tracks
+            if track_id:
+                metadata.append(youtube_metadata(track_id, track))
+        return tracks, metadata
 
-    def sync_get_track(self, id: int) -> Track | None:
+    def sync_get_track(self, id: int) -> tuple[Track | None, TrackMetadata | None]:
         results = self.client.get_song(id)
         if not results:
-            return None
-        track_id = results.get("videoId") or id
-        track_title = results.get("title", "")
-        authors = " | ".join([author["name"] for author in results.get("artists", [])])
-        return YoutubeTrack(track_id=track_id, title=track_title, author=authors, downloaded=False)
+            return None, None
+        # get_song отдает сведения о видео в videoDetails.
+        details = results.get("videoDetails") or results
+        track_id = details.get("videoId") or id
+        meta = youtube_metadata(track_id, results)
+        return YoutubeTrack(track_id=track_id, title=meta.title, author=meta.author, downloaded=False), meta
+
+
+class AsyncLocalFinder(AsyncFinderInterface):
+    """Поиск по индексу локальной музыки (без сети)."""
+
+    def __init__(self) -> None:
+        self._library = LocalLibrary()
+
+    async def get_tracks(self, title: str, value: int = 5, page: int = 0) -> list[Track]:
+        return await self._library.search(title, limit=value, offset=max(0, page) * value)
+
+    async def get_track(self, id: str) -> Track | None:
+        return await self._library.get_track(str(id))
 
 
 class AsyncFinder(AsyncFinderInterface):
 
     def __init__(self):
+        self._local_finder = AsyncLocalFinder()
         self._yandex_finder = AsyncYandexFinder()
         self._youtube_finder = AsyncYoutubeFinder()
 
-    async def get_tracks(self, title: str, value: int = 5) -> list[Track]:
-        yandex_tracks = await self._yandex_finder.get_tracks(title, value)
-        youtube_tracks = await self._youtube_finder.get_tracks(title, value)
-        return yandex_tracks + youtube_tracks
+    async def get_tracks(self, title: str, value: int = 5, page: int = 0) -> list[Track]:
+        # Платформы опрашиваются параллельно: задержка равна самой медленной из них.
+        local_tracks, yandex_tracks, youtube_tracks = await gather(
+            self._local_finder.get_tracks(title, value, page),
+            self._yandex_finder.get_tracks(title, value, page),
+            self._youtube_finder.get_tracks(title, value, page),
+        )
+        return local_tracks + yandex_tracks + youtube_tracks
 
     async def get_track(self, id: int) -> Track:
+        if source_for_id(str(id)) == "local":
+            return await self._local_finder.get_track(id)
         yandex_track = await self._yandex_finder.get_track(id)
         if yandex_track is not None:
             return yandex_track
@@ -7,8 +7,7 @@ import logging
 
 from config import GetClients
 from models import Track
-
-from yt_dlp import YoutubeDL
+from services.TrackMetadataService import TrackMetadataService, yandex_metadata
 
 logger = logging.getLogger(__name__)
 
@@ -39,13 +38,20 @@ class AsyncStreamerInterface(ABC):
 class AsyncYandexStreamer(AsyncStreamerInterface):
 
     def __init__(self):
-        self.client = GetClients().get_yandex_client()
+        self._clients = GetClients()
+        self.client = None
 
-    async def get_stream_url(self, track: Track) -> str | None:
+    async def _get_client(self):
         if self.client is None:
+            self.client = await self._clients.get_yandex_client()
+        return self.client
+
+    async def get_stream_url(self, track: Track) -> str | None:
+        if await self._get_client() is None:
             return None
         try:
             track_info = await self.client.tracks(track.track_id)
+            TrackMetadataService().remember(yandex_metadata(track_info[0]))
             download_info = await track_info[0].get_download_info_async()
             url = await download_info[0].get_direct_link_async()
             return url
@@ -67,7 +73,16 @@ class AsyncYoutubeStreamer(AsyncStreamerInterface):
         }
         adv_opts = self.opts
         adv_opts["skip_download"] = True
-        self.yt = YoutubeDL(adv_opts)
+        self._yt = None
+
+    @property
+    def yt(self):
+        """Экземпляр YoutubeDL; yt_dlp импортируется при первом стриме."""
+        if self._yt is None:
+            from yt_dlp import YoutubeDL
+
+            self._yt = YoutubeDL(self.opts)
+        return self._yt
 
     async def get_stream_url(self, track: Track) -> str | None:
         with ThreadPoolExecutor() as pool:
@@ -99,5 +114,8 @@ class AsyncStreamer(AsyncStreamerInterface):
                 return await self._async_youtube_streamer.get_stream_url(track)
             case "yandex":
                 return await self._async_yandex_streamer.get_stream_url(track)
+            case "local":
+                # Локальные треки не стримятся: путь к файлу дает LocalLibrary.
+                return None
             case _:
                 raise NameError("Неизвестный source у трека")
@@ -0,0 +1,184 @@
+"""Обложки треков для UI.
+
+Обложка ищется сначала в упаковке ``providers.CoverPack`` (срез
+отображенного в память файла), затем в отдельном файле раскладки по
+хешу; если ее нет нигде, :meth:`CoverStore.load` скачивает ее.
+
+Упаковка включается в настройках. Во включенном режиме обложка из
+отдельного файла при первом показе дописывается в упаковку (в основном
+потоке, внутри :meth:`CoverStore.image`: одна запись в конец файла), а
+файл удаляется — обход всей папки ``covers/`` не нужен. Выключение режима
+ничего не переносит: упакованные обложки по-прежнему читаются, новые
+ложатся отдельными файлами.
+
+Мертвые байты появляются, когда обложка ключа, уже лежащего в упаковке,
+записывается заново. Сжатие проверяется через ``_COMPACT_DELAY_MS`` после
+включения режима и после каждой такой перезаписи и запускается в фоне,
+если мертвых байтов больше ``_COMPACT_RATIO``.
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+from PySide6.QtCore import QObject, QTimer
+from PySide6.QtGui import QImage
+from qasync import asyncSlot
+
+from models import Track
+from providers import PathProvider
+from providers.CoverPack import CoverPack
+from services.AsyncDownloader import AsyncDownloader
+
+logger = logging.getLogger(__name__)
+
+# Пауза перед проверкой сжатия: старт приложения не делит диск со сжатием.
+_COMPACT_DELAY_MS = 15_000
+# Доля мертвых байтов, с которой упаковка сжимается.
+_COMPACT_RATIO = 0.5
+
+# Некоторые сборки PySide6 не принимают memoryview в QImage.loadFromData;
+# после первой ошибки срез копируется в bytes.
+_decode_views = True
+
+
+def decode_image(data: bytes | memoryview) -> QImage | None:
+    """Декодирует обложку; ``None``, если данные не картинка."""
+    global _decode_views
+    image = QImage()
+    if isinstance(data, memoryview):
+        loaded = False
+        if _decode_views:
+            try:
+                loaded = image.loadFromData(data)
+            except (TypeError, ValueError):
+                _decode_views = False
+        if not _decode_views:
+            loaded = image.loadFromData(bytes(data))
+    else:
+        loaded = image.loadFromData(data)
+    return image if loaded and not image.isNull() else None
+
+
+class CoverStore(QObject):
+    """Чтение, скачивание и упаковка обложек."""
+
+    _instance: CoverStore | None = None
+
+    def __new__(cls, *args, **kwargs) -> CoverStore:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        super().__init__()
+
+        self._pack = CoverPack()
+        self._paths = PathProvider()
+        self._downloader: AsyncDownloader | None = None
+        self.packed = False
+
+        self._compact_timer = QTimer(self)
+        self._compact_timer.setSingleShot(True)
+        self._compact_timer.setInterval(_COMPACT_DELAY_MS)
+        self._compact_timer.timeout.connect(self._compact_async)
+
+        self._initialized = True
+
+    def set_packed(self, packed: bool) -> None:
+        """Включает или выключает упаковку новых обложек."""
+        self.packed = bool(packed)
+        if self.packed:
+            self._compact_timer.start()
+        else:
+            self._compact_timer.stop()
+
+    def image(self, track: Track) -> QImage | None:
+        """Обложка, которая уже есть на диске, без скачивания."""
+        track_key = track.key
+        view = self._pack.get(track_key)
+        if view is not None:
+            try:
+                image = decode_image(view)
+            finally:
+                view.release()
+            if image is not None:
+                return image
+
+        path = self._paths.get_cover_path(track)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+        image = decode_image(data)
+        if image is not None and self.packed:
+            self._absorb(track_key, path, data)
+        return image
+
+    async def load(self, track: Track) -> QImage | None:
+        """Обложка трека; отсутствующая скачивается."""
+        image = self.image(track)
+        if image is not None:
+            return image
+        if self._downloader is None:
+            self._downloader = AsyncDownloader()
+        try:
+            await self._downloader.download_cover(track)
+        except Exception:
+            logger.exception("Не удалось скачать обложку для трека: %s", track)
+            return None
+        return self.image(track)
+
+    async def compact(self) -> bool:
+        """Сжимает упаковку, если в ней много мертвых байтов.
+
+        Returns:
+            ``True``, если упаковка заменена сжатой копией.
+        """
+        if self._pack.dead_ratio < _COMPACT_RATIO:
+            return False
+        compaction = self._pack.start_compaction()
+        if compaction is None:
+            return False
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, compaction.write)
+        except OSError:
+            logger.exception("Не удалось сжать упаковку обложек")
+            compaction.discard()
+            return False
+        return self._pack.finish_compaction(compaction)
+
+    def close(self) -> None:
+        """Закрывает отображение упаковки."""
+        self._pack.close()
+
+    # --- internal ---
+
+    def _absorb(self, track_key: str, path: str, data: bytes) -> None:
+        """Переносит обложку из отдельного файла в упаковку."""
+        replaced = track_key in self._pack
+        try:
+            self._pack.put(track_key, data)
+        except OSError:
+            logger.exception("Не удалось записать обложку в упаковку: %s", track_key)
+            return
+        if replaced and not self._compact_timer.isActive() and self._pack.dead_ratio >= _COMPACT_RATIO:
+            self._compact_timer.start()
+        try:
+            os.remove(path)
+        except OSError:
+            logger.exception("Не удалось удалить упакованную обложку %s", path)
+
+    @asyncSlot()
+    async def _compact_async(self) -> None:
+        try:
+            await self.compact()
+        except Exception:
+            logger.exception("Не удалось сжать упаковку обложек")
@@ -0,0 +1,52 @@
+"""Поиск по своей библиотеке: история, плейлисты, скачанные и локальные треки.
+
+Запрос идет в FTS5-индекс SQLite (``database.TrackSearchRepository``),
+поэтому отвечает за миллисекунды и без сети. Индекс обновляют триггеры
+БД при любой записи в источники — сервису не нужно следить за ними.
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import logging
+
+from database import AsyncDatabase, TrackSearchHit, TrackSearchRepository
+from models import Track
+from providers import TrackManager
+
+logger = logging.getLogger(__name__)
+
+
+class LibrarySearch:
+    """Поиск треков, которые уже есть у пользователя."""
+
+    _instance: LibrarySearch | None = None
+
+    def __new__(cls, *args, **kwargs) -> LibrarySearch:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._repo = TrackSearchRepository(AsyncDatabase.shared())
+        self._track_manager = TrackManager()
+        self._initialized = True
+
+    async def search(self, query: str, limit: int = 20) -> list[Track]:
+        """Треки библиотеки, подходящие под запрос (лучшие — первыми)."""
+        query = query.strip()
+        if not query:
+            return []
+        try:
+            hits = await self._repo.search(query, limit)
+        except Exception:
+            logger.exception("Не удалось выполнить поиск по библиотеке: %s", query)
+            return []
+        return [self._to_track(hit) for hit in hits]
+
+    def _to_track(self, hit: TrackSearchHit) -> Track:
+        source, _, track_id = hit.track_key.partition(":")
+        return self._track_manager.get_track_from_playlist(track_id, hit.title, hit.author, source)
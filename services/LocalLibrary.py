@@ -0,0 +1,259 @@
+"""Локальная музыка из папок пользователя.
+
+Папки обходятся рекурсивно в фоновом потоке (см. ``providers.local_files``),
+теги читаются пулом потоков, результат хранится в SQLite
+(``database.LocalTrackRepository``). Повторный обход перечитывает только
+папки с изменившимся mtime, поэтому запуск без изменений в библиотеке —
+это один ``stat`` на папку.
+
+Обход запускается при смене списка папок, при старте приложения и по
+событиям ``QFileSystemWatcher`` (он следит за первыми ``_WATCH_LIMIT``
+папками — ограничение ОС на число наблюдаемых путей).
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterable
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+from qasync import asyncSlot
+
+from database import AsyncDatabase, LocalTrackRepository, LocalTrackRow
+from models import LocalTrack, Track
+from providers.local_files import local_track_id, normalize_dir, read_tags, walk_changed
+
+logger = logging.getLogger(__name__)
+
+# Пауза перед обходом: на старте дает окну загрузиться, после событий
+# файловой системы — собрать их серию в один обход.
+_RESCAN_DELAY_MS = 1000
+# Сколько файлов читать и записывать за одну транзакцию.
+_BATCH_FILES = 500
+# Потоки для чтения тегов: чтение упирается в диск, а не в CPU.
+_TAG_WORKERS = min(8, (os.cpu_count() or 2) * 2)
+# Сколько папок отдавать QFileSystemWatcher.
+_WATCH_LIMIT = 1000
+
+
+class LocalLibrary(QObject):
+    """Индекс локальных треков: обход папок, поиск, пути к файлам.
+
+    ``changed`` эмитится после обхода, если набор треков изменился.
+    """
+
+    changed = Signal()
+    _instance: LocalLibrary | None = None
+
+    def __new__(cls, *args, **kwargs) -> LocalLibrary:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        super().__init__()
+
+        self._repo = LocalTrackRepository(AsyncDatabase.shared())
+        self._roots: list[str] = []
+        self._removed_roots: list[str] = []
+        self._scan_lock = asyncio.Lock()
+        self._executor: ThreadPoolExecutor | None = None
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.setInterval(_RESCAN_DELAY_MS)
+        self._rescan_timer.timeout.connect(self._rescan_async)
+
+        self._initialized = True
+
+    @property
+    def folders(self) -> list[str]:
+        """Индексируемые папки."""
+        return list(self._roots)
+
+    def set_folders(self, folders: Iterable[str]) -> None:
+        """Задает папки библиотеки и запускает обход в фоне.
+
+        Убранные папки удаляются из индекса при ближайшем обходе.
+        """
+        roots = _top_level(normalize_dir(folder) for folder in folders if folder)
+        removed = [root for root in self._roots if root not in roots]
+        self._removed_roots.extend(removed)
+        self._roots = roots
+        if removed:
+            self._unwatch(removed)
+        self._rescan_timer.start()
+
+    async def rescan(self) -> int:
+        """Сверяет индекс с папками.
+
+        Returns:
+            Число добавленных, обновленных и удаленных треков.
+        """
+        async with self._scan_lock:
+            changed = 0
+            removed_roots, self._removed_roots = self._removed_roots, []
+            for root in removed_roots:
+                changed += await self._repo.remove_root(root)
+
+            roots = list(self._roots)
+            if roots:
+                changed += await self._scan(roots)
+        if changed:
+            self.changed.emit()
+        return changed
+
+    async def get_path(self, track: Track) -> str | None:
+        """Путь к файлу локального трека или ``None``."""
+        return await self._repo.get_path(str(track.track_id))
+
+    async def get_track(self, track_id: str) -> LocalTrack | None:
+        """Локальный трек по id или ``None``."""
+        row = await self._repo.get_track(track_id)
+        return None if row is None else self._to_track(row)
+
+    async def search(self, query: str, limit: int = 5, offset: int = 0) -> list[LocalTrack]:
+        """Ищет локальные треки по названию, исполнителю и альбому."""
+        query = query.strip()
+        if not query:
+            return []
+        return [self._to_track(row) for row in await self._repo.search(query, limit, offset)]
+
+    def close(self) -> None:
+        """Останавливает пул чтения тегов."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    # --- internal ---
+
+    async def _scan(self, roots: list[str]) -> int:
+        loop = asyncio.get_running_loop()
+        saved = await self._repo.get_dir_mtimes(roots)
+        walk = await loop.run_in_executor(self._get_executor(), walk_changed, roots, saved)
+
+        changed = 0
+        removed_dirs = [path for path in saved if path not in walk.dir_mtimes]
+        if removed_dirs:
+            await self._repo.apply_changes((), (), removed_dirs, {})
+            changed += len(removed_dirs)
+
+        batch: dict[str, list[tuple[str, int, int]]] = {}
+        batch_size = 0
+        for directory, files in walk.changed.items():
+            batch[directory] = files
+            batch_size += len(files)
+            if batch_size >= _BATCH_FILES:
+                changed += await self._apply_batch(batch, walk.dir_mtimes)
+                batch, batch_size = {}, 0
+        if batch:
+            changed += await self._apply_batch(batch, walk.dir_mtimes)
+
+        self._watch(walk.dir_mtimes)
+        return changed
+
+    async def _apply_batch(
+        self,
+        batch: dict[str, list[tuple[str, int, int]]],
+        dir_mtimes: dict[str, int],
+    ) -> int:
+        """Перечитывает изменившиеся файлы пачки папок и записывает разницу."""
+        known = await self._repo.get_file_states(batch)
+        listed: set[str] = set()
+        stale: list[tuple[str, int, int]] = []
+        for files in batch.values():
+            for path, size, mtime_ns in files:
+                listed.add(path)
+                state = known.get(path)
+                if state is None or state[1:] != (size, mtime_ns):
+                    stale.append((path, size, mtime_ns))
+        removed = [path for path in known if path not in listed]
+
+        # Пачка делится поровну между потоками: одна задача пула на поток.
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        paths = [path for path, _, _ in stale]
+        step = max(1, -(-len(paths) // _TAG_WORKERS))
+        parts = await asyncio.gather(
+            *(
+                loop.run_in_executor(executor, _read_tags_many, paths[start:start + step])
+                for start in range(0, len(paths), step)
+            )
+        )
+        tags = [item for part in parts for item in part]
+        rows = [
+            LocalTrackRow(
+                track_id=local_track_id(path),
+                path=path,
+                dir=path.rpartition("/")[0],
+                size=size,
+                mtime_ns=mtime_ns,
+                title=title,
+                author=author,
+                album=album,
+                duration_ms=duration_ms,
+            )
+            for (path, size, mtime_ns), (title, author, album, duration_ms) in zip(stale, tags)
+        ]
+        await self._repo.apply_changes(
+            rows, removed, (), {directory: dir_mtimes[directory] for directory in batch}
+        )
+        return len(rows) + len(removed)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=_TAG_WORKERS, thread_name_prefix="local-tags")
+        return self._executor
+
+    def _watch(self, directories: Iterable[str]) -> None:
+        watched = set(self._watcher.directories())
+        free = _WATCH_LIMIT - len(watched)
+        if free <= 0:
+            return
+        missing = [path for path in directories if path not in watched][:free]
+        if missing:
+            self._watcher.addPaths(missing)
+
+    def _unwatch(self, roots: list[str]) -> None:
+        stale = [
+            path for path in self._watcher.directories()
+            if any(path == root or path.startswith(f"{root}/") for root in roots)
+        ]
+        if stale:
+            self._watcher.removePaths(stale)
+
+    def _on_directory_changed(self, _path: str) -> None:
+        self._rescan_timer.start()
+
+    @asyncSlot()
+    async def _rescan_async(self) -> None:
+        try:
+            await self.rescan()
+        except Exception:
+            logger.exception("Не удалось обновить индекс локальной музыки")
+
+    @staticmethod
+    def _to_track(row: LocalTrackRow) -> LocalTrack:
+        return LocalTrack(track_id=row.track_id, title=row.title, author=row.author)
+
+
+def _top_level(roots: Iterable[str]) -> list[str]:
+    """Убирает дубликаты и папки, вложенные в другие папки списка."""
+    result: list[str] = []
+    for root in sorted(set(roots)):
+        if not any(root.startswith(f"{parent}/") for parent in result):
+            result.append(root)
+    return result
+
+
+def _read_tags_many(paths: list[str]) -> list[tuple[str, str, str, int]]:
+    return [read_tags(path) for path in paths]
@@ -0,0 +1,200 @@
+"""Библиотека скачанных треков.
+
+Загружает индекс ``providers.LibraryIndex`` из БД и держит его в
+согласии с папкой ``music/``. Файлы лежат в раскладке по хешу ключа
+трека (см. ``providers.path_provider``), поэтому папки целиком не
+обходятся никогда:
+
+* загрузчик сообщает о новом файле через :meth:`add_download`;
+* в корне ``music/`` и ``covers/`` появляются только файлы старой
+  плоской раскладки — их переносит ``providers.storage_migrator``.
+  Корень проверяется по mtime при старте и по событиям
+  ``QFileSystemWatcher``;
+* файл, удаленный вручную, убирается из индекса при попытке его
+  проиграть (:meth:`forget`).
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+from qasync import asyncSlot
+
+from database import AsyncDatabase, LibraryFile, LibraryRepository
+from models import Track
+from providers import LibraryIndex, PathProvider
+from providers.LibraryIndex import scan_directory
+from providers.path_provider import sharded_path
+from providers.storage_migrator import migrate_covers, migrate_tracks
+
+logger = logging.getLogger(__name__)
+
+# Пауза после события файловой системы: скачивание дает серию событий.
+_RESCAN_DELAY_MS = 500
+
+
+class MusicLibrary(QObject):
+    """Индекс скачанных треков: загрузка, сверка с диском и обновления.
+
+    ``changed`` эмитится, когда набор скачанных треков изменился.
+    """
+
+    changed = Signal()
+    _instance: MusicLibrary | None = None
+
+    def __new__(cls, *args, **kwargs) -> MusicLibrary:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(
+        self,
+        music_dir: str = PathProvider.MUSIC_FOLDER,
+        covers_dir: str = PathProvider.COVERS_FOLDER,
+    ) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        super().__init__()
+
+        self._dir = music_dir.replace("\\", "/").rstrip("/")
+        self._covers_dir = covers_dir.replace("\\", "/").rstrip("/")
+        self._index = LibraryIndex()
+        self._repo = LibraryRepository(AsyncDatabase.shared())
+        self._load_task: asyncio.Task | None = None
+        self._scan_lock = asyncio.Lock()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._rescan_timer = QTimer(self)
+        self._rescan_timer.setSingleShot(True)
+        self._rescan_timer.timeout.connect(self._rescan_async)
+
+        self._initialized = True
+
+    def warm_up(self) -> None:
+        """Запускает загрузку индекса в фоне."""
+        if self._load_task is None:
+            self._load_task = asyncio.get_event_loop().create_task(self._load())
+
+    async def load(self) -> None:
+        """Дожидается загрузки индекса из БД (загружается один раз)."""
+        self.warm_up()
+        await asyncio.shield(self._load_task)
+
+    def get_file(self, track: Track) -> LibraryFile | None:
+        """Скачанный файл трека или ``None``."""
+        return self._index.get(track.key)
+
+    async def add_download(self, track: Track, path: str) -> LibraryFile | None:
+        """Добавляет в индекс только что скачанный файл трека.
+
+        Returns:
+            Запись индекса или ``None``, если файла нет на диске.
+        """
+        path = path.replace("\\", "/")
+        try:
+            stat = os.stat(path)
+        except OSError:
+            logger.warning("Скачанный файл не найден: %s", path)
+            return None
+        file = LibraryFile(
+            track_key=track.key,
+            path=path,
+            size=stat.st_size,
+            mtime_ns=stat.st_mtime_ns,
+            format=os.path.splitext(path)[1][1:].lower(),
+            title=track.title,
+            author=track.author,
+        )
+        self._index.put(file)
+        self._watch()
+        await self._repo.upsert_file(file)
+        self.changed.emit()
+        return file
+
+    async def forget(self, track: Track) -> None:
+        """Убирает из индекса трек, файл которого пропал с диска."""
+        track_key = track.key
+        if track_key not in self._index:
+            return
+        self._index.discard(track_key)
+        await self._repo.delete_file(track_key)
+        self.changed.emit()
+
+    async def rescan(self) -> bool:
+        """Переносит файлы старой раскладки и обновляет индекс.
+
+        Returns:
+            ``True``, если индекс изменился.
+        """
+        async with self._scan_lock:
+            # В корне лежат только файлы старой раскладки (в т.ч. подложенные вручную).
+            known = {file.path: file for file in self._index.files()}
+            try:
+                root_files = await asyncio.to_thread(scan_directory, self._dir, known)
+            except FileNotFoundError:
+                root_files = []
+            pending = {file.track_key: file for file in self._index.files() if not self._in_layout(file)}
+            pending.update((file.track_key, file) for file in root_files)
+            moved, missing = await asyncio.to_thread(migrate_tracks, pending.values(), self._dir)
+            await asyncio.to_thread(migrate_covers, self._covers_dir)
+
+            await self._repo.apply_scan(self._dir, self._dir_mtime(self._dir), moved, missing)
+            await self._repo.apply_scan(self._covers_dir, self._dir_mtime(self._covers_dir), (), ())
+            for track_key in missing:
+                self._index.discard(track_key)
+            for file in moved:
+                self._index.put(file)
+            self._watch()
+        if moved or missing:
+            self.changed.emit()
+            return True
+        return False
+
+    # --- internal ---
+
+    async def _load(self) -> None:
+        try:
+            self._index.replace(await self._repo.get_files())
+            saved_mtimes = [
+                await self._repo.get_dir_mtime(self._dir),
+                await self._repo.get_dir_mtime(self._covers_dir),
+            ]
+        except Exception:
+            logger.exception("Не удалось загрузить индекс скачанных треков")
+            return
+        self._watch()
+        # Перенос нужен, если в корнях что-то менялось или в индексе остались старые пути.
+        current_mtimes = [self._dir_mtime(self._dir), self._dir_mtime(self._covers_dir)]
+        stale_paths = any(not self._in_layout(file) for file in self._index.files())
+        if stale_paths or current_mtimes != [mtime or 0 for mtime in saved_mtimes]:
+            self._rescan_timer.start(0)
+
+    def _in_layout(self, file: LibraryFile) -> bool:
+        return file.path == sharded_path(self._dir, file.track_key, file.format)
+
+    @staticmethod
+    def _dir_mtime(path: str) -> int:
+        try:
+            return os.stat(path).st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _watch(self) -> None:
+        if not self._watcher.directories() and os.path.isdir(self._dir):
+            self._watcher.addPath(self._dir)
+
+    def _on_directory_changed(self, _path: str) -> None:
+        self._rescan_timer.start(_RESCAN_DELAY_MS)
+
+    @asyncSlot()
+    async def _rescan_async(self) -> None:
+        try:
+            await self.rescan()
+        except Exception:
+            logger.exception("Не удалось обновить индекс скачанных треков")
@@ -0,0 +1,182 @@
+"""Каталог пользовательских плейлистов для UI.
+
+Держит в памяти уже загруженные плейлисты и версии ``(mtime, size)``
+JSON-файлов из ``playlists/``. За папкой следит ``QFileSystemWatcher``:
+диск читается только после события и только для изменившихся файлов,
+а возврат на главную без изменений не трогает ни диск, ни БД.
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal
+from qasync import asyncSlot
+
+from models import UserPlaylist
+from services.PlaylistService import PlaylistService
+
+logger = logging.getLogger(__name__)
+
+# Папка для JSON-файлов, которые импортируются автоматически.
+_PLAYLISTS_DIR = "playlists"
+# Пауза после события файловой системы: запись файла дает серию событий.
+_SYNC_DELAY_MS = 300
+
+
+class PlaylistCatalog(QObject):
+    """Кэш плейлистов + импорт изменившихся JSON-файлов.
+
+    ``revision`` растет при каждом изменении набора плейлистов (импорт,
+    действие пользователя); ``changed`` эмитится вместе с ним. Открытие
+    плейлиста только меняет порядок: кэш переставляется на месте, ревизия
+    не растет, а эмитится ``moved_to_front(name)``.
+    """
+
+    changed = Signal()
+    moved_to_front = Signal(str)
+    _instance: PlaylistCatalog | None = None
+
+    def __new__(cls, *args, **kwargs) -> PlaylistCatalog:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self, playlists_dir: str = _PLAYLISTS_DIR) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        super().__init__()
+
+        self._dir = Path(playlists_dir)
+        self._service = PlaylistService()
+        self._service.add_listener(self._invalidate)
+        self._service.add_touch_listener(self._on_touched)
+
+        self.revision = 0
+        self._playlists: list[UserPlaylist] | None = None
+        # path -> (mtime_ns, size) уже импортированных версий; None — еще не загружено из БД.
+        self._versions: dict[str, tuple[int, int]] | None = None
+        # Пути, которые надо перепроверить; None — нужен полный обход папки.
+        self._dirty_paths: set[str] | None = None
+        self._sync_lock = asyncio.Lock()
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watched: set[str] = set()
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._sync_timer = QTimer(self)
+        self._sync_timer.setSingleShot(True)
+        self._sync_timer.setInterval(_SYNC_DELAY_MS)
+        self._sync_timer.timeout.connect(self._sync_async)
+
+        self._initialized = True
+
+    async def get_playlists(self) -> list[UserPlaylist]:
+        """Плейлисты (недавно открытые первыми) из кэша; БД читается только после изменений."""
+        if self._dirty_paths is None or self._dirty_paths:
+            await self.sync()
+        if self._playlists is None:
+            revision = self.revision
+            playlists = await self._service.get_playlists()
+            # Если за время чтения что-то изменилось, кэш уже неактуален.
+            if revision != self.revision:
+                return playlists
+            self._playlists = playlists
+        return self._playlists
+
+    async def sync(self) -> bool:
+        """Импортирует новые и изменившиеся JSON-файлы.
+
+        Returns:
+            ``True``, если был импортирован хотя бы один файл.
+        """
+        async with self._sync_lock:
+            if self._versions is None:
+                self._versions = await self._service.imported_versions()
+            dirty, self._dirty_paths = self._dirty_paths, set()
+            if dirty is None:
+                self._dir.mkdir(parents=True, exist_ok=True)
+                candidates = self._scan_directory()
+                self._watch(self._dir.as_posix(), *candidates)
+            else:
+                candidates = sorted(dirty)
+            imported = False
+            for path in candidates:
+                imported |= await self._sync_file(path)
+            return imported
+
+    # --- internal ---
+
+    def _scan_directory(self) -> list[str]:
+        with os.scandir(self._dir) as entries:
+            return sorted(
+                Path(entry.path).as_posix()
+                for entry in entries
+                if entry.name.endswith(".json") and entry.is_file()
+            )
+
+    async def _sync_file(self, path: str) -> bool:
+        """Импортирует файл, если его версия изменилась."""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return False
+        version = (stat.st_mtime_ns, stat.st_size)
+        # Файл, замененный целиком, выпадает из наблюдения — возвращаем.
+        self._watch(path)
+        if self._versions.get(path) == version:
+            return False
+        imported = False
+        try:
+            await self._service.import_json(path)
+            imported = True
+        except (OSError, ValueError):
+            logger.exception("Не удалось импортировать плейлист: %s", path)
+        # Неудачная версия тоже запоминается: повтор будет после изменения файла.
+        await self._service.mark_imported(path, *version)
+        self._versions[path] = version
+        return imported
+
+    def _watch(self, *paths: str) -> None:
+        missing = [path for path in paths if path not in self._watched]
+        if missing:
+            self._watcher.addPaths(missing)
+            self._watched.update(missing)
+
+    def _invalidate(self) -> None:
+        self._playlists = None
+        self.revision += 1
+        self.changed.emit()
+
+    def _on_touched(self, name: str) -> None:
+        if self._playlists is not None:
+            for index, playlist in enumerate(self._playlists):
+                if playlist.name == name:
+                    self._playlists.insert(0, self._playlists.pop(index))
+                    break
+        self.moved_to_front.emit(name)
+
+    def _on_directory_changed(self, _path: str) -> None:
+        self._dirty_paths = None
+        self._sync_timer.start()
+
+    def _on_file_changed(self, path: str) -> None:
+        path = Path(path).as_posix()
+        if path not in self._watcher.files():
+            # Удаленный или замененный файл Qt перестает отслеживать.
+            self._watched.discard(path)
+        if self._dirty_paths is not None:
+            self._dirty_paths.add(path)
+        self._sync_timer.start()
+
+    @asyncSlot()
+    async def _sync_async(self) -> None:
+        try:
+            await self.sync()
+        except Exception:
+            logger.exception("Не удалось синхронизировать папку плейлистов")
@@ -0,0 +1,236 @@
+"""Сервис пользовательских плейлистов.
+
+Плейлисты хранятся в SQLite (см. ``database.PlaylistRepository``) в той же
+БД, что и история. JSON-файлы — только импорт и экспорт; за папкой
+``playlists/`` следит ``PlaylistCatalog``.
+"""
+
+from __future__ import annotations
+
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Callable, Iterable
+
+from database import AsyncDatabase, PlaylistRecord, PlaylistRepository, PlaylistTrackRow
+from models import Track, UserPlaylist
+from providers import TrackManager
+from utils import normalize_playlist_name, read_playlist_json, write_playlist_json
+
+logger = logging.getLogger(__name__)
+
+
+class PlaylistService:
+    """Сервис создания, изменения и чтения пользовательских плейлистов.
+
+    Реализован как Singleton и работает через общий ``AsyncDatabase``.
+    """
+
+    _instance: "PlaylistService | None" = None
+
+    def __new__(cls) -> "PlaylistService":
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._repo = PlaylistRepository(AsyncDatabase.shared())
+        self._track_manager = TrackManager()
+        self._listeners: list[Callable[[], None]] = []
+        self._touch_listeners: list[Callable[[str], None]] = []
+        self._initialized = True
+
+    # --- чтение ---
+
+    async def get_playlists(self) -> list[UserPlaylist]:
+        """Все плейлисты с треками, недавно открытые первыми."""
+        records = await self._repo.list_playlists()
+        tracks_by_id = await self._repo.get_all_tracks()
+        return [self._to_playlist(record, tracks_by_id.get(record.id, ())) for record in records]
+
+    async def get_playlist(self, name: str) -> UserPlaylist | None:
+        """Плейлист по имени или ``None``."""
+        record = await self._repo.get_playlist(name.strip())
+        if record is None:
+            return None
+        return self._to_playlist(record, await self._repo.get_tracks(record.id))
+
+    async def list_names(self) -> list[str]:
+        """Имена плейлистов, недавно открытые первыми."""
+        return [record.name for record in await self._repo.list_playlists()]
+
+    # --- изменение ---
+
+    async def create_playlist(self, name: str) -> UserPlaylist:
+        """Создает пустой плейлист.
+
+        Raises:
+            ValueError: Если имя пустое или уже занято.
+        """
+        clean_name = normalize_playlist_name(name)
+        try:
+            await self._repo.create_playlist(clean_name)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Плейлист '{clean_name}' уже существует.") from None
+        self._notify_listeners()
+        return UserPlaylist(clean_name, ())
+
+    async def rename_playlist(self, old_name: str, new_name: str) -> None:
+        """Переименовывает плейлист.
+
+        Raises:
+            ValueError: Если новое имя пустое или занято.
+            LookupError: Если плейлиста нет.
+        """
+        new_clean = normalize_playlist_name(new_name)
+        record = await self._require(old_name)
+        try:
+            await self._repo.rename_playlist(record.id, new_clean)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Плейлист '{new_clean}' уже существует.") from None
+        self._notify_listeners()
+
+    async def delete_playlist(self, name: str) -> None:
+        """Удаляет плейлист.
+
+        Raises:
+            LookupError: Если плейлиста нет.
+        """
+        record = await self._require(name)
+        await self._repo.delete_playlist(record.id)
+        self._notify_listeners()
+
+    async def touch_playlist(self, name: str) -> None:
+        """Поднимает плейлист вверх списка (вызывается при открытии).
+
+        Состав плейлистов не меняется, поэтому уведомляются только
+        подписчики :meth:`add_touch_listener`.
+        """
+        record = await self._repo.get_playlist(name.strip())
+        if record is not None:
+            await self._repo.touch_playlist(record.id)
+            for listener in list(self._touch_listeners):
+                try:
+                    listener(record.name)
+                except Exception:
+                    logger.exception("Ошибка в подписчике открытия плейлиста")
+
+    async def add_track(self, name: str, track: Track) -> bool:
+        """Добавляет трек в конец плейлиста.
+
+        Returns:
+            ``True``, если трек добавлен; ``False``, если он уже был.
+
+        Raises:
+            LookupError: Если плейлиста нет.
+        """
+        record = await self._require(name)
+        added = await self._repo.add_track(record.id, self._to_row(track))
+        if added:
+            self._notify_listeners()
+        return added
+
+    async def remove_track(self, name: str, track: Track) -> bool:
+        """Удаляет трек из плейлиста.
+
+        Returns:
+            ``True``, если трек удален; ``False``, если его не было.
+
+        Raises:
+            LookupError: Если плейлиста нет.
+        """
+        record = await self._require(name)
+        removed = await self._repo.remove_track(record.id, track.key)
+        if removed:
+            self._notify_listeners()
+        return removed
+
+    # --- импорт/экспорт ---
+
+    async def import_json(self, path: str | Path) -> UserPlaylist:
+        """Импортирует JSON-файл плейлиста.
+
+        Если плейлист с таким именем уже есть, его треки заменяются треками
+        из файла.
+
+        Raises:
+            OSError, ValueError: Если файл не читается или имеет неверный формат.
+        """
+        name, items = read_playlist_json(path)
+        tracks = [
+            self._track_manager.get_track_from_playlist(item["id"], item["title"], item["author"])
+            for item in items
+        ]
+        rows = [self._to_row(track) for track in tracks]
+        record = await self._repo.get_playlist(name)
+        if record is None:
+            await self._repo.create_playlist(name, rows)
+        else:
+            await self._repo.replace_tracks(record.id, rows)
+            name = record.name
+        self._notify_listeners()
+        return UserPlaylist(name, tracks)
+
+    async def export_json(self, name: str, path: str | Path) -> Path:
+        """Сохраняет плейлист в JSON-файл.
+
+        Raises:
+            LookupError: Если плейлиста нет.
+        """
+        record = await self._require(name)
+        rows = await self._repo.get_tracks(record.id)
+        return write_playlist_json(
+            path,
+            record.name,
+            ({"id": row.track_id, "title": row.title, "author": row.author} for row in rows),
+        )
+
+    async def imported_versions(self) -> dict[str, tuple[int, int]]:
+        """Версии уже импортированных файлов: ``path -> (mtime_ns, size)``."""
+        return await self._repo.get_imported_files()
+
+    async def mark_imported(self, path: str, mtime_ns: int, size: int) -> None:
+        """Запоминает версию файла как импортированную."""
+        await self._repo.record_import(path, mtime_ns, size)
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Подписывает ``listener()`` на изменения плейлистов и их треков."""
+        self._listeners.append(listener)
+
+    def add_touch_listener(self, listener: Callable[[str], None]) -> None:
+        """Подписывает ``listener(name)`` на подъем плейлиста вверх списка."""
+        self._touch_listeners.append(listener)
+
+    # --- internal ---
+
+    def _notify_listeners(self) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener()
+            except Exception:
+                logger.exception("Ошибка в подписчике изменений плейлистов")
+
+    async def _require(self, name: str) -> PlaylistRecord:
+        record = await self._repo.get_playlist(name.strip())
+        if record is None:
+            raise LookupError(f"Плейлист '{name.strip()}' не найден.")
+        return record
+
+    def _to_playlist(self, record: PlaylistRecord, rows: Iterable[PlaylistTrackRow]) -> UserPlaylist:
+        tracks = [
+            self._track_manager.get_track_from_playlist(
+                row.track_id, row.title, row.author, row.track_key.partition(":")[0]
+            )
+            for row in rows
+        ]
+        return UserPlaylist(record.name, tracks)
+
+    def _to_row(self, track: Track) -> PlaylistTrackRow:
+        return PlaylistTrackRow(
+            track_key=track.key,
+            track_id=str(track.track_id),
+            title=track.title,
+            author=track.author,
+        )
@@ -0,0 +1,157 @@
+"""Подсказки строки поиска: названия треков, исполнители и прошлые запросы.
+
+Подсказки берутся из индекса в памяти (``utils.suggestion_index``), без
+сети и без БД на каждое нажатие клавиши. Индекс строится из истории
+прослушиваний и журнала поиска при первом показе страницы поиска, потом
+дополняется: прослушивания — по подписке на ``TrackHistoryService``,
+запросы — через :meth:`SearchSuggestions.record_query`.
+
+Вес подсказки — число прослушиваний трека (для исполнителя — сумма по
+его трекам); прошлый запрос весит ``_QUERY_WEIGHT`` прослушиваний за
+каждый поиск.
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from time import time
+
+from PySide6.QtCore import QObject, QTimer
+from qasync import asyncSlot
+
+from database import AsyncDatabase, TrackHistoryEntry, TrackSearchRepository
+from services.TrackHistoryService import TrackHistoryService
+from utils.suggestion_index import SuggestionIndex, normalize
+
+logger = logging.getLogger(__name__)
+
+# Сколько прошлых запросов загружать.
+_QUERY_LIMIT = 2000
+# Вес одного поиска в прослушиваниях.
+_QUERY_WEIGHT = 3
+# Пауза перед дочиткой истории: серия обновлений истории — одно чтение.
+_REFRESH_DELAY_MS = 2000
+
+
+class SearchSuggestions(QObject):
+    """Индекс подсказок и его обновление."""
+
+    _instance: SearchSuggestions | None = None
+
+    def __new__(cls, *args, **kwargs) -> SearchSuggestions:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls, *args, **kwargs)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        super().__init__()
+
+        self._repo = TrackSearchRepository(AsyncDatabase.shared())
+        self._history = TrackHistoryService()
+        self._index = SuggestionIndex()
+        # track_key -> прослушивания, уже учтенные в весах.
+        self._listens: dict[str, int] = {}
+        # Время последнего прослушивания, до которого история прочитана.
+        self._watermark = 0
+        self._load_task: asyncio.Task | None = None
+        self._loaded = False
+        # Запросы, сделанные до загрузки индекса.
+        self._early_queries: list[str] = []
+        self._tasks: set[asyncio.Task] = set()
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(_REFRESH_DELAY_MS)
+        self._refresh_timer.timeout.connect(self._refresh_async)
+        self._history.add_listener(self._schedule_refresh)
+
+        self._initialized = True
+
+    def warm_up(self) -> None:
+        """Запускает фоновую загрузку индекса (повторные вызовы ничего не делают)."""
+        if self._load_task is None:
+            self._load_task = asyncio.get_event_loop().create_task(self._load())
+
+    def suggest(self, text: str, limit: int = 8) -> list[str]:
+        """Подсказки для введенного текста; пока индекс не загружен — пусто."""
+        return self._index.suggest(text, limit)
+
+    def record_query(self, query: str) -> None:
+        """Запоминает выполненный поиск."""
+        key = normalize(query)
+        if not key:
+            return
+        self._index.add(query, _QUERY_WEIGHT)
+        if not self._loaded:
+            self._early_queries.append(query)
+        task = asyncio.get_event_loop().create_task(self._log_query(key, query.strip()))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # --- internal ---
+
+    async def _load(self) -> None:
+        try:
+            entries = await self._history.get_entries_since(0)
+            queries = await self._repo.get_queries(_QUERY_LIMIT)
+        except Exception:
+            logger.exception("Не удалось загрузить подсказки поиска")
+            self._load_task = None
+            return
+        items: list[tuple[str, int]] = []
+        for entry in entries:
+            items.append((entry.title, entry.listen_count))
+            items.append((entry.author, entry.listen_count))
+            self._listens[entry.track_key] = entry.listen_count
+        items.extend((query, searches * _QUERY_WEIGHT) for query, searches in queries)
+        # Сортировка сотен тысяч фрагментов — не в потоке UI.
+        index = SuggestionIndex()
+        await asyncio.get_running_loop().run_in_executor(None, index.build, items)
+        for query in self._early_queries:
+            index.add(query, _QUERY_WEIGHT)
+        self._early_queries.clear()
+        self._index = index
+        self._watermark = max((entry.last_played_at for entry in entries), default=0)
+        self._loaded = True
+
+    def _apply(self, entry: TrackHistoryEntry) -> None:
+        """Учитывает новые прослушивания трека."""
+        known = self._listens.get(entry.track_key)
+        if known is None:
+            self._listens[entry.track_key] = entry.listen_count
+            self._index.add(entry.title, entry.listen_count)
+            self._index.add(entry.author, entry.listen_count)
+            return
+        delta = entry.listen_count - known
+        if delta <= 0:
+            # Буфер истории может знать только прирост, без значения из БД.
+            return
+        self._listens[entry.track_key] = entry.listen_count
+        self._index.add(entry.title, delta)
+        self._index.add(entry.author, delta)
+
+    def _schedule_refresh(self) -> None:
+        if self._loaded:
+            self._refresh_timer.start()
+
+    @asyncSlot()
+    async def _refresh_async(self) -> None:
+        try:
+            entries = await self._history.get_entries_since(self._watermark)
+        except Exception:
+            logger.exception("Не удалось обновить подсказки поиска")
+            return
+        for entry in entries:
+            self._apply(entry)
+            self._watermark = max(self._watermark, entry.last_played_at)
+
+    async def _log_query(self, key: str, query: str) -> None:
+        try:
+            await self._repo.log_query(key, query, int(time()))
+        except Exception:
+            logger.exception("Не удалось записать запрос в журнал поиска: %s", query)
@@ -1,16 +1,91 @@
 """Сервис истории прослушивания.
 
 Слой бизнес-логики между Player и репозиторием БД.
+
+Прогресс пишется через write-behind буфер: обновления копятся в памяти
+(по одному на ``track_key``) и сбрасываются в БД одной транзакцией —
+по интервалу, на паузе и при закрытии приложения.
+
+Каждое прослушивание (от ``begin_play`` до ``end_play``) попадает в журнал
+``play_events`` тем же буфером; агрегаты для статистики обновляются
+репозиторием в транзакции записи событий.
 """
 
 from __future__ import annotations
 
-from time import monotonic
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, timedelta
+from time import monotonic, time
+from typing import Awaitable, Callable, Iterable
 
-from database import AsyncDatabase, TrackHistoryRepository
-from models import RecentlyPlayedPlaylist, Track, YandexTrack, YoutubeTrack
+from database import (
+    AsyncDatabase,
+    PlayEvent,
+    PlayEventRepository,
+    PlayStats,
+    TrackHistoryEntry,
+    TrackHistoryRepository,
+    TrackProgressUpdate,
+)
+from models import LocalTrack, RecentlyPlayedPlaylist, Track, YandexTrack, YoutubeTrack
 from providers import TrackManager
 
+logger = logging.getLogger(__name__)
+
+# Сколько ключей помнить для ограничения частоты сохранений.
+_LAST_SAVED_LIMIT = 256
+# Сколько позиций продолжения держать в памяти (прогревается последними треками).
+_RESUME_CACHE_LIMIT = 2000
+# Трек, остановленный ближе этого к концу, начинается заново, а не с позиции.
+_RESUME_TAIL_MS = 5000
+# Трек считается пропущенным, если его переключили раньше этой доли длительности.
+_SKIP_THRESHOLD = 0.9
+# Политика хранения: сырые события и дневные агрегаты (итоги за все время не удаляются).
+_EVENTS_RETENTION_DAYS = 365
+_DAILY_RETENTION_DAYS = 3 * 365
+# Дневные агрегаты по трекам и артистам старше этого сворачиваются в месячные:
+# самый длинный период статистики (год) их не касается.
+_COMPACT_AFTER_DAYS = 400
+# Насколько позиция может обогнать время между отметками и не считаться перемоткой.
+_SEEK_SLACK_MS = 2000
+
+
+@dataclass(slots=True)
+class _OpenPlay:
+    """Текущее незавершенное прослушивание."""
+
+    track: Track
+    track_key: str
+    started_at: int
+    start_position_ms: int
+    last_position_ms: int
+    last_duration_ms: int
+    # Сколько реально играло: сумма приростов позиции между отметками.
+    listened_ms: int = 0
+    # monotonic() последней отметки позиции.
+    last_tick_at: float = 0.0
+
+
+@dataclass(slots=True)
+class ListeningStats:
+    """Статистика прослушиваний за период для страницы статистики.
+
+    ``days`` — итоги по дням (только дни с данными), ``totals`` — итоги
+    периода, ``since_day`` — начало периода (``None`` — за все время).
+    """
+
+    since_day: str | None
+    until_day: str
+    days: list[PlayStats]
+    totals: PlayStats
+    top_tracks: list[PlayStats]
+    top_artists: list[PlayStats]
+    current_streak: int
+    longest_streak: int
+
 
 class TrackHistoryService:
     """Сервис сохранения/чтения прогресса треков.
@@ -25,24 +100,72 @@ class TrackHistoryService:
             cls._instance = super().__new__(cls)
         return cls._instance
 
-    def __init__(self, save_interval_sec: float = 5.0) -> None:
+    def __init__(self, save_interval_sec: float = 5.0, flush_interval_sec: float = 30.0) -> None:
         if getattr(self, "_initialized", False):
             return
-        self._db = AsyncDatabase()
+        self._db = AsyncDatabase.shared()
         self._repo = TrackHistoryRepository(self._db)
+        self._events = PlayEventRepository(self._db)
         self._save_interval_sec = max(1.0, save_interval_sec)
-        self._last_saved_by_key: dict[str, float] = {}
+        self._flush_interval_sec = max(1.0, flush_interval_sec)
+        # LRU: track_key -> monotonic() последнего сохранения.
+        self._last_saved_by_key: OrderedDict[str, float] = OrderedDict()
+        # LRU позиций продолжения: track_key -> position_ms (write-through).
+        self._resume_positions: OrderedDict[str, int] = OrderedDict()
+        # True, если в кэше вся история: промах означает "позиции нет".
+        self._resume_complete = False
+        self._resume_warm_task: asyncio.Task | None = None
+        # Несброшенные обновления: track_key -> последнее состояние.
+        self._pending: dict[str, TrackProgressUpdate] = {}
+        # Пачка, которая пишется прямо сейчас (до commit ее нет в БД).
+        self._flushing: dict[str, TrackProgressUpdate] = {}
+        self._open_play: _OpenPlay | None = None
+        self._listeners: list[Callable[[], None]] = []
+        # Ключ трека, о подъеме которого слушатели уже уведомлены.
+        self._head_key: str | None = None
+        self._pending_events: list[PlayEvent] = []
+        # События, которые пишутся прямо сейчас.
+        self._flushing_events: list[PlayEvent] = []
+        self._retention_applied = False
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_lock = asyncio.Lock()
         self._track_manager = TrackManager()
         self._initialized = True
 
-    @staticmethod
-    def build_track_key(track: Track) -> str:
-        """Строит стабильный ключ трека для БД."""
-        return f"{track.source}:{track.track_id}"
+    def warm_up(self) -> None:
+        """Запускает фоновую загрузку позиций продолжения последних треков."""
+        if self._resume_warm_task is None:
+            self._resume_warm_task = asyncio.get_event_loop().create_task(self._warm_resume_cache())
+
+    def peek_resume_position(self, track: Track) -> int | None:
+        """Позиция продолжения из памяти без обращения к БД.
+
+        Returns:
+            Позицию в мс или ``None``, если ее нет в кэше и нужно спросить БД
+            (см. :meth:`get_resume_position`).
+        """
+        track_key = track.key
+        position = self._resume_positions.get(track_key)
+        if position is not None:
+            self._resume_positions.move_to_end(track_key)
+            return position
+        return 0 if self._resume_complete else None
 
     async def get_resume_position(self, track: Track) -> int:
-        """Возвращает сохраненную позицию для продолжения трека."""
-        return await self._repo.get_saved_position(self.build_track_key(track))
+        """Возвращает сохраненную позицию для продолжения трека.
+
+        Сначала смотрит кэш в памяти (в нем же несброшенные обновления),
+        при промахе читает БД и запоминает результат.
+        """
+        position = self.peek_resume_position(track)
+        if position is not None:
+            return position
+        track_key = track.key
+        position, duration = await self._repo.get_saved_progress(track_key)
+        # Пока шел запрос, трек мог успеть сохраниться — его позиция новее.
+        if track_key not in self._resume_positions:
+            self._cache_resume_position(track_key, position, duration)
+        return self._resume_positions[track_key]
 
     async def save_progress(
         self,
@@ -52,73 +175,515 @@ class TrackHistoryService:
         *,
         force: bool = False,
     ) -> None:
-        """Сохраняет прогресс трека с ограничением частоты записи."""
-        track_key = self.build_track_key(track)
+        """Сохраняет прогресс трека с ограничением частоты записи.
+
+        Запись попадает в буфер; в БД она уйдет при ближайшем сбросе.
+        """
+        track_key = track.key
+        self._touch_open_play(track_key, position_ms, duration_ms)
         now = monotonic()
         last_saved = self._last_saved_by_key.get(track_key, 0.0)
         if not force and now - last_saved < self._save_interval_sec:
             return
 
-        await self._repo.upsert_progress(
-            track_key=track_key,
-            title=track.title,
-            author=track.author,
-            source=track.source,
-            position_ms=position_ms,
-            duration_ms=duration_ms,
-            listen_increment=0,
-        )
-        self._last_saved_by_key[track_key] = now
+        self._buffer(track, track_key, position_ms, duration_ms, listen_increment=0)
+        self._remember_saved(track_key, now)
+
+    def mark_track_started(self, track: Track, position_ms: int = 0) -> None:
+        """Поднимает трек в начало истории сразу при старте воспроизведения.
+
+        Позиция передается явно: плеер в этот момент еще не знает ни позиции,
+        ни длительности нового трека.
+        """
+        track_key = track.key
+        previous = self._pending.get(track_key) or self._flushing.get(track_key)
+        duration_ms = previous.duration_ms if previous is not None else 0
+        self._buffer(track, track_key, position_ms, duration_ms, listen_increment=0)
+        self._remember_saved(track_key, monotonic())
 
     async def mark_track_finished(self, track: Track, position_ms: int, duration_ms: int) -> None:
         """Сохраняет финальное состояние и увеличивает число прослушиваний."""
-        track_key = self.build_track_key(track)
-        await self._repo.upsert_progress(
+        track_key = track.key
+        self._buffer(track, track_key, position_ms, duration_ms, listen_increment=1)
+        self._remember_saved(track_key, monotonic())
+
+    def begin_play(self, track: Track, position_ms: int = 0) -> None:
+        """Открывает новое прослушивание; предыдущее закрывается как прерванное."""
+        if self._open_play is not None:
+            self._close_open_play(finished=False)
+        self._open_play = _OpenPlay(
+            track=track,
+            track_key=track.key,
+            started_at=int(time()),
+            start_position_ms=max(0, position_ms),
+            last_position_ms=max(0, position_ms),
+            last_duration_ms=0,
+            last_tick_at=monotonic(),
+        )
+
+    def end_play(self, position_ms: int, duration_ms: int, *, finished: bool) -> None:
+        """Закрывает текущее прослушивание и ставит событие в буфер записи."""
+        if self._open_play is None:
+            return
+        self._touch_open_play(self._open_play.track_key, position_ms, duration_ms)
+        self._close_open_play(finished=finished)
+
+    async def flush(self) -> None:
+        """Сбрасывает накопленные обновления и события в БД."""
+        self._cancel_scheduled_flush()
+        async with self._flush_lock:
+            if self._pending:
+                batch, self._pending = self._pending, {}
+                self._flushing = batch
+                try:
+                    await self._repo.upsert_progress_many(batch.values())
+                except Exception:
+                    logger.exception("Не удалось сохранить историю прослушивания")
+                    self._requeue(batch)
+                finally:
+                    self._flushing = {}
+            if self._pending_events:
+                events, self._pending_events = self._pending_events, []
+                self._flushing_events = events
+                try:
+                    await self._events.record_events(events)
+                except Exception:
+                    logger.exception("Не удалось сохранить журнал прослушиваний")
+                    self._pending_events[:0] = events
+                    self._schedule_flush()
+                finally:
+                    self._flushing_events = []
+            if not self._retention_applied:
+                self._retention_applied = True
+                await self._apply_retention()
+
+    async def get_recent_playlist(self, limit: int = 24) -> RecentlyPlayedPlaylist | None:
+        """Формирует системный плейлист недавно прослушанных треков (первую страницу).
+
+        Читает БД без ожидания записи и накладывает сверху несброшенные
+        обновления из буфера. Страница не обрезается до ``limit``: курсор
+        указывает на последнюю строку БД, и отброшенные строки не попали бы
+        ни в эту страницу, ни в следующие. Следующие страницы догружаются
+        через :meth:`load_more_recent`.
+        """
+        entries, cursor = await self._repo.get_recent_page(limit=limit)
+        entries = await self._overlay_unflushed(entries)
+        if not entries:
+            return None
+        playlist = RecentlyPlayedPlaylist(tracks=[self._entry_to_track(entry) for entry in entries])
+        playlist.next_cursor = cursor
+        playlist.newest_played_at = entries[0].last_played_at
+        return playlist
+
+    async def load_more_recent(self, playlist: RecentlyPlayedPlaylist, limit: int = 50) -> list[Track]:
+        """Догружает следующую страницу истории в конец плейлиста.
+
+        Returns:
+            Добавленные треки (пустой список, если страниц больше нет).
+        """
+        if not playlist.has_more:
+            return []
+        entries, cursor = await self._repo.get_recent_page(limit=limit, before=playlist.next_cursor)
+        playlist.next_cursor = cursor
+        known = {track.key for track in playlist.tracks.values}
+        tracks = [
+            self._entry_to_track(entry)
+            for entry in entries
+            if entry.track_key not in known and not self._is_unflushed(entry.track_key)
+        ]
+        playlist.tracks.extend(tracks)
+        return tracks
+
+    async def refresh_recent_head(self, playlist: RecentlyPlayedPlaylist) -> list[Track]:
+        """Поднимает в начало плейлиста треки, прослушанные после его загрузки.
+
+        Загружаются только новые записи (по ``newest_played_at``), а не вся
+        история заново; уже показанные треки переносятся наверх.
+
+        Returns:
+            Треки, оказавшиеся в начале плейлиста (новые первыми).
+        """
+        entries = await self.get_entries_since(playlist.newest_played_at)
+        if not entries:
+            return []
+        tracks = [self._entry_to_track(entry) for entry in entries]
+        playlist.tracks.move_to_front(tracks)
+        playlist.newest_played_at = entries[0].last_played_at
+        return tracks
+
+    async def get_entries_since(self, played_at: int) -> list[TrackHistoryEntry]:
+        """Записи истории, прослушанные не раньше ``played_at`` (новые первыми).
+
+        Несброшенные обновления из буфера накладываются поверх БД.
+        """
+        entries = await self._repo.get_entries_since(played_at)
+        return [
+            entry
+            for entry in await self._overlay_unflushed(entries)
+            if entry.last_played_at >= played_at
+        ]
+
+    async def get_listen_counts(self, track_keys: Iterable[str]) -> dict[str, int]:
+        """Число прослушиваний треков: ``track_key -> count`` (с учетом буфера)."""
+        keys = set(track_keys)
+        counts = await self._repo.get_listen_counts(keys)
+        for updates in (self._flushing, self._pending):
+            for key, update in updates.items():
+                if update.listen_increment > 0 and key in keys:
+                    counts[key] = counts.get(key, 0) + update.listen_increment
+        return counts
+
+    def add_listener(self, listener: Callable[[], None]) -> None:
+        """Подписывает ``listener()`` на изменения порядка истории.
+
+        Вызывается, когда трек поднимается в начало "Недавно прослушанных"
+        или у него растет счетчик прослушиваний.
+        """
+        self._listeners.append(listener)
+
+    async def get_listening_stats(self, days: int | None = 7, top_limit: int = 10) -> ListeningStats:
+        """Собирает статистику за последние ``days`` дней (``None`` — за все время).
+
+        Читает только агрегаты, поэтому стоимость не зависит от длины журнала.
+        Несброшенные события накладываются в памяти — чтение ничего не пишет.
+        Итоги за все время берутся из ``*_totals``: дневные агрегаты старше
+        срока хранения удалены.
+        """
+        today = date.today()
+        until_day = today.isoformat()
+        since_day = None if days is None else (today - timedelta(days=max(1, days) - 1)).isoformat()
+        events = [
+            event
+            for event in (*self._flushing_events, *self._pending_events)
+            if (since_day or "") <= event.day <= until_day
+        ]
+        if since_day is None:
+            top_tracks = await self._events.get_track_totals(top_limit)
+            top_artists = await self._events.get_artist_totals(top_limit)
+            totals = await self._events.get_overall_totals()
+        else:
+            top_tracks = await self._events.get_top_tracks(since_day, until_day, top_limit)
+            top_artists = await self._events.get_top_artists(since_day, until_day, top_limit)
+        daily = await self._events.get_daily_totals(since_day or "", until_day)
+        if since_day is not None:
+            totals = _sum_stats("", daily)
+        active_days = await self._events.get_active_days()
+
+        if events:
+            daily = _overlay_stats(daily, events, lambda event: event.day)
+            daily.sort(key=lambda row: row.key)
+            totals = _overlay_stats([totals], events, lambda event: "")[0]
+            active_days = sorted({*active_days, *(event.day for event in events)})
+            top_tracks = await self._overlay_top(
+                top_tracks, events, lambda event: event.track_key, top_limit,
+                lambda keys: self._events.get_track_stats(keys, since_day, until_day),
+                self._event_label,
+            )
+            top_artists = await self._overlay_top(
+                top_artists, events, lambda event: event.artist, top_limit,
+                lambda artists: self._events.get_artist_stats(artists, since_day, until_day),
+                lambda artist: artist,
+            )
+        current_streak, longest_streak = self._streaks(active_days, today)
+        return ListeningStats(
+            since_day=since_day,
+            until_day=until_day,
+            days=daily,
+            totals=totals,
+            top_tracks=top_tracks,
+            top_artists=top_artists,
+            current_streak=current_streak,
+            longest_streak=longest_streak,
+        )
+
+    async def close(self) -> None:
+        """Сбрасывает буфер и закрывает соединение с БД при завершении приложения."""
+        if self._open_play is not None:
+            self._close_open_play(finished=False)
+        await self.flush()
+        await self._db.close()
+
+    def _buffer(
+        self,
+        track: Track,
+        track_key: str,
+        position_ms: int,
+        duration_ms: int,
+        *,
+        listen_increment: int,
+    ) -> None:
+        """Кладет обновление в буфер, объединяя его с несброшенным."""
+        moved = track_key != self._head_key or listen_increment > 0
+        previous = self._pending.get(track_key)
+        if previous is not None:
+            listen_increment += previous.listen_increment
+        self._pending[track_key] = TrackProgressUpdate(
             track_key=track_key,
             title=track.title,
             author=track.author,
             source=track.source,
             position_ms=position_ms,
             duration_ms=duration_ms,
-            listen_increment=1,
+            listen_increment=listen_increment,
+            played_at=int(time()),
         )
-        self._last_saved_by_key[track_key] = monotonic()
+        self._cache_resume_position(track_key, position_ms, duration_ms)
+        self._schedule_flush()
+        if moved:
+            self._head_key = track_key
+            self._notify_listeners()
 
-    async def get_recent_playlist(self, limit: int = 24) -> RecentlyPlayedPlaylist | None:
-        """Формирует системный плейлист недавно прослушанных треков."""
-        entries = await self._repo.get_recent_entries(limit=limit)
-        if not entries:
-            return None
+    @staticmethod
+    async def _overlay_top(
+        rows: list[PlayStats],
+        events: list[PlayEvent],
+        key: Callable[[PlayEvent], str],
+        limit: int,
+        lookup: Callable[[list[str]], Awaitable[list[PlayStats]]],
+        label: Callable[[str], str],
+    ) -> list[PlayStats]:
+        """Накладывает несброшенные события на топ из БД.
+
+        Для ключей вне топа сохраненные итоги дочитываются ``lookup``:
+        с прибавкой они могут в него войти.
+        """
+        known = {row.key for row in rows}
+        missing = list({key(event) for event in events} - known)
+        base = rows + (await lookup(missing) if missing else [])
+        merged = _overlay_stats(base, events, key)
+        for row in merged:
+            if not row.label:
+                row.label = label(row.key)
+        merged.sort(key=lambda row: row.listened_ms, reverse=True)
+        return merged[:limit]
+
+    def _event_label(self, track_key: str) -> str:
+        """Подпись трека, которого еще нет в БД: из буфера прогресса."""
+        update = self._pending.get(track_key) or self._flushing.get(track_key)
+        if update is None:
+            return track_key
+        return f"{update.title} — {update.author}"
+
+    def _notify_listeners(self) -> None:
+        for listener in list(self._listeners):
+            try:
+                listener()
+            except Exception:
+                logger.exception("Ошибка в подписчике истории прослушивания")
+
+    def _is_unflushed(self, track_key: str) -> bool:
+        return track_key in self._pending or track_key in self._flushing
+
+    def _entry_to_track(self, entry: TrackHistoryEntry) -> Track:
+        source, track_id = self._split_track_key(entry.track_key, entry.source)
+        if source == "local":
+            return LocalTrack(
+                track_id=str(track_id),
+                title=entry.title,
+                author=entry.author,
+                listen_count=entry.listen_count,
+            )
+        downloaded = self._track_manager.is_downloaded(str(track_id), source)
+        if source == "yandex":
+            return YandexTrack(
+                track_id=int(track_id) if str(track_id).isdigit() else track_id,
+                title=entry.title,
+                author=entry.author,
+                downloaded=downloaded,
+                listen_count=entry.listen_count,
+            )
+        return YoutubeTrack(
+            track_id=str(track_id),
+            title=entry.title,
+            author=entry.author,
+            downloaded=downloaded,
+            listen_count=entry.listen_count,
+        )
+
+    def _touch_open_play(self, track_key: str, position_ms: int, duration_ms: int) -> None:
+        """Запоминает последнюю известную позицию открытого прослушивания.
+
+        Прирост позиции засчитывается в прослушанное, только если он не
+        больше времени, прошедшего с прошлой отметки: перемотки вперед
+        (и назад) не считаются.
+        """
+        play = self._open_play
+        if play is None or play.track_key != track_key:
+            return
+        position_ms = max(0, position_ms)
+        now = monotonic()
+        delta = position_ms - play.last_position_ms
+        if 0 < delta <= (now - play.last_tick_at) * 1000 + _SEEK_SLACK_MS:
+            play.listened_ms += delta
+        play.last_tick_at = now
+        play.last_position_ms = position_ms
+        if duration_ms > 0:
+            play.last_duration_ms = duration_ms
+
+    def _close_open_play(self, *, finished: bool) -> None:
+        play, self._open_play = self._open_play, None
+        assert play is not None
+        position = play.last_position_ms
+        duration = play.last_duration_ms
+        if finished:
+            skipped = False
+        else:
+            skipped = duration <= 0 or position < duration * _SKIP_THRESHOLD
+        self._pending_events.append(
+            PlayEvent(
+                track_key=play.track_key,
+                artist=play.track.author,
+                source=play.track.source,
+                started_at=play.started_at,
+                ended_at=int(time()),
+                position_ms=position,
+                duration_ms=duration,
+                listened_ms=play.listened_ms,
+                skipped=skipped,
+            )
+        )
+        self._schedule_flush()
 
-        tracks: list[Track] = []
-        for entry in entries:
-            source, track_id = self._split_track_key(entry.track_key, entry.source)
-            downloaded = self._track_manager.is_downloaded(str(track_id))
-            if source == "yandex":
-                tracks.append(
-                    YandexTrack(
-                        track_id=int(track_id) if str(track_id).isdigit() else track_id,
-                        title=entry.title,
-                        author=entry.author,
-                        downloaded=downloaded,
-                        listen_count=entry.listen_count,
-                    )
+    async def _apply_retention(self) -> None:
+        """Удаляет устаревшие события и дневные агрегаты и сворачивает старые (раз за сессию)."""
+        today = date.today()
+        events_before = int(time()) - _EVENTS_RETENTION_DAYS * 86400
+        daily_before = (today - timedelta(days=_DAILY_RETENTION_DAYS)).isoformat()
+        # Сворачиваются только целые месяцы.
+        compact_before = (today - timedelta(days=_COMPACT_AFTER_DAYS)).replace(day=1).isoformat()
+        try:
+            await self._events.prune(events_before, daily_before)
+            await self._events.compact(compact_before)
+        except Exception:
+            logger.exception("Не удалось применить политику хранения журнала")
+
+    async def _overlay_unflushed(self, entries: list[TrackHistoryEntry]) -> list[TrackHistoryEntry]:
+        """Дополняет выборку из БД обновлениями, которые еще не записаны.
+
+        Счетчик прослушиваний буфера — только прирост; для треков вне
+        выборки сохраненное значение дочитывается из БД по ключам.
+        """
+        if not self._pending and not self._flushing:
+            return entries
+        # Снимок буфера: пока идет запрос, он может смениться.
+        layers = (dict(self._flushing), dict(self._pending))
+        by_key = {entry.track_key: entry for entry in entries}
+        outside = {key for updates in layers for key in updates if key not in by_key}
+        stored = await self._repo.get_listen_counts(outside) if outside else {}
+        stored.update((key, entry.listen_count) for key, entry in by_key.items())
+        overlaid: dict[str, TrackHistoryEntry] = {}
+        for updates in layers:
+            for update in updates.values():
+                base = overlaid.get(update.track_key)
+                base_count = base.listen_count if base is not None else stored.get(update.track_key, 0)
+                listen_count = update.listen_increment + base_count
+                overlaid.pop(update.track_key, None)
+                overlaid[update.track_key] = TrackHistoryEntry(
+                    track_key=update.track_key,
+                    title=update.title,
+                    author=update.author,
+                    source=update.source,
+                    position_ms=update.position_ms,
+                    duration_ms=update.duration_ms,
+                    listen_count=listen_count,
+                    last_played_at=update.played_at,
                 )
+        # Буферизованные обновления новее записей БД; при равном времени
+        # выше идет то, что сохранено позже.
+        merged = list(reversed(overlaid.values()))
+        merged.extend(entry for key, entry in by_key.items() if key not in overlaid)
+        merged.sort(key=lambda entry: entry.last_played_at, reverse=True)
+        return merged
+
+    def _requeue(self, batch: dict[str, TrackProgressUpdate]) -> None:
+        """Возвращает в буфер пачку, которую не удалось записать."""
+        for track_key, update in batch.items():
+            newer = self._pending.get(track_key)
+            if newer is None:
+                self._pending[track_key] = update
             else:
-                tracks.append(
-                    YoutubeTrack(
-                        track_id=str(track_id),
-                        title=entry.title,
-                        author=entry.author,
-                        downloaded=downloaded,
-                        listen_count=entry.listen_count,
-                    )
-                )
-        return RecentlyPlayedPlaylist(tracks=tracks)
+                newer.listen_increment += update.listen_increment
+        self._schedule_flush()
 
-    async def close(self) -> None:
-        """Закрывает соединение с БД при завершении приложения."""
-        await self._db.close()
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_handle = loop.call_later(self._flush_interval_sec, self._on_flush_timer)
+
+    def _cancel_scheduled_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _on_flush_timer(self) -> None:
+        self._flush_handle = None
+        asyncio.get_running_loop().create_task(self.flush())
+
+    async def _warm_resume_cache(self) -> None:
+        try:
+            rows = await self._repo.get_recent_positions(_RESUME_CACHE_LIMIT)
+        except Exception:
+            logger.exception("Не удалось загрузить позиции продолжения")
+            return
+        # Старые вперед: в конце LRU окажутся самые свежие. Уже записанные
+        # за время загрузки позиции новее строк из БД и не перезаписываются.
+        warmed: OrderedDict[str, int] = OrderedDict(
+            (track_key, self._resume_offset(position, duration))
+            for track_key, position, duration in reversed(rows)
+        )
+        for track_key, position in self._resume_positions.items():
+            warmed.pop(track_key, None)
+            warmed[track_key] = position
+        self._resume_positions = warmed
+        # Полнота выставляется до обрезки: если позиции, сохраненные за время
+        # загрузки, вытеснили строки БД, обрезка сбросит флаг.
+        self._resume_complete = len(rows) < _RESUME_CACHE_LIMIT
+        self._trim_resume_cache()
+
+    def _cache_resume_position(self, track_key: str, position_ms: int, duration_ms: int) -> None:
+        self._resume_positions[track_key] = self._resume_offset(position_ms, duration_ms)
+        self._resume_positions.move_to_end(track_key)
+        self._trim_resume_cache()
+
+    @staticmethod
+    def _resume_offset(position_ms: int, duration_ms: int) -> int:
+        """С какой позиции продолжать: дослушанный почти до конца трек — с начала."""
+        position_ms = max(0, int(position_ms))
+        if duration_ms > 0 and position_ms >= duration_ms - _RESUME_TAIL_MS:
+            return 0
+        return position_ms
+
+    def _trim_resume_cache(self) -> None:
+        while len(self._resume_positions) > _RESUME_CACHE_LIMIT:
+            self._resume_positions.popitem(last=False)
+            self._resume_complete = False
+
+    def _remember_saved(self, track_key: str, saved_at: float) -> None:
+        self._last_saved_by_key[track_key] = saved_at
+        self._last_saved_by_key.move_to_end(track_key)
+        while len(self._last_saved_by_key) > _LAST_SAVED_LIMIT:
+            self._last_saved_by_key.popitem(last=False)
+
+    @staticmethod
+    def _streaks(active_days: list[str], today: date) -> tuple[int, int]:
+        """Текущая и самая длинная серия дней подряд с прослушиваниями.
+
+        Текущая серия не прерывается, если сегодня еще ничего не слушали.
+        """
+        longest = run = 0
+        previous: date | None = None
+        for raw_day in active_days:
+            day = date.fromisoformat(raw_day)
+            run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+            longest = max(longest, run)
+            previous = day
+        if previous is None or (today - previous).days > 1:
+            return 0, longest
+        return run, longest
 
     @staticmethod
     def _split_track_key(track_key: str, source_fallback: str) -> tuple[str, str]:
@@ -127,3 +692,29 @@ class TrackHistoryService:
             return source_fallback or "youtube", track_key
         source, raw_id = track_key.split(":", 1)
         return source or source_fallback, raw_id
+
+
+def _sum_stats(key: str, rows: Iterable[PlayStats]) -> PlayStats:
+    """Сумма итогов."""
+    total = PlayStats(key, 0, 0, 0)
+    for row in rows:
+        total.plays += row.plays
+        total.skips += row.skips
+        total.listened_ms += row.listened_ms
+    return total
+
+
+def _overlay_stats(
+    rows: list[PlayStats], events: Iterable[PlayEvent], key: Callable[[PlayEvent], str]
+) -> list[PlayStats]:
+    """Прибавляет события к итогам по ключу ``key(event)`` (новые ключи добавляются)."""
+    by_key = {row.key: PlayStats(row.key, row.plays, row.skips, row.listened_ms, row.label) for row in rows}
+    for event in events:
+        event_key = key(event)
+        row = by_key.get(event_key)
+        if row is None:
+            row = by_key[event_key] = PlayStats(event_key, 0, 0, 0)
+        row.plays += 1
+        row.skips += int(event.skipped)
+        row.listened_ms += max(0, event.listened_ms)
+    return list(by_key.values())
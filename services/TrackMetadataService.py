@@ -0,0 +1,226 @@
+"""Сведения о треках: длительность, URL обложки, альбом.
+
+Поиск, стрим и скачивание попутно получают от провайдеров больше, чем
+нужно им самим; эти сведения складываются в таблицу ``track_metadata``
+(``database.TrackMetadataRepository``), длительность дописывает плеер.
+Повторные вопросы к провайдеру (трек по id, URL обложки) сначала
+смотрят сюда: ответ провайдера считается свежим ``_TTL_SEC``, потом его
+спрашивают заново. Длительность не устаревает.
+
+Запись буферизуется: ответ поиска — одна транзакция на всю страницу.
+В памяти держатся только ``_CACHE_LIMIT`` последних спрошенных треков.
+
+Паттерн: Singleton
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from dataclasses import replace
+from time import time
+from typing import Any, Iterable
+
+from database import AsyncDatabase, TrackMetadata, TrackMetadataRepository
+from models import Track
+from providers.LibraryIndex import build_track_key
+
+logger = logging.getLogger(__name__)
+
+# Сколько ответ провайдера считается свежим.
+_TTL_SEC = 7 * 86400
+# Пауза перед записью: сведения одной выдачи пишутся вместе.
+_FLUSH_DELAY_SEC = 1.0
+# Сколько треков держать в памяти (вместе с отсутствующими в БД).
+_CACHE_LIMIT = 5000
+# Размер обложки Яндекса (как у скачиваемых обложек).
+_YANDEX_COVER_SIZE = "200x200"
+
+
+def _field(obj: Any, name: str) -> Any:
+    """Поле ответа провайдера: объекта ``yandex_music`` или словаря."""
+    if isinstance(obj, dict):
+        return obj.get(name)
+    return getattr(obj, name, None)
+
+
+def yandex_metadata(info: Any) -> TrackMetadata:
+    """Сведения из трека ``yandex_music`` (поиск или ``client.tracks``)."""
+    albums = _field(info, "albums") or []
+    cover_uri = _field(info, "cover_uri") or ""
+    return TrackMetadata(
+        track_key=build_track_key("yandex", _field(info, "id")),
+        title=_field(info, "title") or "",
+        author=" & ".join(_field(artist, "name") or "" for artist in _field(info, "artists") or []),
+        album=(_field(albums[0], "title") or "") if albums else "",
+        duration_ms=int(_field(info, "duration_ms") or 0),
+        cover_url=f"https://{cover_uri.replace('%%', _YANDEX_COVER_SIZE)}" if cover_uri else "",
+        fetched_at=int(time()),
+    )
+
+
+def youtube_metadata(track_id: str, info: dict) -> TrackMetadata:
+    """Сведения из ответа ``ytmusicapi`` (результат поиска или ``get_song``)."""
+    details = info.get("videoDetails") or info
+    thumbnails = info.get("thumbnails") or (details.get("thumbnail") or {}).get("thumbnails") or []
+    album = info.get("album")
+    authors = " | ".join(author["name"] for author in info.get("artists") or [])
+    return TrackMetadata(
+        track_key=build_track_key("youtube", track_id),
+        title=details.get("title") or "",
+        author=authors or details.get("author") or "",
+        album=(album.get("name") or "") if isinstance(album, dict) else "",
+        duration_ms=int(info.get("duration_seconds") or details.get("lengthSeconds") or 0) * 1000,
+        cover_url=thumbnails[-1].get("url", "") if thumbnails else "",
+        fetched_at=int(time()),
+    )
+
+
+class TrackMetadataService:
+    """Чтение и дополнение сведений о треках.
+
+    Реализован как Singleton и работает через общий ``AsyncDatabase``.
+    """
+
+    _instance: TrackMetadataService | None = None
+
+    def __new__(cls) -> TrackMetadataService:
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self) -> None:
+        if getattr(self, "_initialized", False):
+            return
+        self._repo = TrackMetadataRepository(AsyncDatabase.shared())
+        # None — трека нет в БД: повторно он не запрашивается.
+        self._cache: OrderedDict[str, TrackMetadata | None] = OrderedDict()
+        self._pending: dict[str, TrackMetadata] = {}
+        self._flush_handle: asyncio.Handle | None = None
+        self._initialized = True
+
+    async def get(self, track_key: str) -> TrackMetadata | None:
+        """Известные сведения о треке или ``None``."""
+        if track_key in self._cache:
+            self._cache.move_to_end(track_key)
+            return self._cache[track_key]
+        try:
+            meta = await self._repo.get(track_key)
+        except Exception:
+            logger.exception("Не удалось прочитать сведения о треке: %s", track_key)
+            return None
+        return self._load(track_key, meta)
+
+    async def get_fresh(self, track_key: str) -> TrackMetadata | None:
+        """Сведения от провайдера, если они не старше ``_TTL_SEC``."""
+        meta = await self.get(track_key)
+        if meta is None or time() - meta.fetched_at >= _TTL_SEC:
+            return None
+        return meta
+
+    async def durations(self, track_keys: Iterable[str]) -> dict[str, int]:
+        """Известные длительности треков: ``track_key -> мс``."""
+        known: dict[str, TrackMetadata | None] = {}
+        unknown: list[str] = []
+        for key in set(track_keys):
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                known[key] = self._cache[key]
+            else:
+                unknown.append(key)
+        if unknown:
+            try:
+                found = await self._repo.get_many(unknown)
+            except Exception:
+                logger.exception("Не удалось прочитать длительности треков")
+            else:
+                by_key = {meta.track_key: meta for meta in found}
+                for key in unknown:
+                    known[key] = self._load(key, by_key.get(key))
+        return {key: meta.duration_ms for key, meta in known.items() if meta is not None and meta.duration_ms > 0}
+
+    def remember(self, meta: TrackMetadata) -> None:
+        """Дополняет сведения о треке (пустые поля ничего не затирают)."""
+        key = meta.track_key
+        # Пока строка не прочитана из БД, кэш не заполняется частью сведений:
+        # это сделает _load, наложив буфер на строку из БД.
+        if key in self._cache:
+            self._store(key, _merge(self._cache.get(key), meta))
+        self._pending[key] = _merge(self._pending.get(key), meta)
+        self._schedule_flush()
+
+    def remember_many(self, items: Iterable[TrackMetadata]) -> None:
+        """Дополняет сведения о нескольких треках."""
+        for meta in items:
+            self.remember(meta)
+
+    async def remember_duration(self, track: Track, duration_ms: int) -> None:
+        """Запоминает длительность, которую узнал плеер."""
+        if duration_ms <= 0:
+            return
+        key = track.key
+        known = await self.get(key)
+        if known is not None and known.duration_ms == duration_ms:
+            return
+        self.remember(TrackMetadata(track_key=key, duration_ms=duration_ms))
+
+    async def flush(self) -> None:
+        """Записывает накопленные сведения."""
+        self._cancel_scheduled_flush()
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await self._repo.upsert_many(batch.values())
+        except Exception:
+            logger.exception("Не удалось сохранить сведения о треках")
+
+    # --- internal ---
+
+    def _load(self, key: str, meta: TrackMetadata | None) -> TrackMetadata | None:
+        """Кладет в кэш строку из БД с несохраненными сведениями поверх."""
+        pending = self._pending.get(key)
+        if pending is not None:
+            meta = _merge(meta, pending)
+        self._store(key, meta)
+        return meta
+
+    def _store(self, key: str, meta: TrackMetadata | None) -> None:
+        self._cache[key] = meta
+        self._cache.move_to_end(key)
+        while len(self._cache) > _CACHE_LIMIT:
+            self._cache.popitem(last=False)
+
+    def _schedule_flush(self) -> None:
+        if self._flush_handle is not None:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._flush_handle = loop.call_later(_FLUSH_DELAY_SEC, self._on_flush_timer)
+
+    def _cancel_scheduled_flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+    def _on_flush_timer(self) -> None:
+        self._flush_handle = None
+        asyncio.get_running_loop().create_task(self.flush())
+
+
+def _merge(base: TrackMetadata | None, update: TrackMetadata) -> TrackMetadata:
+    """Как ``ON CONFLICT`` в репозитории: известные поля новой записи поверх старых."""
+    if base is None:
+        return replace(update)
+    return TrackMetadata(
+        track_key=base.track_key,
+        title=update.title or base.title,
+        author=update.author or base.author,
+        album=update.album or base.album,
+        duration_ms=update.duration_ms or base.duration_ms,
+        cover_url=update.cover_url or base.cover_url,
+        fetched_at=max(base.fetched_at, update.fetched_at),
+    )
@@ -1,4 +1,12 @@
 from .AsyncFinder import AsyncFinder
 from .AsyncStreamer import AsyncStreamer
 from .AsyncDownloader import AsyncDownloader
-from .TrackHistoryService import TrackHistoryService
\ No newline at end of file
+from .CoverStore import CoverStore
+from .LibrarySearch import LibrarySearch
+from .LocalLibrary import LocalLibrary
+from .MusicLibrary import MusicLibrary
+from .PlaylistService import PlaylistService
+from .PlaylistCatalog import PlaylistCatalog
+from .SearchSuggestions import SearchSuggestions
+from .TrackMetadataService import TrackMetadataService
+from .TrackHistoryService import ListeningStats, TrackHistoryService
\ No newline at end of file
@@ -8,7 +8,6 @@ from __future__ import annotations
 
 from typing import Optional
 
-import numpy as np
 from PySide6.QtCore import Qt, QTimer, QPointF
 from PySide6.QtGui import (
     QColor, QPainter, QPen, QPainterPath,
@@ -162,6 +161,8 @@ class AudioVisualizer(QWidget):
         if mags.size == 0:
             return [0.0] * self._bar_count
 
+        import numpy as np
+
         chunks = np.array_split(mags, self._bar_count)
         return [float(c.mean()) if c.size else 0.0 for c in chunks]
 
@@ -0,0 +1,95 @@
+"""Планировщик фоновой загрузки обложек для списков TrackCard.
+
+Обложки качаются параллельно, но не более ``max_concurrency`` одновременно.
+Очередность определяется видимой областью скролла: сначала карточки во
+вьюпорте, затем ниже него, затем выше. Приоритет вычисляется заново при
+каждой выборке следующей карточки, поэтому прокрутка сразу меняет порядок.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from bisect import bisect_left
+from typing import Sequence
+
+from PySide6.QtWidgets import QScrollArea
+
+from ui.TrackCard import TrackCard
+
+_MAX_CONCURRENCY = 6
+logger = logging.getLogger(__name__)
+
+
+class CoverLoadScheduler:
+    """Очередь загрузки обложек с приоритетом видимых карточек."""
+
+    def __init__(self, scroll: QScrollArea, max_concurrency: int = _MAX_CONCURRENCY) -> None:
+        self._scroll = scroll
+        self._max_concurrency = max(1, max_concurrency)
+        self._cards: list[TrackCard] = []
+        # Индексы карточек, ожидающих загрузки, в порядке возрастания.
+        self._pending: list[int] = []
+        self._workers: list[asyncio.Task] = []
+
+    def schedule(self, cards: Sequence[TrackCard]) -> None:
+        """Заменяет очередь новым набором карточек и запускает загрузку."""
+        self.cancel()
+        self._cards = list(cards)
+        self._pending = list(range(len(self._cards)))
+        self._spawn_workers()
+
+    def extend(self, cards: Sequence[TrackCard]) -> None:
+        """Добавляет карточки в конец очереди, не сбрасывая текущие загрузки."""
+        start = len(self._cards)
+        self._cards.extend(cards)
+        self._pending.extend(range(start, len(self._cards)))
+        self._spawn_workers()
+
+    def cancel(self) -> None:
+        """Отменяет все незавершенные загрузки (например, при смене плейлиста)."""
+        for task in self._workers:
+            task.cancel()
+        self._workers.clear()
+        self._pending.clear()
+        self._cards = []
+
+    def _spawn_workers(self) -> None:
+        self._workers = [task for task in self._workers if not task.done()]
+        missing = min(self._max_concurrency, len(self._pending)) - len(self._workers)
+        if missing <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for _ in range(missing):
+            self._workers.append(loop.create_task(self._worker()))
+
+    async def _worker(self) -> None:
+        while (card := self._take_next()) is not None:
+            try:
+                await card.load_cover()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Не удалось загрузить обложку трека в карточке")
+
+    def _take_next(self) -> TrackCard | None:
+        """Забирает из очереди карточку, ближайшую к вьюпорту."""
+        if not self._pending:
+            return None
+        pos = bisect_left(self._pending, self._first_visible_index())
+        if pos == len(self._pending):
+            # Все оставшиеся карточки выше вьюпорта — берем ближайшую к нему.
+            pos -= 1
+        return self._cards[self._pending.pop(pos)]
+
+    def _first_visible_index(self) -> int:
+        """Индекс первой карточки, нижний край которой ниже верха вьюпорта."""
+        top = self._scroll.verticalScrollBar().value()
+        try:
+            return bisect_left(self._cards, top, key=lambda card: card.y() + card.height())
+        except RuntimeError:
+            # Карточки уже удалены Qt — порядок не важен.
+            return 0
@@ -1,29 +1,25 @@
-from pathlib import Path
 import logging
 
 from PySide6.QtGui import QColor, QPainter, QLinearGradient, QBrush, QPainterPath, QPen
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QGridLayout, QScrollArea, QHBoxLayout,
     QLabel, QMessageBox, QPushButton, QInputDialog, QSizePolicy, QFrame,
+    QFileDialog,
 )
 from PySide6.QtCore import Qt, QRectF, Signal, QTimer
 from qasync import asyncSlot
 
 from models import DownloadPlaylist, RecentlyPlayedPlaylist, UserPlaylist
 from providers import PlaylistManager
-from services import TrackHistoryService
+from services import MusicLibrary, PlaylistCatalog, PlaylistService, TrackHistoryService
 from ui.PlaylistPreview import PlaylistPreview
-from utils import (
-    create_user_playlist_file,
-    delete_user_playlist_file,
-    get_user_playlist_path_by_name,
-    rename_user_playlist_file,
-    touch_user_playlist_file,
-)
+from utils import playlist_file_stem, startup_metrics
 
 _COLUMNS = 4
 _CARD_SPACING = 14
 _PANEL_RADIUS = 16
+# Задержка обновления "Недавно прослушанных" после записи в историю, мс.
+_RECENT_REFRESH_DELAY_MS = 1000
 logger = logging.getLogger(__name__)
 
 _SCROLL_QSS = """
@@ -42,12 +38,33 @@ _SCROLL_QSS = """
 class HomePage(QWidget):
 
     playlist_opened = Signal(object)
+    # (плейлист, треки): треки поднялись в начало "Недавно прослушанных".
+    recent_head_changed = Signal(object, object)
 
     def __init__(self, parent=None):
         super().__init__(parent)
 
         self._pm = PlaylistManager()
         self._history_service = TrackHistoryService()
+        self._playlists = PlaylistService()
+        self._catalog = PlaylistCatalog()
+        # Ревизия каталога, уже показанная на экране (-1 — еще ничего не показано).
+        self._user_revision = -1
+        self._catalog.changed.connect(self._on_catalog_changed)
+        self._catalog.moved_to_front.connect(self._on_playlist_moved_to_front)
+        self._library = MusicLibrary()
+        self._library.changed.connect(self._load_downloads)
+        self._downloads: DownloadPlaylist | None = None
+        self._downloads_card: PlaylistPreview | None = None
+        # Загруженный плейлист истории переиспользуется при открытии:
+        # новые прослушивания добавляются в его начало, а не перечитываются целиком.
+        self._recent: RecentlyPlayedPlaylist | None = None
+        self._recent_card: PlaylistPreview | None = None
+        self._recent_refresh_timer = QTimer(self)
+        self._recent_refresh_timer.setSingleShot(True)
+        self._recent_refresh_timer.setInterval(_RECENT_REFRESH_DELAY_MS)
+        self._recent_refresh_timer.timeout.connect(self._refresh_recent_async)
+        self._history_service.add_listener(self._recent_refresh_timer.start)
         self.setObjectName("HomePage")
 
         root = QVBoxLayout(self)
@@ -81,7 +98,6 @@ class HomePage(QWidget):
         self._user_section = _PlaylistSection("Ваши плейлисты", allow_create=True)
         self._user_section.create_requested.connect(self._create_playlist)
         self._content_lay.addWidget(self._user_section)
-        self._load_user_playlists()
 
         self._content_lay.addStretch()
 
@@ -91,63 +107,109 @@ class HomePage(QWidget):
     # ── loading ──
 
     def _load_system_playlists(self) -> None:
-        """Загружает системные плейлисты и запускает фоновую загрузку истории."""
+        """Запускает фоновую загрузку системных плейлистов."""
+        QTimer.singleShot(0, self._load_async)
+
+    @asyncSlot()
+    async def _load_async(self) -> None:
+        """Подгружает из БД скачанные треки, историю и пользовательские плейлисты."""
+        # Индекс скачанных нужен раньше остального: по нему проставляется ``downloaded``.
+        await self._library.load()
+        self._load_downloads()
+        await self._load_recent_played()
+        await self._load_user_playlists()
+        startup_metrics.mark(startup_metrics.HOME_POPULATED)
+
+    def _load_downloads(self) -> None:
+        """Показывает (или обновляет) карточку скачанных треков из индекса."""
         try:
-            dl = DownloadPlaylist.get_playlist_from_path("")
-            if dl and dl.tracks.values:
-                self._add_card(self._sys_section, dl)
+            tracks = DownloadPlaylist.get_tracks_from_library()
         except Exception:
             logger.exception("Не удалось загрузить системный плейлист скачанных треков")
+            return
+        if self._downloads is None:
+            if not tracks:
+                return
+            self._downloads = DownloadPlaylist(tracks=tracks)
+            self._downloads_card = self._add_card(self._sys_section, self._downloads)
+            return
+        self._downloads.tracks.values = tracks
+        self._downloads_card.refresh()
 
-        QTimer.singleShot(0, self._load_recent_played_async)
-
-    @asyncSlot()
-    async def _load_recent_played_async(self) -> None:
+    async def _load_recent_played(self) -> None:
         """Подгружает плейлист недавно прослушанных из БД."""
         try:
             recent = await self._history_service.get_recent_playlist(limit=24)
             if recent is None:
                 recent = RecentlyPlayedPlaylist(tracks=())
-            self._add_card(self._sys_section, recent)
+            self._recent = recent
+            self._recent_card = self._add_card(self._sys_section, recent)
         except Exception:
             logger.exception("Не удалось загрузить плейлист недавно прослушанных")
 
         if not self._sys_section.has_cards():
             self._sys_section.set_empty("Скачайте треки — они появятся здесь")
 
-    def _load_user_playlists(self) -> None:
-        """Загружает пользовательские плейлисты из директории `playlists/`.
+    @asyncSlot()
+    async def _refresh_recent_async(self) -> None:
+        """Дочитывает новые прослушивания в начало "Недавно прослушанных"."""
+        if self._recent is None:
+            return
+        try:
+            head = await self._history_service.refresh_recent_head(self._recent)
+        except Exception:
+            logger.exception("Не удалось обновить плейлист недавно прослушанных")
+            return
+        if not head:
+            return
+        if self._recent_card is not None:
+            self._recent_card.refresh()
+        self.recent_head_changed.emit(self._recent, head)
 
-        Плейлисты сортируются по времени модификации (новые/недавно открытые — сверху).
-        """
-        playlists_dir = Path("playlists")
-        if not playlists_dir.is_dir():
-            playlists_dir.mkdir(parents=True, exist_ok=True)
+    async def _load_user_playlists(self) -> None:
+        """Показывает пользовательские плейлисты (недавно открытые — сверху).
 
-        json_files = sorted(
-            (p for p in playlists_dir.iterdir() if p.suffix == ".json"),
-            key=lambda p: p.stat().st_mtime,
-            reverse=True,
-        ) if playlists_dir.is_dir() else []
+        Данные берутся из ``PlaylistCatalog``; если с прошлого показа ничего
+        не менялось, карточки не пересоздаются.
+        """
+        try:
+            # Повторяем, пока список не прочитан без изменений посередине.
+            while True:
+                revision = self._catalog.revision
+                playlists = await self._catalog.get_playlists()
+                if revision == self._catalog.revision:
+                    break
+        except Exception:
+            logger.exception("Не удалось загрузить пользовательские плейлисты")
+            return
+        if revision == self._user_revision:
+            return
+        self._user_revision = revision
 
-        for path in json_files:
-            try:
-                playlist = UserPlaylist.get_playlist_from_path(str(path))
-            except Exception:
-                continue
-            if playlist is None:
-                continue
+        # Карточки меняются только после всех await, одним синхронным блоком.
+        self._user_section.clear_cards()
+        for playlist in playlists:
             self._add_card(self._user_section, playlist)
 
         if not self._user_section.has_cards():
-            self._user_section.set_empty("Добавьте .json файл в папку playlists/")
+            self._user_section.set_empty("Создайте плейлист или добавьте .json файл в папку playlists/")
 
-    def _reload_user_playlists(self) -> None:
-        """Перезагружает блок пользовательских плейлистов на экране."""
-        self._user_section.clear_cards()
-        self._load_user_playlists()
+    @asyncSlot()
+    async def _reload_user_playlists(self) -> None:
+        """Обновляет блок пользовательских плейлистов, если они изменились."""
+        await self._load_user_playlists()
 
-    def _create_playlist(self) -> None:
+    def _on_catalog_changed(self) -> None:
+        # Скрытая главная обновится при возврате на нее (Stack.switch_to).
+        if self.isVisible():
+            QTimer.singleShot(0, self._reload_user_playlists)
+
+    def _on_playlist_moved_to_front(self, name: str) -> None:
+        # Порядок меняется без пересоздания карточек и без чтения БД.
+        self._user_section.move_card_to_front(name)
+
+    @asyncSlot()
+    async def _create_playlist(self) -> None:
         """Открывает диалог создания нового пользовательского плейлиста."""
         name, ok = QInputDialog.getText(
             self,
@@ -158,40 +220,42 @@ class HomePage(QWidget):
             return
 
         try:
-            create_user_playlist_file(name)
+            await self._playlists.create_playlist(name)
         except ValueError as exc:
             QMessageBox.warning(self, "Ошибка", str(exc))
             return
-        except FileExistsError as exc:
-            QMessageBox.warning(self, "Ошибка", str(exc))
-            return
         except Exception:
+            logger.exception("Не удалось создать плейлист")
             QMessageBox.critical(self, "Ошибка", "Не удалось создать плейлист.")
             return
 
-        self._reload_user_playlists()
+        await self._load_user_playlists()
 
-    def _add_card(self, section: "_PlaylistSection", playlist) -> None:
+    def _add_card(self, section: "_PlaylistSection", playlist) -> PlaylistPreview:
         card = PlaylistPreview(playlist)
         card.clicked.connect(self._on_click)
         if isinstance(playlist, UserPlaylist):
             card.rename_requested.connect(self._rename_playlist)
             card.delete_requested.connect(self._delete_playlist)
+            card.export_requested.connect(self._export_playlist)
         section.add_card(card)
+        return card
 
     @asyncSlot(object)
     async def _on_click(self, playlist) -> None:
-        # Для "Недавно прослушанных" всегда загружаем свежий срез из БД.
+        # "Недавно прослушанные" открываются из уже загруженных страниц:
+        # свежие прослушивания подтягиваются в начало до открытия, остальное
+        # догружается прокруткой.
         if isinstance(playlist, RecentlyPlayedPlaylist):
-            fresh = await self._history_service.get_recent_playlist(limit=50)
-            playlist = fresh if fresh is not None else RecentlyPlayedPlaylist(tracks=())
+            if self._recent_refresh_timer.isActive():
+                self._recent_refresh_timer.stop()
+                await self._refresh_recent_async()
         elif isinstance(playlist, UserPlaylist):
-            # Перечитываем плейлист с диска, чтобы подхватить добавленные треки,
-            # и обновляем mtime файла, чтобы он поднимался вверх списка.
+            # Перечитываем плейлист из БД, чтобы подхватить добавленные треки,
+            # и отмечаем его открытым, чтобы он поднимался вверх списка.
             try:
-                touch_user_playlist_file(playlist.name)
-                path = get_user_playlist_path_by_name(playlist.name)
-                fresh = UserPlaylist.get_playlist_from_path(str(path))
+                await self._playlists.touch_playlist(playlist.name)
+                fresh = await self._playlists.get_playlist(playlist.name)
                 if fresh is not None:
                     playlist = fresh
             except Exception:
@@ -199,7 +263,8 @@ class HomePage(QWidget):
         self._pm.set_playlist(playlist)
         self.playlist_opened.emit(playlist)
 
-    def _rename_playlist(self, playlist: UserPlaylist) -> None:
+    @asyncSlot(object)
+    async def _rename_playlist(self, playlist: UserPlaylist) -> None:
         """Переименовывает пользовательский плейлист через контекстное меню."""
         old_name = getattr(playlist, "name", "").strip()
         if not old_name:
@@ -216,23 +281,19 @@ class HomePage(QWidget):
             return
 
         try:
-            rename_user_playlist_file(old_name, new_name)
-        except ValueError as exc:
-            QMessageBox.warning(self, "Ошибка", str(exc))
-            return
-        except FileExistsError as exc:
-            QMessageBox.warning(self, "Ошибка", str(exc))
-            return
-        except FileNotFoundError as exc:
+            await self._playlists.rename_playlist(old_name, new_name)
+        except (ValueError, LookupError) as exc:
             QMessageBox.warning(self, "Ошибка", str(exc))
             return
         except Exception:
+            logger.exception("Не удалось переименовать плейлист")
             QMessageBox.critical(self, "Ошибка", "Не удалось переименовать плейлист.")
             return
 
-        self._reload_user_playlists()
+        await self._load_user_playlists()
 
-    def _delete_playlist(self, playlist: UserPlaylist) -> None:
+    @asyncSlot(object)
+    async def _delete_playlist(self, playlist: UserPlaylist) -> None:
         """Удаляет пользовательский плейлист через контекстное меню."""
         name = getattr(playlist, "name", "").strip()
         if not name:
@@ -248,18 +309,40 @@ class HomePage(QWidget):
             return
 
         try:
-            delete_user_playlist_file(name)
-        except FileNotFoundError as exc:
-            QMessageBox.warning(self, "Ошибка", str(exc))
-            return
-        except ValueError as exc:
+            await self._playlists.delete_playlist(name)
+        except LookupError as exc:
             QMessageBox.warning(self, "Ошибка", str(exc))
             return
         except Exception:
+            logger.exception("Не удалось удалить плейлист")
             QMessageBox.critical(self, "Ошибка", "Не удалось удалить плейлист.")
             return
 
-        self._reload_user_playlists()
+        await self._load_user_playlists()
+
+    @asyncSlot(object)
+    async def _export_playlist(self, playlist: UserPlaylist) -> None:
+        """Сохраняет пользовательский плейлист в .json через контекстное меню."""
+        try:
+            default_name = f"{playlist_file_stem(playlist.name)}.json"
+        except ValueError:
+            default_name = "playlist.json"
+        path, _ = QFileDialog.getSaveFileName(
+            self,
+            "Экспорт плейлиста",
+            default_name,
+            "JSON (*.json)",
+        )
+        if not path:
+            return
+
+        try:
+            await self._playlists.export_json(playlist.name, path)
+        except LookupError as exc:
+            QMessageBox.warning(self, "Ошибка", str(exc))
+        except Exception:
+            logger.exception("Не удалось экспортировать плейлист")
+            QMessageBox.critical(self, "Ошибка", "Не удалось экспортировать плейлист.")
 
     def paintEvent(self, event) -> None:
         super().paintEvent(event)
@@ -372,6 +455,22 @@ class _PlaylistSection(QWidget):
     def has_cards(self) -> bool:
         return bool(self._cards)
 
+    def move_card_to_front(self, name: str) -> None:
+        """Ставит карточку плейлиста ``name`` первой, не пересоздавая карточки."""
+        for index, card in enumerate(self._cards):
+            if card.playlist is not None and card.playlist.name == name:
+                break
+        else:
+            return
+        if index == 0:
+            return
+        self._cards.insert(0, self._cards.pop(index))
+        for card in self._cards:
+            self._grid.removeWidget(card)
+        for idx, card in enumerate(self._cards):
+            row, col = divmod(idx, _COLUMNS)
+            self._grid.addWidget(card, row, col)
+
     def clear_cards(self) -> None:
         """Очищает текущие карточки секции."""
         for card in self._cards:
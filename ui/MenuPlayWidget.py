@@ -7,11 +7,10 @@ from PySide6.QtWidgets import (
 from qasync import asyncSlot
 
 from player import Player
-from services import AsyncDownloader
-from providers import PlaylistManager, PathProvider
+from services import AsyncDownloader, CoverStore
+from providers import PlaylistManager
 from models import Track
 from utils import asset_path
-import os
 
 _BG_COLOR = QColor(0, 0, 0, 200)
 _BG_RADIUS = 18
@@ -74,7 +73,7 @@ class PlayMenu(QWidget):
         self.playlist_manager = PlaylistManager()
         self.player = Player()
         self.downloader = AsyncDownloader()
-        self._path_provider = PathProvider()
+        self._covers = CoverStore()
 
         self._seeking = False  # True, пока пользователь двигает ползунок перемотки
         self._repeat_mode = "off"  # "off" | "one" | "all"
@@ -254,11 +253,9 @@ class PlayMenu(QWidget):
     async def set_track(self, track: Track) -> None:
         self._title.setText(_elide(track.title, 22))
         self._artist.setText(_elide(track.author, 24))
-        path = self._path_provider.get_cover_path(track)
-        if not os.path.exists(path):
-            await self.downloader.download_cover(track)
-        if os.path.exists(path):
-            pm = QPixmap(path).scaled(
+        image = await self._covers.load(track)
+        if image is not None:
+            pm = QPixmap.fromImage(image).scaled(
                 48, 48, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation,
             )
             self._cover.setPixmap(pm)
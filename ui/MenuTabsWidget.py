@@ -24,6 +24,7 @@ class MenuTabs(QWidget):
     LIBRARY = 2
     SETTINGS = 3
     USER = 4
+    STATS = 5
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -44,16 +45,19 @@ class MenuTabs(QWidget):
         self.btn_home = self._make_nav_button("🏠")
         self.btn_search = self._make_nav_button("🔍")
         self.btn_library = self._make_nav_button("🎵")
+        self.btn_stats = self._make_nav_button("📊")
 
         self.btn_home.setChecked(True)
 
         self.btn_home.clicked.connect(lambda: self._switch(self.HOME))
         self.btn_search.clicked.connect(lambda: self._switch(self.SEARCH))
         self.btn_library.clicked.connect(lambda: self._switch(self.LIBRARY))
+        self.btn_stats.clicked.connect(lambda: self._switch(self.STATS))
 
         panel_layout.addWidget(self.btn_home)
         panel_layout.addWidget(self.btn_search)
         panel_layout.addWidget(self.btn_library)
+        panel_layout.addWidget(self.btn_stats)
 
         # --- нижние кнопки инструментов ---
         self.btn_settings = self._make_tool_button(asset_path("assets/icons/setting.png"))
@@ -77,7 +81,13 @@ class MenuTabs(QWidget):
         root.setContentsMargins(0, 0, 0, 0)
         root.addWidget(panel)
 
-        self._nav_buttons = [self.btn_home, self.btn_search, self.btn_library]
+        # Индекс страницы -> кнопка навигации
+        self._nav_buttons = {
+            self.HOME: self.btn_home,
+            self.SEARCH: self.btn_search,
+            self.LIBRARY: self.btn_library,
+            self.STATS: self.btn_stats,
+        }
 
         # ================= СТИЛИ =================
         self.setStyleSheet("""
@@ -119,8 +129,8 @@ class MenuTabs(QWidget):
     # --- переключение ---
 
     def _switch(self, index: int) -> None:
-        for i, btn in enumerate(self._nav_buttons):
-            btn.setChecked(i == index)
+        for page, btn in self._nav_buttons.items():
+            btn.setChecked(page == index)
         self.page_changed.emit(index)
 
     # --- фабрики виджетов ---
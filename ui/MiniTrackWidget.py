@@ -1,4 +1,3 @@
-import os
 
 from PySide6.QtWidgets import (
     QWidget,
@@ -12,16 +11,14 @@ from PySide6.QtCore import Qt
 from qasync import asyncSlot
 
 from models import Track
-from providers import PathProvider
-from services import AsyncDownloader
+from services import CoverStore
 
 
 class MiniTrackWidget(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
 
-        self.path_provider = PathProvider()
-        self.downloader = AsyncDownloader()
+        self._covers = CoverStore()
 
         self.setObjectName("MiniTrack")
         self.setFixedHeight(64)
@@ -76,10 +73,8 @@ class MiniTrackWidget(QWidget):
 
     @asyncSlot()
     async def update_widget(self, track: Track):
-        path = self.path_provider.get_cover_path(track)
-        if not os.path.exists(path):
-            await self.downloader.download_cover(track)
-        pixmap = QPixmap(path)
+        image = await self._covers.load(track)
+        pixmap = QPixmap() if image is None else QPixmap.fromImage(image)
         self.cover.setPixmap(pixmap.scaled(48, 48,
                 Qt.KeepAspectRatioByExpanding,
                 Qt.SmoothTransformation))
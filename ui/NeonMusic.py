@@ -14,7 +14,8 @@ from PySide6.QtGui import QPixmap, QGuiApplication
 from PySide6.QtCore import QSettings, Qt
 from qasync import asyncSlot
 
-from utils import asset_path
+from services import CoverStore, LocalLibrary
+from utils import asset_path, startup_metrics
 from ui.MenuPlayWidget import PlayMenu
 from ui.MenuTabsWidget import MenuTabs
 from ui.Stack import Stack
@@ -32,6 +33,8 @@ class NeonMusic(QMainWindow):
         viz_g = int(self._settings.value("visualizer/color_g", 220))
         viz_b = int(self._settings.value("visualizer/color_b", 255))
         viz_color = (viz_r, viz_g, viz_b)
+        library_folders = [str(path) for path in self._settings.value("library/folders", [], type=list)]
+        cover_pack = self._settings.value("covers/packed", False, type=bool)
 
         self.setWindowTitle("NeonMusic")
         # Широкая ширина, обычная высота — чтобы всё было видно
@@ -118,6 +121,13 @@ class NeonMusic(QMainWindow):
         self.stack.settings_page.visualizer_color_changed.connect(self._set_visualizer_color)
         self.stack.settings_page.visualizer_mode_changed.connect(self._set_visualizer_mode)
         self.stack.settings_page.set_visualizer_settings(viz_delay, viz_color, viz_mode)
+        self.stack.settings_page.library_folders_changed.connect(self._set_library_folders)
+        self.stack.settings_page.set_library_folders(library_folders)
+        # Обход папок стартует с задержкой и идет в фоне, окно его не ждет.
+        LocalLibrary().set_folders(library_folders)
+        self.stack.settings_page.cover_pack_toggled.connect(self._set_cover_pack)
+        self.stack.settings_page.set_cover_pack(cover_pack)
+        CoverStore().set_packed(cover_pack)
 
         # ================== ОБЩИЙ СТИЛЬ ==================
         self.setStyleSheet("""
@@ -161,6 +171,16 @@ class NeonMusic(QMainWindow):
         self.visualizer.set_mode(mode)
         self._settings.setValue("visualizer/mode", str(mode))
 
+    def _set_library_folders(self, folders: list) -> None:
+        """Сохраняет папки локальной музыки и запускает их обход."""
+        self._settings.setValue("library/folders", list(folders))
+        LocalLibrary().set_folders(folders)
+
+    def _set_cover_pack(self, enabled: bool) -> None:
+        """Сохраняет режим хранения обложек."""
+        self._settings.setValue("covers/packed", bool(enabled))
+        CoverStore().set_packed(enabled)
+
     def _center_on_screen(self) -> None:
         """Размещает окно по центру доступной области экрана."""
         screen = QGuiApplication.primaryScreen()
@@ -170,6 +190,11 @@ class NeonMusic(QMainWindow):
             frame.moveCenter(available.center())
             self.move(frame.topLeft())
 
+    # ================== ОТРИСОВКА ==================
+    def paintEvent(self, event) -> None:
+        startup_metrics.mark(startup_metrics.FIRST_PAINT)
+        super().paintEvent(event)
+
     # ================== ИЗМЕНЕНИЕ РАЗМЕРА ==================
     def resizeEvent(self, event) -> None:
         self.background.resize(self.size())
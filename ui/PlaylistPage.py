@@ -1,19 +1,19 @@
 """Страница плейлиста — открывается при клике на карточку плейлиста.
 
 Верх: обложка + название + кол-во треков + кнопки (play all, shuffle).
-Ниже: скроллируемый список TrackCard.
+Ниже: виртуализированный список треков (``ui.TrackList``) — строки рисует
+делегат, виджеты на каждый трек не создаются.
 """
 
 from __future__ import annotations
 
-import asyncio
 import os
 import logging
 from typing import Optional
 
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel,
-    QMessageBox, QScrollArea, QFrame, QToolButton, QSizePolicy,
+    QMessageBox, QFrame, QToolButton, QSizePolicy, QLineEdit,
 )
 from PySide6.QtGui import (
     QPixmap, QColor, QPainter, QLinearGradient, QBrush,
@@ -22,19 +22,29 @@ from PySide6.QtGui import (
 from PySide6.QtCore import Qt, QRectF, Signal, QSize
 from qasync import asyncSlot
 
-from models import Track, UserPlaylist
+from models import RecentlyPlayedPlaylist, Track, UserPlaylist
 from player import Player
-from providers import PlaylistManager, PathProvider
-from services import AsyncDownloader
-from ui.TrackCard import TrackCard
-from utils import remove_track_from_user_playlist
+from providers import PlaylistManager
+from services import AsyncDownloader, CoverStore, PlaylistService, TrackHistoryService
+from ui.TrackList import TrackListView
 from utils import get_ru_words_for_number
+from utils.track_index import SORT_ADDED, SORT_AUTHOR, SORT_LISTENS, SORT_TITLE
 
 _COVER_SIZE = 160
 _COVER_RADIUS = 16
 _HEADER_HEIGHT = 220
 _PANEL_RADIUS = 16
 _ACCENT = QColor(0, 220, 255)
+# За сколько пикселей до конца списка догружать следующую страницу истории.
+_LOAD_MORE_THRESHOLD_PX = 400
+_HISTORY_PAGE_SIZE = 50
+_SORT_BTN_QSS = """
+    QToolButton {{
+        color: {color}; font-size: 11px; font-weight: 600;
+        background: transparent; border: none; padding: 0;
+    }}
+    QToolButton:hover {{ color: rgba(255,255,255,140); }}
+"""
 logger = logging.getLogger(__name__)
 
 
@@ -48,10 +58,12 @@ class PlaylistPage(QWidget):
 
         self._player = Player()
         self._pm = PlaylistManager()
-        self._path = PathProvider()
+        self._covers = CoverStore()
         self._dl = AsyncDownloader()
+        self._playlists = PlaylistService()
+        self._history_service = TrackHistoryService()
         self._playlist = None
-        self._cards: list[TrackCard] = []
+        self._loading_more = False
         self._playlist_cache_key: tuple[str, ...] | None = None
         self._player.track_changed.connect(self._on_track_changed)
 
@@ -84,27 +96,46 @@ class PlaylistPage(QWidget):
         list_lay.setContentsMargins(12, 10, 12, 10)
         list_lay.setSpacing(0)
 
-        # column header
+        # filter
+        self._filter = _FilterEdit()
+        self._filter.setPlaceholderText("Фильтр по названию и исполнителю")
+        self._filter.setClearButtonEnabled(True)
+        self._filter.setStyleSheet(
+            "color: white; background: rgba(255,255,255,10);"
+            "border: 1px solid rgba(255,255,255,20); border-radius: 8px; padding: 6px;"
+        )
+        self._filter.textChanged.connect(self._on_filter_changed)
+        self._filter.focused.connect(self._on_filter_focused)
+        list_lay.addWidget(self._filter)
+        list_lay.addSpacing(8)
+
+        # column header — клик по колонке сортирует, повторный меняет направление
         col_hdr = QHBoxLayout()
         col_hdr.setContentsMargins(10, 0, 10, 8)
+        col_hdr.setSpacing(12)
 
-        num_h = QLabel("#")
+        self._sort_column = SORT_ADDED
+        self._sort_descending = False
+        self._sort_buttons: dict[str, QToolButton] = {}
+        num_h = self._sort_button("#", SORT_ADDED)
         num_h.setFixedWidth(22)
-        num_h.setAlignment(Qt.AlignCenter)
-        num_h.setStyleSheet("color: rgba(255,255,255,50); font-size: 12px; background: transparent;")
-
-        title_h = QLabel("НАЗВАНИЕ")
-        title_h.setStyleSheet("color: rgba(255,255,255,50); font-size: 11px; font-weight: 600; background: transparent;")
+        title_h = self._sort_button("НАЗВАНИЕ", SORT_TITLE)
+        author_h = self._sort_button("ИСПОЛНИТЕЛЬ", SORT_AUTHOR)
+        listens_h = self._sort_button("ПРОСЛУШИВАНИЯ", SORT_LISTENS)
 
         source_h = QLabel("ИСТОЧНИК")
-        source_h.setAlignment(Qt.AlignRight)
+        source_h.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
         source_h.setStyleSheet("color: rgba(255,255,255,50); font-size: 11px; font-weight: 600; background: transparent;")
 
         col_hdr.addWidget(num_h)
-        col_hdr.addSpacing(60)  # cover width gap
-        col_hdr.addWidget(title_h, stretch=1)
+        col_hdr.addSpacing(48)  # cover width gap
+        col_hdr.addWidget(title_h)
+        col_hdr.addWidget(author_h)
+        col_hdr.addStretch(1)
+        col_hdr.addWidget(listens_h)
         col_hdr.addWidget(source_h)
         col_hdr.addSpacing(40)
+        self._update_sort_buttons()
 
         list_lay.addLayout(col_hdr)
 
@@ -115,14 +146,10 @@ class PlaylistPage(QWidget):
         list_lay.addWidget(div)
         list_lay.addSpacing(4)
 
-        # scroll
-        scroll = QScrollArea()
-        scroll.setWidgetResizable(True)
-        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
-        scroll.setFrameShape(QFrame.NoFrame)
-        scroll.setStyleSheet("""
-            QScrollArea { background: transparent; border: none; }
-            QWidget#_tlc { background: transparent; }
+        # list
+        self._list = TrackListView()
+        self._list.setStyleSheet("""
+            QListView { background: transparent; border: none; }
             QScrollBar:vertical {
                 width: 5px; background: transparent;
             }
@@ -131,16 +158,11 @@ class PlaylistPage(QWidget):
             }
             QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical { height: 0; }
         """)
-
-        self._track_container = QWidget()
-        self._track_container.setObjectName("_tlc")
-        self._track_layout = QVBoxLayout(self._track_container)
-        self._track_layout.setContentsMargins(0, 0, 0, 0)
-        self._track_layout.setSpacing(2)
-        self._track_layout.addStretch()
-
-        scroll.setWidget(self._track_container)
-        list_lay.addWidget(scroll)
+        self._list.play_requested.connect(self._on_play)
+        self._list.download_requested.connect(self._on_download)
+        self._list.remove_from_playlist_requested.connect(self._on_remove_from_playlist)
+        self._list.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+        list_lay.addWidget(self._list)
 
         root.addWidget(self._list_panel, stretch=1)
 
@@ -149,26 +171,12 @@ class PlaylistPage(QWidget):
     @asyncSlot()
     async def load_playlist(self, playlist) -> None:
         """Load and display a playlist."""
+        opened = playlist is not self._playlist
         self._playlist = playlist
         self._pm.set_playlist(playlist)
-        tracks = list(playlist.tracks.values)
-        allow_remove = isinstance(playlist, UserPlaylist)
+        tracks = playlist.tracks.values
         new_key = self._build_playlist_cache_key(playlist)
 
-        # Если открыт тот же плейлист без изменений — не пересоздаем карточки.
-        if self._playlist_cache_key == new_key and len(self._cards) == len(tracks):
-            self._header.set_info(
-                name=playlist.name,
-                count=len(tracks),
-                pixmap=self._try_cover_sync(playlist),
-            )
-            self._sync_playing_state()
-            self._load_covers_bg()
-            return
-
-        # clear old cards first
-        self._clear_tracks()
-
         # header — show instantly with whatever cover is on disk
         self._header.set_info(
             name=playlist.name,
@@ -176,18 +184,35 @@ class PlaylistPage(QWidget):
             pixmap=self._try_cover_sync(playlist),
         )
 
-        await self._populate_track_cards(tracks, allow_remove)
-        self._playlist_cache_key = new_key
+        if opened:
+            self._reset_view_controls()
+        # Если открыт тот же плейлист без изменений — список и прокрутка остаются.
+        if self._playlist_cache_key != new_key:
+            self._list.set_tracks(tracks, allow_remove=isinstance(playlist, UserPlaylist))
+            self._playlist_cache_key = new_key
+        if opened:
+            self._list.scrollToTop()
 
         self._sync_playing_state()
+        self._load_header_cover()
+        self._maybe_load_more()
 
-        # covers load lazily in background after the list is visible
-        self._load_covers_bg()
+    def apply_recent_head(self, playlist, head: list[Track]) -> None:
+        """Поднимает треки в начало открытой истории без сброса прокрутки."""
+        if playlist is not self._playlist or not head:
+            return
+        self._list.move_to_front(head)
+        self._playlist_cache_key = self._build_playlist_cache_key(playlist)
+        self._header.set_info(
+            name=playlist.name,
+            count=len(playlist.tracks.values),
+            pixmap=self._try_cover_sync(playlist),
+        )
+        self._sync_playing_state()
 
     @asyncSlot()
-    async def _load_covers_bg(self) -> None:
-        """Download missing covers one-by-one without blocking the UI."""
-        # header cover (download if missing)
+    async def _load_header_cover(self) -> None:
+        """Download the header cover in background if missing."""
         if self._playlist:
             cover_pm = await self._resolve_cover(self._playlist)
             if cover_pm:
@@ -196,59 +221,111 @@ class PlaylistPage(QWidget):
                     count=len(self._playlist.tracks.values),
                     pixmap=cover_pm,
                 )
-        # track card covers
-        for card in list(self._cards):
-            try:
-                await card.load_cover()
-            except Exception:
-                logger.exception("Не удалось загрузить обложку трека в карточке")
 
     # ── internal ──
 
-    def _clear_tracks(self) -> None:
-        for card in self._cards:
-            card.hide()
-            card.setParent(None)
-            card.deleteLater()
-        self._cards.clear()
-        # remove all widgets except the stretch
-        while self._track_layout.count() > 1:
-            item = self._track_layout.takeAt(0)
-            w = item.widget()
-            if w:
-                w.hide()
-                w.setParent(None)
-                w.deleteLater()
-        self._playlist_cache_key = None
-
-    async def _populate_track_cards(self, tracks: list[Track], allow_remove: bool) -> None:
-        """Создает карточки батчами, чтобы не фризить UI на больших плейлистах."""
-        batch_size = 30
-        for i, track in enumerate(tracks, start=1):
-            card = TrackCard(track, index=i, allow_remove_from_playlist=allow_remove)
-            card.play_requested.connect(self._on_play)
-            card.download_requested.connect(self._on_download)
-            card.remove_from_playlist_requested.connect(self._on_remove_from_playlist)
-            self._track_layout.insertWidget(self._track_layout.count() - 1, card)
-            self._cards.append(card)
-            if i % batch_size == 0:
-                await asyncio.sleep(0)
+    def _sort_button(self, text: str, column: str) -> QToolButton:
+        button = QToolButton()
+        button.setText(text)
+        button.setCursor(Qt.PointingHandCursor)
+        button.clicked.connect(lambda _=False: self._on_sort_clicked(column))
+        self._sort_buttons[column] = button
+        return button
+
+    def _on_sort_clicked(self, column: str) -> None:
+        if column == self._sort_column:
+            self._sort_descending = not self._sort_descending
+        else:
+            self._sort_column = column
+            # Прослушивания по умолчанию — самые частые сверху.
+            self._sort_descending = column == SORT_LISTENS
+        self._update_sort_buttons()
+        self._apply_view()
+
+    def _on_filter_focused(self) -> None:
+        # Индекс строится до первого символа: клавиши не ждут его построения.
+        self._list.warm_up_filter()
+
+    def _on_filter_changed(self, _text: str) -> None:
+        if self._filter.text().strip():
+            self._list.warm_up_filter()
+        self._apply_view()
+
+    def _apply_view(self) -> None:
+        self._list.set_view(self._filter.text(), self._sort_column, self._sort_descending)
+        self._list.scrollToTop()
+
+    def _reset_view_controls(self) -> None:
+        """Сбрасывает фильтр и сортировку при открытии другого плейлиста."""
+        self._filter.blockSignals(True)
+        self._filter.clear()
+        self._filter.blockSignals(False)
+        self._sort_column = SORT_ADDED
+        self._sort_descending = False
+        self._update_sort_buttons()
+        self._list.set_view("", SORT_ADDED, False)
+
+    def _update_sort_buttons(self) -> None:
+        for column, button in self._sort_buttons.items():
+            text = button.text().rstrip(" ▲▼")
+            if column == self._sort_column and (column != SORT_ADDED or self._sort_descending):
+                button.setText(f"{text} {'▼' if self._sort_descending else '▲'}")
+                button.setStyleSheet(_SORT_BTN_QSS.format(color="rgb(0,220,255)"))
+            else:
+                button.setText(text)
+                button.setStyleSheet(_SORT_BTN_QSS.format(color="rgba(255,255,255,50)"))
+
+    def _on_scrolled(self, value: int) -> None:
+        bar = self._list.verticalScrollBar()
+        if bar.maximum() - value <= _LOAD_MORE_THRESHOLD_PX:
+            self._maybe_load_more()
+
+    def _maybe_load_more(self) -> None:
+        """Догружает следующую страницу истории, если она есть и список почти кончился."""
+        playlist = self._playlist
+        if self._loading_more or not isinstance(playlist, RecentlyPlayedPlaylist):
+            return
+        if playlist.has_more:
+            self._loading_more = True
+            self._load_more_recent(playlist)
 
-    @staticmethod
-    def _build_playlist_cache_key(playlist) -> tuple[str, ...]:
+    @asyncSlot()
+    async def _load_more_recent(self, playlist: RecentlyPlayedPlaylist) -> None:
+        try:
+            tracks = await self._history_service.load_more_recent(playlist, limit=_HISTORY_PAGE_SIZE)
+            if playlist is not self._playlist:
+                return
+            self._list.append_tracks(tracks)
+            self._playlist_cache_key = self._build_playlist_cache_key(playlist)
+            self._header.set_info(
+                name=playlist.name,
+                count=len(playlist.tracks.values),
+                pixmap=self._try_cover_sync(playlist),
+            )
+            self._sync_playing_state()
+        except Exception:
+            logger.exception("Не удалось догрузить историю прослушивания")
+            return
+        finally:
+            self._loading_more = False
+        # Если страница не заполнила окно, полосы прокрутки нет — грузим дальше.
+        bar = self._list.verticalScrollBar()
+        if bar.maximum() - bar.value() <= _LOAD_MORE_THRESHOLD_PX:
+            self._maybe_load_more()
+
+    @classmethod
+    def _build_playlist_cache_key(cls, playlist) -> tuple[str, ...]:
         """Возвращает ключ версии плейлиста для кэша рендера."""
         tracks = playlist.tracks.values
-        return (playlist.name,) + tuple(f"{t.source}:{t.track_id}" for t in tracks)
+        return (playlist.name,) + tuple(t.key for t in tracks)
 
     def _try_cover_sync(self, playlist) -> QPixmap | None:
         """Try to load cover from disk instantly (no downloads)."""
         tracks = playlist.tracks.values
         if not tracks:
             return None
-        path = self._path.get_cover_path(tracks[0])
-        if os.path.isfile(path):
-            return QPixmap(path)
-        return None
+        image = self._covers.image(tracks[0])
+        return None if image is None else QPixmap.fromImage(image)
 
     async def _resolve_cover(self, playlist) -> QPixmap | None:
         if playlist.cover_path and os.path.isfile(playlist.cover_path):
@@ -256,16 +333,8 @@ class PlaylistPage(QWidget):
         tracks = playlist.tracks.values
         if not tracks:
             return None
-        track = tracks[0]
-        path = self._path.get_cover_path(track)
-        if not os.path.isfile(path):
-            try:
-                await self._dl.download_cover(track)
-            except Exception:
-                logger.exception("Не удалось скачать обложку для трека: %s", track)
-        if os.path.isfile(path):
-            return QPixmap(path)
-        return None
+        image = await self._covers.load(tracks[0])
+        return None if image is None else QPixmap.fromImage(image)
 
     @asyncSlot(object)
     async def _on_play(self, track) -> None:
@@ -281,14 +350,11 @@ class PlaylistPage(QWidget):
 
     @asyncSlot(object)
     async def _on_remove_from_playlist(self, track) -> None:
-        """Удаляет трек из открытого пользовательского плейлиста и сохраняет JSON."""
+        """Удаляет трек из открытого пользовательского плейлиста."""
         if not isinstance(self._playlist, UserPlaylist):
             return
         try:
-            removed = remove_track_from_user_playlist(
-                self._playlist.name,
-                track_id=track.track_id,
-            )
+            removed = await self._playlists.remove_track(self._playlist.name, track)
         except Exception:
             QMessageBox.warning(self, "Ошибка", "Не удалось удалить трек из плейлиста.")
             return
@@ -309,8 +375,7 @@ class PlaylistPage(QWidget):
     def _sync_playing_state(self, current_track=None) -> None:
         """Highlight currently playing track if it belongs to this playlist."""
         track = current_track if current_track is not None else self._player.current_track
-        for card in self._cards:
-            card.set_playing(bool(track is not None and card.track == track))
+        self._list.set_playing(track)
 
     # ── paint ──
 
@@ -318,6 +383,16 @@ class PlaylistPage(QWidget):
         super().paintEvent(event)
 
 
+class _FilterEdit(QLineEdit):
+    """Поле фильтра; ``focused`` — сигнал о получении фокуса."""
+
+    focused = Signal()
+
+    def focusInEvent(self, event) -> None:
+        super().focusInEvent(event)
+        self.focused.emit()
+
+
 class _PlaylistHeader(QWidget):
     """Playlist cover + info + action buttons."""
 
@@ -9,7 +9,7 @@ from PySide6.QtGui import (
 )
 from PySide6.QtCore import Qt, Signal, QTimeLine, QRectF
 
-from providers import PathProvider
+from services import CoverStore
 from utils import get_ru_words_for_number
 
 _CARD_W = 170
@@ -27,11 +27,12 @@ class PlaylistPreview(QWidget):
     clicked = Signal(object)
     rename_requested = Signal(object)
     delete_requested = Signal(object)
+    export_requested = Signal(object)
 
     def __init__(self, playlist, parent=None):
         super().__init__(parent)
 
-        self._path = PathProvider()
+        self._covers = CoverStore()
         self._playlist = playlist
         self._hovered = False
         self._hover_t = 0.0  # 0..1
@@ -112,33 +113,42 @@ class PlaylistPreview(QWidget):
             word = "прослушиваний"
         return f"{listens} {word}"
 
+    @property
+    def playlist(self):
+        """Плейлист карточки."""
+        return self._playlist
+
+    def refresh(self) -> None:
+        """Обновляет подпись и обложку после изменения треков плейлиста."""
+        self._count.setText(self._build_subtitle(len(self._playlist.tracks.values)))
+        if self._cover_pixmap is None:
+            self._load_cover()
+        self.update()
+
     # ── cover loading ──
 
     def _load_cover(self) -> None:
         """Try to load cover from disk. Falls back to a nice gradient placeholder."""
-        cover_path = self._resolve_cover()
-        if cover_path and os.path.isfile(cover_path):
-            pm = QPixmap(cover_path)
-            if not pm.isNull():
-                self._cover_pixmap = pm.scaled(
-                    _COVER_SIZE, _COVER_SIZE,
-                    Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation,
-                )
+        pm = self._resolve_cover()
+        if pm is not None and not pm.isNull():
+            self._cover_pixmap = pm.scaled(
+                _COVER_SIZE, _COVER_SIZE,
+                Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation,
+            )
         # if still None — paintEvent will draw placeholder
 
-    def _resolve_cover(self) -> str | None:
+    def _resolve_cover(self) -> QPixmap | None:
         pl = self._playlist
         if not pl:
             return None
         if pl.cover_path and os.path.isfile(pl.cover_path):
-            return pl.cover_path
-        # try first track's cover
+            return QPixmap(pl.cover_path)
+        # try first track's cover (упаковка или отдельный файл, без скачивания)
         tracks = pl.tracks.values
         if tracks:
-            path = self._path.get_cover_path(tracks[0])
-            if os.path.isfile(path):
-                pl.cover_path = path
-                return path
+            image = self._covers.image(tracks[0])
+            if image is not None:
+                return QPixmap.fromImage(image)
         return None
 
     def set_cover_pixmap(self, pm: QPixmap) -> None:
@@ -254,9 +264,12 @@ class PlaylistPreview(QWidget):
         """Показывает контекстное меню карточки плейлиста."""
         menu = QMenu(self)
         rename_action = menu.addAction("Переименовать")
+        export_action = menu.addAction("Экспорт в JSON")
         delete_action = menu.addAction("Удалить")
         chosen = menu.exec(global_pos)
         if chosen == rename_action:
             self.rename_requested.emit(self._playlist)
+        elif chosen == export_action:
+            self.export_requested.emit(self._playlist)
         elif chosen == delete_action:
             self.delete_requested.emit(self._playlist)
@@ -1,15 +1,19 @@
+import asyncio
+import logging
+
 from PySide6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit,
-    QLabel, QMessageBox, QSizePolicy, QScrollArea, QFrame, QInputDialog,
+    QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton,
+    QLabel, QMessageBox, QSizePolicy, QScrollArea, QFrame, QInputDialog, QCompleter,
 )
 from PySide6.QtGui import QColor, QPainter, QPen
-from PySide6.QtCore import Qt, QTimeLine, QRectF, Signal
+from PySide6.QtCore import Qt, QModelIndex, QTimeLine, QRectF, QStringListModel, Signal
 from qasync import asyncSlot
 
-from services import AsyncFinder, AsyncDownloader
+from models import Track
+from services import AsyncFinder, AsyncDownloader, LibrarySearch, PlaylistService, SearchSuggestions
 from player import Player
+from ui.CoverLoader import CoverLoadScheduler
 from ui.TrackCard import TrackCard
-from utils import add_track_to_user_playlist, list_user_playlist_names
 
 _LINE_COLOR = QColor(0, 220, 255)
 _LINE_WIDTH = 2
@@ -17,6 +21,11 @@ _BREATH_MS = 3000
 _BORDER_RADIUS = 14
 _ALPHA_MIN = 30
 _ALPHA_MAX = 160
+_PAGE_SIZE = 10
+_SUGGESTIONS = 8
+# Сколько совпадений из своей библиотеки показывать над выдачей платформ.
+_LIBRARY_LIMIT = 20
+logger = logging.getLogger(__name__)
 
 
 class SearchBar(QWidget):
@@ -52,6 +61,27 @@ class SearchBar(QWidget):
         """)
         layout.addWidget(self._input)
 
+        # Подсказки ранжирует SearchSuggestions, QCompleter только показывает
+        # готовый список: своя фильтрация ему не нужна.
+        self._suggestions = SearchSuggestions()
+        self._suggestion_model = QStringListModel(self)
+        self._completer = QCompleter(self._suggestion_model, self)
+        self._completer.setCompletionMode(QCompleter.UnfilteredPopupCompletion)
+        self._completer.setMaxVisibleItems(_SUGGESTIONS)
+        self._completer.setWidget(self._input)
+        self._completer.activated.connect(self._on_suggestion)
+        self._completer.popup().setStyleSheet("""
+            QListView {
+                color: white;
+                font-size: 14px;
+                background: rgb(20, 24, 32);
+                border: 1px solid rgba(0, 220, 255, 60);
+                selection-background-color: rgba(0, 220, 255, 60);
+            }
+            QListView::item { padding: 6px 12px; }
+        """)
+        self._input.textEdited.connect(self._on_text_edited)
+
         self._alpha = _ALPHA_MIN
         self._breath = QTimeLine(_BREATH_MS, self)
         self._breath.setFrameRange(0, 100)
@@ -59,11 +89,34 @@ class SearchBar(QWidget):
         self._breath.frameChanged.connect(self._on_tick)
         self._breath.start()
 
+    def showEvent(self, event) -> None:
+        super().showEvent(event)
+        self._suggestions.warm_up()
+
     def _on_submit(self) -> None:
+        popup = self._completer.popup()
+        if popup.isVisible() and popup.currentIndex().isValid():
+            # Enter на выбранной подсказке: поиск запустит activated.
+            return
+        popup.hide()
         text = self._input.text().strip()
         if text:
             self.search_requested.emit(text)
 
+    def _on_text_edited(self, text: str) -> None:
+        suggestions = self._suggestions.suggest(text, _SUGGESTIONS)
+        self._suggestion_model.setStringList(suggestions)
+        if suggestions:
+            self._completer.complete()
+            # Без выбранной строки Enter ищет введенный текст.
+            self._completer.popup().setCurrentIndex(QModelIndex())
+        else:
+            self._completer.popup().hide()
+
+    def _on_suggestion(self, text: str) -> None:
+        self._input.setText(text)
+        self._on_submit()
+
     def _on_tick(self, frame: int) -> None:
         t = frame / 50.0 if frame <= 50 else (100 - frame) / 50.0
         self._alpha = int(_ALPHA_MIN + (_ALPHA_MAX - _ALPHA_MIN) * t)
@@ -93,8 +146,19 @@ class SearchPage(QWidget):
         self.setObjectName("SearchPage")
 
         self._finder = AsyncFinder()
+        self._library = LibrarySearch()
+        self._suggestions = SearchSuggestions()
         self._player = Player()
         self._downloader = AsyncDownloader()
+        self._playlists = PlaylistService()
+
+        self._cards: list[TrackCard] = []
+        self._seen_keys: set[str] = set()
+        self._query = ""
+        self._page = 0
+        # Номер поиска: ответы устаревших запросов отбрасываются.
+        self._generation = 0
+        self._prefetch: asyncio.Task | None = None
 
         self.main_layout = QVBoxLayout(self)
         self.main_layout.setContentsMargins(8, 8, 8, 8)
@@ -148,9 +212,25 @@ class SearchPage(QWidget):
         self._results_layout = QVBoxLayout(self._results_container)
         self._results_layout.setContentsMargins(0, 0, 0, 0)
         self._results_layout.setSpacing(4)
+
+        self._more_btn = QPushButton("Показать ещё")
+        self._more_btn.setCursor(Qt.PointingHandCursor)
+        self._more_btn.setStyleSheet("""
+            QPushButton {
+                color: rgba(255,255,255,180); font-size: 13px; font-weight: 600;
+                background: rgba(255,255,255,12); border: none; border-radius: 12px;
+                padding: 8px 20px;
+            }
+            QPushButton:hover { background: rgba(0,220,255,50); }
+            QPushButton:disabled { color: rgba(255,255,255,60); }
+        """)
+        self._more_btn.clicked.connect(self._load_more)
+        self._more_btn.hide()
+        self._results_layout.addWidget(self._more_btn, alignment=Qt.AlignHCenter)
         self._results_layout.addStretch()
 
         self._scroll.setWidget(self._results_container)
+        self._cover_loader = CoverLoadScheduler(self._scroll)
 
         results_inner.addWidget(self._status)
         results_inner.addWidget(self._scroll)
@@ -160,19 +240,40 @@ class SearchPage(QWidget):
 
     @asyncSlot()
     async def _do_search(self, query: str) -> None:
+        self._generation += 1
+        generation = self._generation
+        self._cancel_prefetch()
+        self._suggestions.record_query(query)
         self._status.setText("Ищем...")
         self._status.show()
         self._scroll.hide()
 
-        tracks = await self._finder.get_tracks(query, value=5)
+        # Платформы опрашиваются, пока показываются треки из своей библиотеки:
+        # индекс отвечает сразу и без сети.
+        remote = asyncio.get_running_loop().create_task(self._fetch_page(query, 0))
+        local_tracks = await self._library.search(query, _LIBRARY_LIMIT)
+        if generation != self._generation:
+            remote.cancel()
+            return
+
+        self._clear_results()
+        self._query = query
+        self._page = 0
+        if local_tracks:
+            self._status.hide()
+            self._scroll.show()
+            self._append_cards(local_tracks)
+            # "Показать ещё" листает выдачу платформ — ждем ее первую страницу.
+            self._more_btn.hide()
 
-        # clear old results
-        while self._results_layout.count() > 1:
-            item = self._results_layout.takeAt(0)
-            if item.widget():
-                item.widget().deleteLater()
+        try:
+            tracks = await remote
+        except asyncio.CancelledError:
+            return
+        if generation != self._generation:
+            return
 
-        if not tracks:
+        if not tracks and not local_tracks:
             self._status.setText("Ничего не найдено")
             self._status.show()
             self._scroll.hide()
@@ -180,14 +281,82 @@ class SearchPage(QWidget):
 
         self._status.hide()
         self._scroll.show()
+        # Карточки показываются сразу с заглушками, обложки догружаются следом.
+        if not self._append_cards(tracks):
+            self._more_btn.setVisible(bool(tracks))
+        self._start_prefetch()
 
-        for i, track in enumerate(tracks, start=1):
-            card = TrackCard(track, index=i)
+    @asyncSlot()
+    async def _load_more(self) -> None:
+        """Показывает следующую страницу выдачи (обычно уже подгруженную в фоне)."""
+        generation = self._generation
+        self._more_btn.setEnabled(False)
+        if self._prefetch is None:
+            self._start_prefetch()
+        try:
+            tracks = await self._prefetch
+        except asyncio.CancelledError:
+            return
+        finally:
+            self._more_btn.setEnabled(True)
+        if generation != self._generation:
+            return
+        self._prefetch = None
+        self._page += 1
+        if not self._append_cards(tracks):
+            self._more_btn.hide()
+            return
+        self._start_prefetch()
+
+    def _append_cards(self, tracks: list[Track]) -> int:
+        """Добавляет карточки новых треков и ставит их обложки в очередь."""
+        new_cards: list[TrackCard] = []
+        for track in tracks:
+            key = track.key
+            if key in self._seen_keys:
+                continue
+            self._seen_keys.add(key)
+            card = TrackCard(track, index=len(self._cards) + 1)
             card.play_requested.connect(self._play_track)
             card.download_requested.connect(self._download_track)
             card.add_to_playlist_requested.connect(self._add_track_to_playlist)
-            await card.load_cover()
-            self._results_layout.insertWidget(self._results_layout.count() - 1, card)
+            self._results_layout.insertWidget(self._results_layout.indexOf(self._more_btn), card)
+            self._cards.append(card)
+            new_cards.append(card)
+        self._cover_loader.extend(new_cards)
+        self._more_btn.setVisible(bool(new_cards))
+        return len(new_cards)
+
+    def _clear_results(self) -> None:
+        self._cover_loader.cancel()
+        for card in self._cards:
+            card.hide()
+            card.setParent(None)
+            card.deleteLater()
+        self._cards.clear()
+        self._seen_keys.clear()
+        self._more_btn.hide()
+
+    def _start_prefetch(self) -> None:
+        """Запускает фоновую загрузку следующей страницы выдачи."""
+        self._cancel_prefetch()
+        self._prefetch = asyncio.get_running_loop().create_task(
+            self._fetch_page(self._query, self._page + 1)
+        )
+
+    def _cancel_prefetch(self) -> None:
+        if self._prefetch is not None:
+            self._prefetch.cancel()
+            self._prefetch = None
+
+    async def _fetch_page(self, query: str, page: int) -> list[Track]:
+        try:
+            return await self._finder.get_tracks(query, value=_PAGE_SIZE, page=page)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Не удалось выполнить поиск: %s (страница %s)", query, page)
+            return []
 
     @asyncSlot(object)
     async def _play_track(self, track) -> None:
@@ -199,7 +368,11 @@ class SearchPage(QWidget):
 
     @asyncSlot(object)
     async def _add_track_to_playlist(self, track) -> None:
-        names = list_user_playlist_names()
+        try:
+            names = await self._playlists.list_names()
+        except Exception:
+            logger.exception("Не удалось получить список плейлистов")
+            names = []
         if not names:
             QMessageBox.information(
                 self,
@@ -220,12 +393,7 @@ class SearchPage(QWidget):
             return
 
         try:
-            added = add_track_to_user_playlist(
-                selected,
-                track_id=track.track_id,
-                title=track.title,
-                author=track.author,
-            )
+            added = await self._playlists.add_track(selected, track)
         except Exception:
             QMessageBox.warning(self, "Ошибка", "Не удалось добавить трек в плейлист.")
             return
@@ -7,12 +7,22 @@ from utils import asset_path
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame,
     QScrollArea, QSlider, QComboBox, QLineEdit, QToolButton, QSizePolicy,
+    QFileDialog,
 )
 from PySide6.QtGui import QColor, QPainter, QPainterPath, QLinearGradient, QBrush, QPen
 from PySide6.QtCore import Qt, QRectF, Signal
 from ui.theme import COMBO_QSS, PANEL_DARK, PANEL_RADIUS, REFRESH_MS_MAX, REFRESH_MS_MIN, scroll_qss
 
 
+_TEXT_BTN_QSS = """
+    QToolButton {
+        color: rgba(255,255,255,200); background: rgba(255,255,255,10);
+        border: 1px solid rgba(255,255,255,20); border-radius: 8px; padding: 6px 10px;
+    }
+    QToolButton:hover { background: rgba(255,255,255,25); }
+"""
+
+
 class SettingsPage(QWidget):
 
     go_back = Signal()
@@ -21,11 +31,14 @@ class SettingsPage(QWidget):
     visualizer_delay_changed = Signal(int)
     visualizer_color_changed = Signal(tuple)  # (r, g, b)
     visualizer_mode_changed = Signal(str)  # smooth/sharp/choppy
+    library_folders_changed = Signal(list)  # папки локальной музыки
+    cover_pack_toggled = Signal(bool)  # хранить обложки в одном файле
 
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("SettingsPage")
         self._last_valid_rgb = (0, 220, 255)
+        self._library_folders: list[str] = []
 
         root = QVBoxLayout(self)
         root.setContentsMargins(10, 10, 10, 10)
@@ -51,6 +64,7 @@ class SettingsPage(QWidget):
         self._lay.setSpacing(12)
 
         self._build_audio_section()
+        self._build_library_section()
         self._build_appearance_section()
         self._build_visualizer_section()
         self._build_about_section()
@@ -73,6 +87,56 @@ class SettingsPage(QWidget):
 
         self._lay.addWidget(sec)
 
+    # ── Local library ──
+
+    def _build_library_section(self) -> None:
+        sec = _Section("Локальная музыка")
+
+        row_add = _SettingRow("Папки с музыкой")
+        btn_add = QToolButton()
+        btn_add.setText("Добавить папку")
+        btn_add.setCursor(Qt.PointingHandCursor)
+        btn_add.setStyleSheet(_TEXT_BTN_QSS)
+        btn_add.clicked.connect(self._add_library_folder)
+        row_add.add_right(btn_add)
+        sec.add_row(row_add)
+
+        self._folders_box = QWidget()
+        self._folders_lay = QVBoxLayout(self._folders_box)
+        self._folders_lay.setContentsMargins(0, 0, 0, 0)
+        self._folders_lay.setSpacing(0)
+        sec.add_row(self._folders_box)
+
+        self._lay.addWidget(sec)
+
+    def set_library_folders(self, folders: list[str]) -> None:
+        """Показывает папки локальной музыки (без эмита сигнала)."""
+        self._library_folders = list(folders)
+        while self._folders_lay.count():
+            widget = self._folders_lay.takeAt(0).widget()
+            if widget is not None:
+                widget.deleteLater()
+        for folder in self._library_folders:
+            row = _SettingRow(folder)
+            btn_remove = QToolButton()
+            btn_remove.setText("✕")
+            btn_remove.setCursor(Qt.PointingHandCursor)
+            btn_remove.setStyleSheet(_TEXT_BTN_QSS)
+            btn_remove.clicked.connect(lambda _=False, path=folder: self._remove_library_folder(path))
+            row.add_right(btn_remove)
+            self._folders_lay.addWidget(row)
+
+    def _add_library_folder(self) -> None:
+        folder = QFileDialog.getExistingDirectory(self, "Папка с музыкой")
+        if not folder or folder in self._library_folders:
+            return
+        self.set_library_folders(self._library_folders + [folder])
+        self.library_folders_changed.emit(list(self._library_folders))
+
+    def _remove_library_folder(self, folder: str) -> None:
+        self.set_library_folders([path for path in self._library_folders if path != folder])
+        self.library_folders_changed.emit(list(self._library_folders))
+
     # ── Appearance ──
 
     def _build_appearance_section(self) -> None:
@@ -94,6 +158,13 @@ class SettingsPage(QWidget):
         row_bg.add_right(self._bg_combo)
         sec.add_row(row_bg)
 
+        # обложки в одном файле вместо тысяч мелких
+        row_pack = _SettingRow("Упаковывать обложки")
+        self._cover_pack_toggle = _ToggleButton(checked=False)
+        self._cover_pack_toggle.toggled_changed.connect(self.cover_pack_toggled.emit)
+        row_pack.add_right(self._cover_pack_toggle)
+        sec.add_row(row_pack)
+
         self._lay.addWidget(sec)
 
     # ── Visualizer ──
@@ -200,6 +271,10 @@ class SettingsPage(QWidget):
         if mode:
             self.visualizer_mode_changed.emit(str(mode))
 
+    def set_cover_pack(self, enabled: bool) -> None:
+        """Устанавливает начальное состояние упаковки обложек."""
+        self._cover_pack_toggle.set_checked(enabled)
+
     def set_visualizer_settings(self, delay_ms: int, color_rgb: tuple[int, int, int], mode: str) -> None:
         """Устанавливает начальные значения настроек визуализатора."""
         self._viz_delay.blockSignals(True)
@@ -252,6 +327,11 @@ class _ToggleButton(QWidget):
         self.setFixedSize(48, 26)
         self.setCursor(Qt.PointingHandCursor)
 
+    def set_checked(self, checked: bool) -> None:
+        """Меняет состояние без сигнала."""
+        self._on = bool(checked)
+        self.update()
+
     def mousePressEvent(self, event) -> None:
         if event.button() == Qt.LeftButton:
             self._on = not self._on
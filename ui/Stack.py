@@ -5,6 +5,7 @@ from ui.HomePage import HomePage
 from ui.SearchPage import SearchPage
 from ui.PlaylistPage import PlaylistPage
 from ui.SettingsPage import SettingsPage
+from ui.StatsPage import StatsPage
 from ui.UserPage import UserPage
 
 
@@ -16,6 +17,7 @@ class Stack(QWidget):
     PLAYLIST = 2
     SETTINGS = 3
     USER = 4
+    STATS = 5
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -29,22 +31,28 @@ class Stack(QWidget):
         self.playlist_page = PlaylistPage()
         self.settings_page = SettingsPage()
         self.user_page = UserPage()
+        self.stats_page = StatsPage()
 
         self._stack.addWidget(self.home_page)      # index 0
         self._stack.addWidget(self.search_page)     # index 1
         self._stack.addWidget(self.playlist_page)   # index 2
         self._stack.addWidget(self.settings_page)   # index 3
         self._stack.addWidget(self.user_page)       # index 4
+        self._stack.addWidget(self.stats_page)      # index 5
 
         self._stack.setCurrentIndex(self.HOME)
         self._main_layout.addWidget(self._stack)
 
+        # Новые прослушивания поднимаются в начало открытой истории
+        self.home_page.recent_head_changed.connect(self.playlist_page.apply_recent_head)
         # Назад с плейлиста -> домой
         self.playlist_page.go_back.connect(lambda: self.switch_to(self.HOME))
         # Назад с настроек -> домой
         self.settings_page.go_back.connect(lambda: self.switch_to(self.HOME))
         # Назад со страницы пользователя -> домой
         self.user_page.go_back.connect(lambda: self.switch_to(self.HOME))
+        # Назад со статистики -> домой
+        self.stats_page.go_back.connect(lambda: self.switch_to(self.HOME))
 
     def switch_to(self, index: int) -> None:
         """Переключает страницу по индексу (``Stack.HOME``, ``Stack.SEARCH`` и т.д.)."""
@@ -52,6 +60,8 @@ class Stack(QWidget):
             self._stack.setCurrentIndex(index)
             if index == self.HOME:
                 self.home_page._reload_user_playlists()
+            elif index == self.STATS:
+                self.stats_page.reload()
 
     async def open_playlist(self, playlist) -> None:
         """Открывает страницу плейлиста и загружает данные."""
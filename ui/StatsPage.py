@@ -0,0 +1,386 @@
+"""Страница статистики прослушиваний.
+
+Все данные берутся из агрегатов (``daily_totals``, ``daily_*_stats``,
+``*_totals``) через ``TrackHistoryService.get_listening_stats`` — журнал
+событий страница не читает. Виджеты строк создаются один раз и при
+обновлении только меняют текст, поэтому перерисовка дешевая при любом
+объеме истории.
+"""
+
+from __future__ import annotations
+
+import logging
+from datetime import date, timedelta
+
+from PySide6.QtCore import QRectF, Qt, Signal
+from PySide6.QtGui import QColor, QPainter, QPen
+from PySide6.QtWidgets import (
+    QComboBox,
+    QFrame,
+    QGridLayout,
+    QHBoxLayout,
+    QLabel,
+    QScrollArea,
+    QSizePolicy,
+    QToolButton,
+    QVBoxLayout,
+    QWidget,
+)
+from qasync import asyncSlot
+
+from services import ListeningStats, TrackHistoryService
+from ui.theme import ACCENT, COMBO_QSS, PANEL_RADIUS, scroll_qss
+
+logger = logging.getLogger(__name__)
+
+# (подпись, число дней; None — за все время)
+_PERIODS = (
+    ("Неделя", 7),
+    ("Месяц", 30),
+    ("Год", 365),
+    ("Все время", None),
+)
+_TOP_ROWS = 10
+# Селектор по objectName: стиль панели не должен наследоваться дочерними QLabel.
+_SECTION_QSS = (
+    f"QFrame#statsSection {{ background: rgba(12, 14, 20, 210); border-radius: {PANEL_RADIUS}px; }}"
+)
+
+
+class StatsPage(QWidget):
+    """Статистика: время прослушивания, серии, топ треков и артистов."""
+
+    go_back = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("StatsPage")
+        self._history_service = TrackHistoryService()
+        self._generation = 0
+
+        root = QVBoxLayout(self)
+        root.setContentsMargins(10, 10, 10, 10)
+        root.setSpacing(0)
+
+        header = _StatsHeader()
+        header.back_clicked.connect(self.go_back.emit)
+        header.period_changed.connect(lambda _index: self.reload())
+        self._header = header
+        root.addWidget(header)
+        root.addSpacing(12)
+
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        scroll.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        scroll.setFrameShape(QFrame.NoFrame)
+        scroll.setStyleSheet(scroll_qss("_stats_scroll"))
+
+        content = QWidget()
+        content.setObjectName("_stats_scroll")
+        lay = QVBoxLayout(content)
+        lay.setContentsMargins(0, 0, 0, 0)
+        lay.setSpacing(12)
+
+        tiles = QHBoxLayout()
+        tiles.setSpacing(12)
+        self._time_tile = _SummaryTile("Время")
+        self._plays_tile = _SummaryTile("Прослушиваний")
+        self._skips_tile = _SummaryTile("Пропущено")
+        self._streak_tile = _SummaryTile("Серия дней")
+        for tile in (self._time_tile, self._plays_tile, self._skips_tile, self._streak_tile):
+            tiles.addWidget(tile)
+        lay.addLayout(tiles)
+
+        chart_section = _Section("Время прослушивания")
+        self._chart = _ListeningChart()
+        chart_section.add_widget(self._chart)
+        lay.addWidget(chart_section)
+
+        tops = QHBoxLayout()
+        tops.setSpacing(12)
+        self._top_tracks = _TopList("Топ треков")
+        self._top_artists = _TopList("Топ артистов")
+        tops.addWidget(self._top_tracks)
+        tops.addWidget(self._top_artists)
+        lay.addLayout(tops)
+
+        lay.addStretch()
+        scroll.setWidget(content)
+        root.addWidget(scroll, stretch=1)
+
+    @asyncSlot()
+    async def reload(self) -> None:
+        """Перечитывает агрегаты за выбранный период и обновляет виджеты."""
+        self._generation += 1
+        generation = self._generation
+        try:
+            stats = await self._history_service.get_listening_stats(
+                days=self._header.period_days(),
+                top_limit=_TOP_ROWS,
+            )
+        except Exception:
+            logger.exception("Не удалось загрузить статистику прослушиваний")
+            return
+        if generation != self._generation:
+            return
+        self._render(stats)
+
+    def _render(self, stats: ListeningStats) -> None:
+        listened = stats.totals.listened_ms
+        plays = stats.totals.plays
+        skips = stats.totals.skips
+
+        self._time_tile.set_value(_format_duration(listened))
+        self._plays_tile.set_value(str(plays))
+        self._skips_tile.set_value(f"{round(skips * 100 / plays)}%" if plays else "—")
+        self._streak_tile.set_value(
+            str(stats.current_streak),
+            f"рекорд: {stats.longest_streak}",
+        )
+        self._chart.set_buckets(_bucketize(stats))
+        self._top_tracks.set_rows(stats.top_tracks)
+        self._top_artists.set_rows(stats.top_artists)
+
+
+def _format_duration(ms: int) -> str:
+    minutes = ms // 60000
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours} ч {minutes} мин"
+    return f"{minutes} мин"
+
+
+def _bucketize(stats: ListeningStats) -> list[tuple[str, int]]:
+    """Раскладывает дневные итоги по столбцам графика (дни, недели или месяцы).
+
+    Пустые дни заполняются нулями, чтобы ось времени была равномерной.
+    """
+    until = date.fromisoformat(stats.until_day)
+    if stats.since_day is not None:
+        since = date.fromisoformat(stats.since_day)
+    elif stats.days:
+        since = date.fromisoformat(stats.days[0].key)
+    else:
+        since = until
+    by_day = {row.key: row.listened_ms for row in stats.days}
+    span = (until - since).days + 1
+
+    buckets: dict[str, int] = {}
+    for offset in range(span):
+        day = since + timedelta(days=offset)
+        if span <= 31:
+            label = day.strftime("%d.%m")
+        elif span <= 370:
+            week_start = day - timedelta(days=day.weekday())
+            label = week_start.strftime("%d.%m")
+        else:
+            label = day.strftime("%m.%Y")
+        buckets[label] = buckets.get(label, 0) + by_day.get(day.isoformat(), 0)
+    return list(buckets.items())
+
+
+class _StatsHeader(QWidget):
+    back_clicked = Signal()
+    period_changed = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setObjectName("statsHeader")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        self.setFixedHeight(70)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.setStyleSheet(
+            f"""
+            QWidget#statsHeader {{
+                background: rgba(10, 14, 22, 220);
+                border-radius: {PANEL_RADIUS}px;
+                border: 1px solid rgba(0, 220, 255, 35);
+            }}
+            """
+        )
+
+        lay = QHBoxLayout(self)
+        lay.setContentsMargins(16, 0, 20, 0)
+
+        back = QToolButton()
+        back.setText("←")
+        back.setFixedSize(36, 36)
+        back.setCursor(Qt.PointingHandCursor)
+        back.setStyleSheet(
+            """
+            QToolButton {
+                color: white;
+                font-size: 18px;
+                font-weight: 700;
+                background: rgba(0, 0, 0, 100);
+                border-radius: 18px;
+                border: none;
+            }
+            QToolButton:hover { background: rgba(0, 220, 255, 60); }
+            """
+        )
+        back.clicked.connect(self.back_clicked.emit)
+        lay.addWidget(back)
+        lay.addSpacing(12)
+
+        title = QLabel("Статистика")
+        title.setStyleSheet(
+            "color: #fff; font-size: 24px; font-weight: 800; background: transparent;"
+        )
+        lay.addWidget(title)
+        lay.addStretch()
+
+        self._period = QComboBox()
+        self._period.addItems([name for name, _days in _PERIODS])
+        self._period.setStyleSheet(COMBO_QSS)
+        self._period.currentIndexChanged.connect(self.period_changed.emit)
+        lay.addWidget(self._period)
+
+    def period_days(self) -> int | None:
+        return _PERIODS[self._period.currentIndex()][1]
+
+
+class _Section(QFrame):
+    def __init__(self, title: str, parent=None):
+        super().__init__(parent)
+        self.setObjectName("statsSection")
+        self.setStyleSheet(_SECTION_QSS)
+
+        self._lay = QVBoxLayout(self)
+        self._lay.setContentsMargins(16, 14, 16, 14)
+        self._lay.setSpacing(8)
+
+        label = QLabel(title)
+        label.setStyleSheet("color: #fff; font-size: 16px; font-weight: 700;")
+        self._lay.addWidget(label)
+
+    def add_widget(self, widget: QWidget) -> None:
+        self._lay.addWidget(widget)
+
+
+class _SummaryTile(QFrame):
+    def __init__(self, title: str, parent=None):
+        super().__init__(parent)
+        self.setObjectName("statsSection")
+        self.setStyleSheet(_SECTION_QSS)
+        self.setMinimumHeight(86)
+
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(14, 10, 14, 10)
+        lay.setSpacing(2)
+
+        caption = QLabel(title)
+        caption.setStyleSheet("color: rgba(255,255,255,150); font-size: 12px;")
+        self._value = QLabel("—")
+        self._value.setStyleSheet("color: #fff; font-size: 22px; font-weight: 800;")
+        self._hint = QLabel("")
+        self._hint.setStyleSheet("color: rgba(0,220,255,170); font-size: 11px;")
+
+        lay.addWidget(caption)
+        lay.addWidget(self._value)
+        lay.addWidget(self._hint)
+
+    def set_value(self, value: str, hint: str = "") -> None:
+        self._value.setText(value)
+        self._hint.setText(hint)
+
+
+class _TopList(QFrame):
+    """Список топа с заранее созданными строками."""
+
+    def __init__(self, title: str, parent=None):
+        super().__init__(parent)
+        self.setObjectName("statsSection")
+        self.setStyleSheet(_SECTION_QSS)
+
+        lay = QVBoxLayout(self)
+        lay.setContentsMargins(16, 14, 16, 14)
+        lay.setSpacing(8)
+
+        label = QLabel(title)
+        label.setStyleSheet("color: #fff; font-size: 16px; font-weight: 700;")
+        lay.addWidget(label)
+
+        grid = QGridLayout()
+        grid.setHorizontalSpacing(10)
+        grid.setVerticalSpacing(4)
+        grid.setColumnStretch(1, 1)
+        self._rows: list[tuple[QLabel, QLabel, QLabel]] = []
+        for index in range(_TOP_ROWS):
+            rank = QLabel(f"{index + 1}.")
+            rank.setStyleSheet("color: rgba(0,220,255,180); font-size: 13px;")
+            name = QLabel()
+            name.setStyleSheet("color: #fff; font-size: 13px;")
+            name.setSizePolicy(QSizePolicy.Ignored, QSizePolicy.Preferred)
+            value = QLabel()
+            value.setStyleSheet("color: rgba(255,255,255,150); font-size: 12px;")
+            value.setAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            grid.addWidget(rank, index, 0)
+            grid.addWidget(name, index, 1)
+            grid.addWidget(value, index, 2)
+            self._rows.append((rank, name, value))
+        lay.addLayout(grid)
+
+        self._empty = QLabel("Пока нет данных")
+        self._empty.setStyleSheet("color: rgba(255,255,255,120); font-size: 13px;")
+        lay.addWidget(self._empty)
+
+    def set_rows(self, rows) -> None:
+        self._empty.setVisible(not rows)
+        for index, (rank, name, value) in enumerate(self._rows):
+            visible = index < len(rows)
+            rank.setVisible(visible)
+            name.setVisible(visible)
+            value.setVisible(visible)
+            if visible:
+                row = rows[index]
+                name.setText(row.label or row.key)
+                name.setToolTip(row.label or row.key)
+                value.setText(f"{_format_duration(row.listened_ms)} · {row.plays}×")
+
+
+class _ListeningChart(QWidget):
+    """Столбчатый график времени прослушивания."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(160)
+        self._buckets: list[tuple[str, int]] = []
+
+    def set_buckets(self, buckets: list[tuple[str, int]]) -> None:
+        self._buckets = buckets
+        self.update()
+
+    def paintEvent(self, event) -> None:
+        p = QPainter(self)
+        p.setRenderHint(QPainter.Antialiasing, True)
+        if not self._buckets:
+            p.end()
+            return
+
+        label_h = 16
+        width = self.width()
+        chart_h = self.height() - label_h - 4
+        count = len(self._buckets)
+        slot = width / count
+        bar_w = max(2.0, slot * 0.7)
+        peak = max(value for _label, value in self._buckets) or 1
+        # Подписи только под каждым n-м столбцом, чтобы не налезали.
+        label_every = max(1, int(44 // slot) + 1)
+
+        p.setPen(QPen(QColor(255, 255, 255, 130)))
+        font = p.font()
+        font.setPixelSize(10)
+        p.setFont(font)
+        for index, (label, value) in enumerate(self._buckets):
+            x = index * slot + (slot - bar_w) / 2
+            bar_h = chart_h * value / peak
+            if value:
+                p.fillRect(QRectF(x, chart_h - bar_h, bar_w, bar_h), ACCENT)
+            if index % label_every == 0:
+                p.drawText(
+                    QRectF(index * slot - 20 + slot / 2, chart_h + 4, 40, label_h),
+                    Qt.AlignCenter,
+                    label,
+                )
+        p.end()
@@ -12,7 +12,6 @@
 
 from __future__ import annotations
 
-import os
 from typing import Optional
 
 from PySide6.QtWidgets import (
@@ -24,18 +23,18 @@ from PySide6.QtCore import Qt, Signal, QSize
 from qasync import asyncSlot
 
 from models import Track
-from providers import PathProvider
-from services import AsyncDownloader
+from services import CoverStore
 from utils import asset_path
 
 _COVER_SIZE = 48
 _CARD_HEIGHT = 60
 _BORDER_RADIUS = 10
-_SOURCE_COLORS = {
+SOURCE_COLORS = {
     "yandex": QColor(0, 220, 255, 140),
     "youtube": QColor(255, 60, 60, 140),
+    "local": QColor(120, 220, 140, 140),
 }
-_DEFAULT_SOURCE_COLOR = QColor(160, 160, 160, 140)
+DEFAULT_SOURCE_COLOR = QColor(160, 160, 160, 140)
 
 _BTN_STYLE = """
     QToolButton {{
@@ -49,6 +48,29 @@ _BTN_STYLE = """
 """
 
 
+def build_meta_line(track: Track) -> str:
+    """Формирует строку автора и количества прослушиваний."""
+    listens = max(0, int(getattr(track, "listen_count", 0)))
+    if listens == 0:
+        return track.author
+    return f"{track.author} · {format_listens(listens)}"
+
+
+def format_listens(listens: int) -> str:
+    """Возвращает фразу с корректным склонением слова 'прослушивание'."""
+    tail_100 = listens % 100
+    tail_10 = listens % 10
+    if 11 <= tail_100 <= 14:
+        word = "прослушиваний"
+    elif tail_10 == 1:
+        word = "прослушивание"
+    elif 2 <= tail_10 <= 4:
+        word = "прослушивания"
+    else:
+        word = "прослушиваний"
+    return f"{listens} {word}"
+
+
 class _PlayOverlay(QToolButton):
     """Play button that sits on top of the cover."""
 
@@ -94,7 +116,6 @@ class TrackCard(QWidget):
     download_requested = Signal(object)
     add_to_playlist_requested = Signal(object)
     remove_from_playlist_requested = Signal(object)
-    _shared_downloader: AsyncDownloader | None = None
 
     def __init__(
         self,
@@ -109,11 +130,9 @@ class TrackCard(QWidget):
         self._index = index
         self._is_playing = False
         self._hovered = False
+        self._cover_loaded = False
         self._allow_remove_from_playlist = allow_remove_from_playlist
-        self._path_provider = PathProvider()
-        if TrackCard._shared_downloader is None:
-            TrackCard._shared_downloader = AsyncDownloader()
-        self._downloader = TrackCard._shared_downloader
+        self._covers = CoverStore()
 
         self.setObjectName("TrackCard")
         self.setFixedHeight(_CARD_HEIGHT)
@@ -189,13 +208,15 @@ class TrackCard(QWidget):
 
     def set_track(self, track: Track, index: int = 0) -> None:
         """Set or update the displayed track."""
+        if track != self._track:
+            self._cover_loaded = False
         self._track = track
         self._index = index
         self._update_index_label()
         self._title.setText(track.title)
-        self._author.setText(self._build_meta_line(track))
+        self._author.setText(build_meta_line(track))
 
-        color = _SOURCE_COLORS.get(track.source, _DEFAULT_SOURCE_COLOR)
+        color = SOURCE_COLORS.get(track.source, DEFAULT_SOURCE_COLOR)
         self._source_badge.setText(track.source)
         self._source_badge.setStyleSheet(f"""
             color: white; font-size: 11px; font-weight: 600;
@@ -204,29 +225,6 @@ class TrackCard(QWidget):
         """)
         self._source_badge.adjustSize()
 
-    @staticmethod
-    def _build_meta_line(track: Track) -> str:
-        """Формирует строку автора и количества прослушиваний."""
-        listens = max(0, int(getattr(track, "listen_count", 0)))
-        if listens == 0:
-            return track.author
-        return f"{track.author} · {TrackCard._format_listens(listens)}"
-
-    @staticmethod
-    def _format_listens(listens: int) -> str:
-        """Возвращает фразу с корректным склонением слова 'прослушивание'."""
-        tail_100 = listens % 100
-        tail_10 = listens % 10
-        if 11 <= tail_100 <= 14:
-            word = "прослушиваний"
-        elif tail_10 == 1:
-            word = "прослушивание"
-        elif 2 <= tail_10 <= 4:
-            word = "прослушивания"
-        else:
-            word = "прослушиваний"
-        return f"{listens} {word}"
-
     def set_playing(self, is_playing: bool) -> None:
         """Set visual state for the currently playing track."""
         self._is_playing = is_playing
@@ -236,18 +234,17 @@ class TrackCard(QWidget):
     @asyncSlot()
     async def load_cover(self) -> None:
         """Load cover async (download if missing)."""
-        if self._track is None:
+        if self._track is None or self._cover_loaded:
             return
-        path = self._path_provider.get_cover_path(self._track)
-        if not os.path.exists(path):
-            await self._downloader.download_cover(self._track)
-        if os.path.exists(path):
-            pixmap = QPixmap(path).scaled(
+        image = await self._covers.load(self._track)
+        if image is not None:
+            pixmap = QPixmap.fromImage(image).scaled(
                 _COVER_SIZE, _COVER_SIZE,
                 Qt.KeepAspectRatioByExpanding,
                 Qt.SmoothTransformation,
             )
             self._cover.setPixmap(pixmap)
+            self._cover_loaded = True
 
     @property
     def track(self) -> Optional[Track]:
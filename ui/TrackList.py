@@ -0,0 +1,624 @@
+"""Виртуализированный список треков (model/view).
+
+Вместо виджета ``TrackCard`` на каждый трек — одна модель
+(:class:`TrackListModel`) и делегат (:class:`TrackDelegate`), который
+рисует строки. Qt рисует только видимые строки, поэтому открытие
+плейлиста не зависит от числа треков, а память — от длины списка
+почти не зависит.
+
+Модель держит индекс ``track_key -> row``: смена играющего трека
+перерисовывает две строки, а не обходит весь список. Обложки грузятся
+только для видимых строк (см. :meth:`TrackListView._request_covers`)
+и кэшируются в модели уже уменьшенными. Длительности треков берутся
+из ``TrackMetadataService``, число прослушиваний для сортировки — из
+истории, по одному запросу на список.
+
+Фильтр и сортировка не трогают список треков: модель показывает строки
+из ``view`` — номеров, посчитанных ``utils.track_index.TrackColumnIndex``.
+
+Сигналы :class:`TrackListView` совпадают с сигналами ``TrackCard``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Sequence
+
+from PySide6.QtCore import (
+    QAbstractListModel, QModelIndex, QPersistentModelIndex, QRect, QRectF, QSize, Qt, QTimer, Signal,
+)
+from PySide6.QtGui import QColor, QFont, QFontMetrics, QIcon, QPainter, QPainterPath, QPixmap
+from PySide6.QtWidgets import QAbstractItemView, QListView, QMenu, QStyle, QStyledItemDelegate
+
+from models import Track
+from services import CoverStore, TrackHistoryService, TrackMetadataService
+from ui.TrackCard import DEFAULT_SOURCE_COLOR, SOURCE_COLORS, build_meta_line
+from utils import asset_path
+from utils.track_index import SORT_ADDED, SORT_LISTENS, TrackColumnIndex
+
+logger = logging.getLogger(__name__)
+
+_ROW_HEIGHT = 60
+_ROW_SPACING = 2
+_ROW_RADIUS = 10
+_COVER_SIZE = 48
+_DL_SIZE = 28
+# Сколько уменьшенных обложек держать в памяти (~9 КБ каждая).
+_COVER_CACHE_SIZE = 1000
+# Сколько обложек качать одновременно.
+_MAX_DOWNLOADS = 6
+# Строки вокруг видимой области, для которых обложки грузятся заранее.
+_PREFETCH_ROWS = 10
+
+TrackRole = Qt.UserRole + 1
+PlayingRole = Qt.UserRole + 2
+CoverRole = Qt.UserRole + 3
+DurationRole = Qt.UserRole + 4
+
+
+class TrackListModel(QAbstractListModel):
+    """Треки списка, фильтр и сортировка, играющий трек и кэш обложек."""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._tracks: list[Track] = []
+        # track_key -> номер в self._tracks.
+        self._rows: dict[str, int] = {}
+        # Показываемые номера из self._tracks (None — все по порядку)
+        # и обратное отображение: номер в self._tracks -> строка (-1 — скрыт).
+        self._view: list[int] | None = None
+        self._positions: list[int] | None = None
+        self._query = ""
+        self._sort: tuple[str, bool] = (SORT_ADDED, False)
+        self._index: TrackColumnIndex | None = None
+        self._playing_key: str | None = None
+        self._covers: OrderedDict[str, QPixmap] = OrderedDict()
+        # track_key -> длительность в мс.
+        self._durations: dict[str, int] = {}
+        # track_key -> прослушивания из истории (для сортировки).
+        self._listens: dict[str, int] = {}
+
+    # --- QAbstractListModel ---
+
+    def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
+        if parent.isValid():
+            return 0
+        return len(self._tracks) if self._view is None else len(self._view)
+
+    def data(self, index: QModelIndex, role: int = Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row()
+        track = self._tracks[row if self._view is None else self._view[row]]
+        if role == TrackRole:
+            return track
+        if role == Qt.DisplayRole:
+            return track.title
+        if role == PlayingRole:
+            return self._playing_key is not None and track.key == self._playing_key
+        if role == CoverRole:
+            return self._covers.get(track.key)
+        if role == DurationRole:
+            return self._durations.get(track.key, 0)
+        return None
+
+    # --- треки ---
+
+    @property
+    def tracks(self) -> list[Track]:
+        """Все треки списка (без учета фильтра)."""
+        return self._tracks
+
+    def set_tracks(self, tracks: Sequence[Track]) -> None:
+        """Заменяет список целиком; фильтр и сортировка сохраняются."""
+        self.beginResetModel()
+        self._tracks = list(tracks)
+        self._reindex()
+        self._index = None
+        self._apply_view()
+        self.endResetModel()
+
+    def append_tracks(self, tracks: Sequence[Track]) -> None:
+        """Добавляет треки в конец списка."""
+        if not tracks:
+            return
+        if self._view is not None:
+            self.set_tracks(self._tracks + list(tracks))
+            return
+        start = len(self._tracks)
+        self.beginInsertRows(QModelIndex(), start, start + len(tracks) - 1)
+        for row, track in enumerate(tracks, start=start):
+            self._tracks.append(track)
+            self._rows.setdefault(track.key, row)
+        self._index = None
+        self.endInsertRows()
+
+    def set_view(self, query: str, column: str = SORT_ADDED, descending: bool = False) -> None:
+        """Задает фильтр и сортировку."""
+        if (query, (column, descending)) == (self._query, self._sort):
+            return
+        self.beginResetModel()
+        self._query = query
+        self._sort = (column, descending)
+        self._apply_view()
+        self.endResetModel()
+
+    def column_index(self) -> TrackColumnIndex:
+        """Колоночный индекс текущего списка (строится при первом обращении)."""
+        if self._index is None:
+            self._index = TrackColumnIndex(self._tracks)
+            self._index.set_listens(self._listens)
+        return self._index
+
+    def move_to_front(self, head: Sequence[Track]) -> None:
+        """Ставит ``head`` в начало списка, убирая эти треки из остальной части."""
+        keys = {track.key for track in head}
+        rest = [track for track in self._tracks if track.key not in keys]
+        self.set_tracks(list(head) + rest)
+
+    def track_at(self, row: int) -> Track | None:
+        if not 0 <= row < self.rowCount():
+            return None
+        return self._tracks[row if self._view is None else self._view[row]]
+
+    def row_of(self, track: Track) -> int | None:
+        """Строка трека за O(1) или ``None`` (нет в списке или скрыт фильтром)."""
+        return self._row_of_key(track.key)
+
+    def set_playing(self, track: Track | None) -> None:
+        """Отмечает играющий трек: перерисовываются только две строки."""
+        key = None if track is None else track.key
+        if key == self._playing_key:
+            return
+        previous, self._playing_key = self._playing_key, key
+        for changed in (previous, key):
+            row = None if changed is None else self._row_of_key(changed)
+            if row is not None:
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [PlayingRole])
+
+    # --- обложки ---
+
+    def has_cover(self, key: str) -> bool:
+        return key in self._covers
+
+    def set_cover(self, key: str, pixmap: QPixmap) -> None:
+        """Кладет обложку в кэш и перерисовывает строку трека."""
+        self._covers[key] = pixmap
+        self._covers.move_to_end(key)
+        while len(self._covers) > _COVER_CACHE_SIZE:
+            self._covers.popitem(last=False)
+        row = self._row_of_key(key)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [CoverRole])
+
+    # --- длительности ---
+
+    def set_durations(self, durations: dict[str, int]) -> None:
+        """Запоминает длительности и перерисовывает список."""
+        if not durations:
+            return
+        self._durations.update(durations)
+        count = self.rowCount()
+        if count:
+            self.dataChanged.emit(self.index(0), self.index(count - 1), [DurationRole])
+
+    def set_listens(self, listens: dict[str, int]) -> None:
+        """Запоминает прослушивания из истории; сортировка по ним пересчитывается."""
+        if not listens:
+            return
+        self._listens.update(listens)
+        if self._index is None:
+            return
+        self._index.set_listens(listens)
+        if self._sort[0] == SORT_LISTENS:
+            self.beginResetModel()
+            self._apply_view()
+            self.endResetModel()
+
+    def _row_of_key(self, key: str) -> int | None:
+        source = self._rows.get(key)
+        if source is None or self._positions is None:
+            return source
+        row = self._positions[source]
+        return None if row < 0 else row
+
+    def _reindex(self) -> None:
+        rows: dict[str, int] = {}
+        for row, track in enumerate(self._tracks):
+            rows.setdefault(track.key, row)
+        self._rows = rows
+
+    def _apply_view(self) -> None:
+        """Пересчитывает показываемые строки (вызывается внутри reset модели)."""
+        view = None
+        if self._query.strip() or self._sort != (SORT_ADDED, False):
+            view = self.column_index().view(self._query, *self._sort)
+        self._view = view
+        if view is None:
+            self._positions = None
+            return
+        positions = [-1] * len(self._tracks)
+        for row, source in enumerate(view):
+            positions[source] = row
+        self._positions = positions
+
+
+class TrackDelegate(QStyledItemDelegate):
+    """Рисует строку трека так же, как ``TrackCard``."""
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._play_icon = QIcon(asset_path("assets/icons/play.png"))
+        self._download_icon = QIcon(asset_path("assets/icons/download.png"))
+
+    def sizeHint(self, option, index: QModelIndex) -> QSize:
+        return QSize(option.rect.width(), _ROW_HEIGHT + _ROW_SPACING)
+
+    @staticmethod
+    def row_rect(rect: QRect) -> QRect:
+        """Прямоугольник карточки внутри строки (без отступа между строками)."""
+        return QRect(rect.x(), rect.y(), rect.width(), _ROW_HEIGHT)
+
+    @classmethod
+    def download_rect(cls, rect: QRect) -> QRect:
+        """Кнопка скачивания (видна при наведении)."""
+        row = cls.row_rect(rect)
+        return QRect(
+            row.right() - 10 - _DL_SIZE + 1,
+            row.y() + (_ROW_HEIGHT - _DL_SIZE) // 2,
+            _DL_SIZE,
+            _DL_SIZE,
+        )
+
+    def paint(self, painter: QPainter, option, index: QModelIndex) -> None:
+        track: Track | None = index.data(TrackRole)
+        if track is None:
+            return
+        playing = bool(index.data(PlayingRole))
+        hovered = bool(option.state & QStyle.State_MouseOver)
+        cover: QPixmap | None = index.data(CoverRole)
+        duration_ms: int = index.data(DurationRole) or 0
+        row = self.row_rect(option.rect)
+
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+
+        # фон карточки
+        if playing:
+            painter.setBrush(QColor(0, 220, 255, 35))
+        elif hovered:
+            painter.setBrush(QColor(0, 220, 255, 20))
+        else:
+            painter.setBrush(QColor(255, 255, 255, 6))
+        painter.setPen(Qt.NoPen)
+        painter.drawRoundedRect(QRectF(row), _ROW_RADIUS, _ROW_RADIUS)
+
+        # номер
+        num_rect = QRect(row.x() + 10, row.y(), 22, _ROW_HEIGHT)
+        font = QFont(option.font)
+        font.setPixelSize(13)
+        if playing:
+            font.setWeight(QFont.Bold)
+            painter.setFont(font)
+            painter.setPen(QColor(0, 220, 255))
+            painter.drawText(num_rect, Qt.AlignCenter, "▶")
+        else:
+            painter.setFont(font)
+            painter.setPen(QColor(255, 255, 255, 80))
+            painter.drawText(num_rect, Qt.AlignCenter, str(index.row() + 1))
+
+        # обложка
+        cover_rect = QRect(num_rect.right() + 13, row.y() + (_ROW_HEIGHT - _COVER_SIZE) // 2, _COVER_SIZE, _COVER_SIZE)
+        clip = QPainterPath()
+        clip.addRoundedRect(QRectF(cover_rect), _COVER_SIZE // 4, _COVER_SIZE // 4)
+        painter.save()
+        painter.setClipPath(clip)
+        painter.fillRect(cover_rect, QColor("#1a1a1a"))
+        if cover is not None and not cover.isNull():
+            painter.drawPixmap(cover_rect, cover)
+        if hovered:
+            painter.fillRect(cover_rect, QColor(0, 0, 0, 140))
+            self._play_icon.paint(painter, cover_rect.adjusted(13, 13, -13, -13))
+        painter.restore()
+
+        # кнопка скачивания и бейдж источника — справа налево
+        dl_rect = self.download_rect(option.rect)
+        if hovered:
+            painter.setBrush(QColor(255, 255, 255, 15))
+            painter.drawRoundedRect(QRectF(dl_rect), _DL_SIZE / 2, _DL_SIZE / 2)
+            self._download_icon.paint(painter, dl_rect.adjusted(6, 6, -6, -6))
+
+        font = QFont(option.font)
+        font.setPixelSize(11)
+        font.setWeight(QFont.DemiBold)
+        badge_width = QFontMetrics(font).horizontalAdvance(track.source) + 16
+        badge_rect = QRect(dl_rect.left() - 12 - badge_width, row.y() + (_ROW_HEIGHT - 22) // 2, badge_width, 22)
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(SOURCE_COLORS.get(track.source, DEFAULT_SOURCE_COLOR))
+        painter.drawRoundedRect(QRectF(badge_rect), 6, 6)
+        painter.setFont(font)
+        painter.setPen(QColor(255, 255, 255))
+        painter.drawText(badge_rect, Qt.AlignCenter, track.source)
+
+        # длительность
+        text_right = badge_rect.left() - 12
+        if duration_ms > 0:
+            font = QFont(option.font)
+            font.setPixelSize(12)
+            duration = format_duration(duration_ms)
+            duration_width = QFontMetrics(font).horizontalAdvance(duration)
+            duration_rect = QRect(text_right - duration_width, row.y(), duration_width, _ROW_HEIGHT)
+            painter.setFont(font)
+            painter.setPen(QColor(255, 255, 255, 120))
+            painter.drawText(duration_rect, Qt.AlignRight | Qt.AlignVCenter, duration)
+            text_right = duration_rect.left() - 12
+
+        # название и автор
+        text_left = cover_rect.right() + 13
+        text_width = max(0, text_right - text_left)
+        font = QFont(option.font)
+        font.setPixelSize(14)
+        font.setWeight(QFont.DemiBold)
+        painter.setFont(font)
+        painter.setPen(QColor(255, 255, 255))
+        title = QFontMetrics(font).elidedText(track.title, Qt.ElideRight, text_width)
+        painter.drawText(QRect(text_left, row.y() + 10, text_width, 20), Qt.AlignLeft | Qt.AlignVCenter, title)
+
+        font = QFont(option.font)
+        font.setPixelSize(12)
+        painter.setFont(font)
+        painter.setPen(QColor(255, 255, 255, 120))
+        meta = QFontMetrics(font).elidedText(build_meta_line(track), Qt.ElideRight, text_width)
+        painter.drawText(QRect(text_left, row.y() + 31, text_width, 18), Qt.AlignLeft | Qt.AlignVCenter, meta)
+
+        painter.restore()
+
+
+class TrackListView(QListView):
+    """Список треков: клики, контекстное меню и загрузка видимых обложек."""
+
+    play_requested = Signal(object)
+    download_requested = Signal(object)
+    add_to_playlist_requested = Signal(object)
+    remove_from_playlist_requested = Signal(object)
+
+    def __init__(self, parent=None) -> None:
+        super().__init__(parent)
+        self._model = TrackListModel(self)
+        self.setModel(self._model)
+        self.setItemDelegate(TrackDelegate(self))
+        self._covers = CoverStore()
+        self._allow_remove = False
+
+        self.setUniformItemSizes(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.setFrameShape(QListView.NoFrame)
+        self.setMouseTracking(True)
+        self.viewport().setAttribute(Qt.WA_Hover, True)
+        self.viewport().setCursor(Qt.PointingHandCursor)
+
+        # Очередь скачивания обложек: последние запрошенные (видимые сейчас) — первыми.
+        self._queue: list[QPersistentModelIndex] = []
+        self._queued: set[str] = set()
+        self._missing: set[str] = set()
+        self._workers: list[asyncio.Task] = []
+        self._metadata = TrackMetadataService()
+        self._history = TrackHistoryService()
+        # Номер списка: сведения для устаревшего списка не применяются.
+        self._generation = 0
+
+        self._cover_timer = QTimer(self)
+        self._cover_timer.setSingleShot(True)
+        self._cover_timer.setInterval(0)
+        self._cover_timer.timeout.connect(self._request_covers)
+        self.verticalScrollBar().valueChanged.connect(self._schedule_covers)
+        self._model.modelReset.connect(self._schedule_covers)
+        self._model.rowsInserted.connect(self._schedule_covers)
+
+    @property
+    def tracks(self) -> list[Track]:
+        return self._model.tracks
+
+    def set_tracks(self, tracks: Sequence[Track], allow_remove: bool = False) -> None:
+        """Показывает новый список; недокачанные обложки прошлого списка отменяются."""
+        self.cancel_covers()
+        self._allow_remove = allow_remove
+        self._model.set_tracks(tracks)
+        self._generation += 1
+        self._request_track_info(tracks)
+
+    def append_tracks(self, tracks: Sequence[Track]) -> None:
+        self._model.append_tracks(tracks)
+        self._request_track_info(tracks)
+
+    def set_view(self, query: str, column: str = SORT_ADDED, descending: bool = False) -> None:
+        """Фильтр по названию и исполнителю и сортировка списка."""
+        self._model.set_view(query, column, descending)
+
+    def warm_up_filter(self) -> None:
+        """Строит триграммный индекс в фоне, пока фильтр работает перебором."""
+        index = self._model.column_index()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.run_in_executor(None, index.build_trigrams)
+
+    def move_to_front(self, head: Sequence[Track]) -> None:
+        self._model.move_to_front(head)
+
+    def set_playing(self, track: Track | None) -> None:
+        self._model.set_playing(track)
+
+    def cancel_covers(self) -> None:
+        """Отменяет скачивание обложек."""
+        for task in self._workers:
+            task.cancel()
+        self._workers.clear()
+        self._queue.clear()
+        self._queued.clear()
+        self._missing.clear()
+
+    # --- длительности и прослушивания ---
+
+    def _request_track_info(self, tracks: Sequence[Track]) -> None:
+        if not tracks:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        keys = [track.key for track in tracks]
+        loop.create_task(self._load_track_info(keys, self._generation))
+
+    async def _load_track_info(self, keys: list[str], generation: int) -> None:
+        durations = await self._metadata.durations(keys)
+        if generation == self._generation:
+            self._model.set_durations(durations)
+        try:
+            listens = await self._history.get_listen_counts(keys)
+        except Exception:
+            logger.exception("Не удалось прочитать число прослушиваний треков")
+            return
+        if generation == self._generation:
+            self._model.set_listens(listens)
+
+    # --- обложки ---
+
+    def _schedule_covers(self, *_args) -> None:
+        """Собирает серию прокруток и изменений модели в один запрос обложек."""
+        self._cover_timer.start()
+
+    def _visible_rows(self) -> tuple[int, int]:
+        """Первая и последняя строки видимой области (с запасом ``_PREFETCH_ROWS``)."""
+        count = self._model.rowCount()
+        if not count:
+            return 0, -1
+        first = self.indexAt(self.viewport().rect().topLeft())
+        last = self.indexAt(self.viewport().rect().bottomLeft())
+        first_row = first.row() if first.isValid() else 0
+        last_row = last.row() if last.isValid() else count - 1
+        return max(0, first_row - _PREFETCH_ROWS), min(count - 1, last_row + _PREFETCH_ROWS)
+
+    def _request_covers(self) -> None:
+        """Обложки видимых строк: с диска сразу, отсутствующие — в очередь скачивания."""
+        first, last = self._visible_rows()
+        for row in range(first, last + 1):
+            track = self._model.track_at(row)
+            key = track.key
+            if self._model.has_cover(key) or key in self._queued or key in self._missing:
+                continue
+            image = self._covers.image(track)
+            if image is not None:
+                self._model.set_cover(key, _scaled(QPixmap.fromImage(image)))
+                continue
+            self._queue.append(QPersistentModelIndex(self._model.index(row)))
+            self._queued.add(key)
+        self._spawn_workers()
+
+    def _spawn_workers(self) -> None:
+        self._workers = [task for task in self._workers if not task.done()]
+        missing = min(_MAX_DOWNLOADS, len(self._queue)) - len(self._workers)
+        if missing <= 0:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        for _ in range(missing):
+            self._workers.append(loop.create_task(self._download_worker()))
+
+    async def _download_worker(self) -> None:
+        while self._queue:
+            index = self._queue.pop()
+            track = self._model.track_at(index.row()) if index.isValid() else None
+            if track is None:
+                continue
+            key = track.key
+            self._queued.discard(key)
+            first, last = self._visible_rows()
+            if not first <= index.row() <= last:
+                # Строку уже прокрутили — запросится снова, когда станет видна.
+                continue
+            try:
+                image = await self._covers.load(track)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Не удалось загрузить обложку трека: %s", track)
+                image = None
+            if image is None:
+                self._missing.add(key)
+            else:
+                self._model.set_cover(key, _scaled(QPixmap.fromImage(image)))
+
+    # --- события ---
+
+    def resizeEvent(self, event) -> None:
+        super().resizeEvent(event)
+        self._schedule_covers()
+
+    def mousePressEvent(self, event) -> None:
+        index = self.indexAt(event.position().toPoint())
+        track = self._model.track_at(index.row()) if index.isValid() else None
+        if track is None:
+            super().mousePressEvent(event)
+            return
+        if event.button() == Qt.LeftButton:
+            if TrackDelegate.download_rect(self.visualRect(index)).contains(event.position().toPoint()):
+                self.download_requested.emit(track)
+            else:
+                self.play_requested.emit(track)
+        elif event.button() == Qt.RightButton:
+            self._show_context_menu(track, event.globalPosition().toPoint())
+        event.accept()
+
+    def _show_context_menu(self, track: Track, global_pos) -> None:
+        """Открывает контекстное меню действий с треком."""
+        menu = QMenu(self)
+        play_action = menu.addAction("Играть")
+        add_action = menu.addAction("Добавить в плейлист")
+        remove_action = None
+        if self._allow_remove:
+            remove_action = menu.addAction("Удалить из плейлиста")
+        download_action = menu.addAction("Скачать")
+
+        chosen = menu.exec(global_pos)
+        if chosen == play_action:
+            self.play_requested.emit(track)
+        elif chosen == add_action:
+            self.add_to_playlist_requested.emit(track)
+        elif remove_action is not None and chosen == remove_action:
+            self.remove_from_playlist_requested.emit(track)
+        elif chosen == download_action:
+            self.download_requested.emit(track)
+
+
+def format_duration(duration_ms: int) -> str:
+    """Длительность в виде ``м:сс`` (``ч:мм:сс`` для часа и дольше)."""
+    minutes, seconds = divmod(duration_ms // 1000, 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
+
+
+def _scaled(pixmap: QPixmap) -> QPixmap:
+    """Квадрат ``_COVER_SIZE`` из центра обложки."""
+    pixmap = pixmap.scaled(_COVER_SIZE, _COVER_SIZE, Qt.KeepAspectRatioByExpanding, Qt.SmoothTransformation)
+    return pixmap.copy(
+        (pixmap.width() - _COVER_SIZE) // 2,
+        (pixmap.height() - _COVER_SIZE) // 2,
+        _COVER_SIZE,
+        _COVER_SIZE,
+    )
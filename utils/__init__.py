@@ -1,25 +1,17 @@
 from .get_ru_words import get_ru_words_for_number
 from .resource_path import asset_path
 from .playlist_helper import (
-    add_track_to_user_playlist,
-    create_user_playlist_file,
-    delete_user_playlist_file,
-    get_user_playlist_path_by_name,
-    list_user_playlist_names,
-    remove_track_from_user_playlist,
-    rename_user_playlist_file,
-    touch_user_playlist_file,
+    normalize_playlist_name,
+    playlist_file_stem,
+    read_playlist_json,
+    write_playlist_json,
 )
 
 __all__ = [
     "asset_path",
     "get_ru_words_for_number",
-    "create_user_playlist_file",
-    "rename_user_playlist_file",
-    "delete_user_playlist_file",
-    "list_user_playlist_names",
-    "add_track_to_user_playlist",
-    "remove_track_from_user_playlist",
-    "touch_user_playlist_file",
-    "get_user_playlist_path_by_name",
-]
\ No newline at end of file
+    "normalize_playlist_name",
+    "playlist_file_stem",
+    "read_playlist_json",
+    "write_playlist_json",
+]
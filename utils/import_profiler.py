@@ -0,0 +1,161 @@
+"""Профилировщик времени импорта модулей.
+
+Включается переменной окружения ``CLEANPLAYER_IMPORT_PROFILE``:
+
+- ``1`` — отчет печатается в stderr;
+- путь к файлу — отчет пишется в файл (``*.json`` — в формате JSON).
+
+Для каждого модуля считается накопленное время (вместе с вложенными
+импортами) и собственное время (без них). Замер ведется через обертку
+над loader'ом в ``sys.meta_path``, поэтому учитываются и ``import``, и
+``importlib.import_module``, в том числе из фоновых потоков.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from importlib.abc import MetaPathFinder
+from time import perf_counter
+from typing import Any, Iterator
+
+ENV_VAR = "CLEANPLAYER_IMPORT_PROFILE"
+_REPORT_TOP = 40
+
+
+class ImportProfiler(MetaPathFinder):
+    """Meta path finder, замеряющий загрузку каждого модуля."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # name -> [накопленное время, собственное время] в секундах
+        self._records: dict[str, list[float]] = {}
+        self._reported = False
+
+    # --- MetaPathFinder ---
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, self)
+        return spec
+
+    # --- замеры ---
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """Замеряет блок как часть загрузки модуля ``name``."""
+        stack = self._stack()
+        frame = [perf_counter(), 0.0]  # начало, время вложенных импортов
+        stack.append(frame)
+        try:
+            yield
+        finally:
+            stack.pop()
+            elapsed = perf_counter() - frame[0]
+            if stack:
+                stack[-1][1] += elapsed
+            with self._lock:
+                record = self._records.setdefault(name, [0.0, 0.0])
+                record[0] += elapsed
+                record[1] += elapsed - frame[1]
+
+    def records(self) -> list[tuple[str, float, float]]:
+        """Возвращает ``(модуль, накопленное мс, собственное мс)`` по убыванию."""
+        with self._lock:
+            rows = [(name, cum * 1000, own * 1000) for name, (cum, own) in self._records.items()]
+        rows.sort(key=lambda row: row[1], reverse=True)
+        return rows
+
+    # --- отчет ---
+
+    def report(self, destination: str | None = None) -> None:
+        """Выводит отчет один раз: в stderr, текстовый файл или JSON."""
+        if self._reported:
+            return
+        self._reported = True
+        destination = destination or os.environ.get(ENV_VAR, "1")
+        rows = self.records()
+        if destination.endswith(".json"):
+            payload: dict[str, Any] = {
+                "modules": [
+                    {"module": name, "cumulative_ms": round(cum, 3), "self_ms": round(own, 3)}
+                    for name, cum, own in rows
+                ],
+            }
+            with open(destination, "w", encoding="utf-8") as file:
+                json.dump(payload, file, ensure_ascii=False, indent=2)
+            return
+
+        lines = [f"Время импорта: топ {min(_REPORT_TOP, len(rows))} из {len(rows)} модулей, мс"]
+        lines.append(f"{'накопл.':>10} {'собств.':>10}  модуль")
+        for name, cum, own in rows[:_REPORT_TOP]:
+            lines.append(f"{cum:10.1f} {own:10.1f}  {name}")
+        text = "\n".join(lines) + "\n"
+        if destination in ("1", "stderr"):
+            sys.stderr.write(text)
+        else:
+            with open(destination, "w", encoding="utf-8") as file:
+                file.write(text)
+
+    def _stack(self) -> list[list[float]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+
+class _TimedLoader:
+    """Прокси loader'а: замеряет create_module/exec_module, остальное делегирует."""
+
+    def __init__(self, loader, profiler: ImportProfiler) -> None:
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, item: str):
+        return getattr(self._loader, item)
+
+    def create_module(self, spec):
+        # У C-расширений основная инициализация происходит именно здесь.
+        with self._profiler.measure(spec.name):
+            return self._loader.create_module(spec)
+
+    def exec_module(self, module) -> None:
+        with self._profiler.measure(module.__name__):
+            self._loader.exec_module(module)
+
+
+_profiler: ImportProfiler | None = None
+
+
+def install_import_profiler() -> ImportProfiler | None:
+    """Подключает профилировщик, если задана переменная ``CLEANPLAYER_IMPORT_PROFILE``.
+
+    Вызывать нужно как можно раньше — до импорта тяжелых модулей.
+    Отчет выводится при :func:`report_import_times` или при выходе.
+    """
+    global _profiler
+    if _profiler is not None or not os.environ.get(ENV_VAR):
+        return _profiler
+    _profiler = ImportProfiler()
+    sys.meta_path.insert(0, _profiler)
+    atexit.register(_profiler.report)
+    return _profiler
+
+
+def report_import_times() -> None:
+    """Выводит отчет, если профилировщик включен."""
+    if _profiler is not None:
+        _profiler.report()
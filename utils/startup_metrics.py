@@ -0,0 +1,51 @@
+"""Метки времени запуска приложения.
+
+``main.py`` и UI отмечают ключевые этапы старта (импорты, QApplication,
+стили, окно, первая отрисовка, заполненная главная). Метки дешевые и
+пишутся всегда; читают их бенчмарк ``benchmarks/startup.py`` и отладка.
+
+Время хранится в миллисекундах от импорта этого модуля, который
+выполняется в самом начале ``main.py``.
+"""
+
+from __future__ import annotations
+
+from time import perf_counter, time
+from typing import Callable
+
+IMPORTS_DONE = "imports_done"
+QAPPLICATION_READY = "qapplication_ready"
+STYLESHEET_APPLIED = "stylesheet_applied"
+WINDOW_CONSTRUCTED = "window_constructed"
+FIRST_PAINT = "first_paint"
+HOME_POPULATED = "home_populated"
+
+_origin = perf_counter()
+_origin_wall = time()
+_milestones: dict[str, float] = {}
+_listeners: list[Callable[[str, float], None]] = []
+
+
+def mark(name: str) -> None:
+    """Отмечает этап старта. Повторные отметки того же этапа игнорируются."""
+    if name in _milestones:
+        return
+    elapsed_ms = (perf_counter() - _origin) * 1000
+    _milestones[name] = elapsed_ms
+    for listener in list(_listeners):
+        listener(name, elapsed_ms)
+
+
+def milestones() -> dict[str, float]:
+    """Возвращает отмеченные этапы: имя -> мс от начала старта."""
+    return dict(_milestones)
+
+
+def origin_wall_time() -> float:
+    """Unix-время начала отсчета (для сопоставления с внешними замерами)."""
+    return _origin_wall
+
+
+def add_listener(listener: Callable[[str, float], None]) -> None:
+    """Подписывает ``listener(name, elapsed_ms)`` на новые отметки."""
+    _listeners.append(listener)
@@ -0,0 +1,134 @@
+"""Индекс подсказок строки поиска: отсортированный массив и бинарный поиск.
+
+Каждая подсказка (название трека, исполнитель, прошлый запрос) попадает
+в массив ``(фрагмент, ключ)`` по разу на каждое слово: фрагмент — текст
+подсказки в ``casefold``, начиная с этого слова. Поэтому ввод "beat"
+находит и "Beatles", и "The Beatles". Все фрагменты с префиксом лежат
+в массиве подряд — их границы дают два ``bisect``.
+
+Вес подсказки — сумма прослушиваний (и поисков) всего, что ей
+соответствует; он хранится отдельно от массива, так что рост счетчиков
+массив не трогает. Новая подсказка вставляется ``bisect.insort`` —
+массив не перестраивается.
+
+Префиксы до трех букв совпадают с большой частью массива, поэтому для
+них лучшие подсказки хранятся готовыми (как в верхних узлах префиксного
+дерева) и обновляются при :meth:`SuggestionIndex.add`. Веса только
+растут, так что подсказка может лишь подняться в таком списке или войти
+в него. Для более длинных префиксов диапазон уже мал и ранжируется
+целиком.
+"""
+
+from __future__ import annotations
+
+import bisect
+import heapq
+from typing import Iterable
+
+# Длина префиксов с готовыми списками лучших подсказок.
+_SHALLOW = 3
+# Длина готовых списков (с запасом на подсказку, равную введенному тексту).
+_TOP = 16
+# Верхняя граница диапазона фрагментов с префиксом.
+_MAX_CHAR = "\U0010ffff"
+
+
+def normalize(text: str) -> str:
+    """Ключ подсказки: ``casefold`` и одиночные пробелы."""
+    return " ".join(str(text).casefold().split())
+
+
+class SuggestionIndex:
+    """Подсказки по префиксу, лучшие по весу — первыми."""
+
+    def __init__(self) -> None:
+        self._fragments: list[tuple[str, str]] = []
+        self._texts: dict[str, str] = {}
+        self._weights: dict[str, int] = {}
+        self._top: dict[str, list[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, text: str) -> bool:
+        return normalize(text) in self._texts
+
+    def build(self, items: Iterable[tuple[str, int]]) -> None:
+        """Заполняет индекс целиком: ``(текст, вес)``, повторы складываются.
+
+        Можно вызывать из рабочего потока, пока индекс еще не используется.
+        """
+        texts: dict[str, str] = {}
+        weights: dict[str, int] = {}
+        for text, weight in items:
+            key = normalize(text)
+            if not key:
+                continue
+            if key not in texts:
+                texts[key] = " ".join(str(text).split())
+                weights[key] = 0
+            weights[key] += weight
+        self._fragments = sorted(fragment for key in texts for fragment in _fragments(key))
+        self._texts = texts
+        self._weights = weights
+
+        shallow: dict[str, set[str]] = {}
+        for fragment, key in self._fragments:
+            for prefix in _shallow_prefixes(fragment):
+                shallow.setdefault(prefix, set()).add(key)
+        self._top = {prefix: heapq.nsmallest(_TOP, keys, key=self._rank) for prefix, keys in shallow.items()}
+
+    def add(self, text: str, weight: int = 0) -> None:
+        """Добавляет подсказку или прибавляет ``weight`` (не меньше 0) к ее весу."""
+        key = normalize(text)
+        if not key:
+            return
+        fragments = _fragments(key)
+        if key in self._texts:
+            self._weights[key] += weight
+        else:
+            self._texts[key] = " ".join(str(text).split())
+            self._weights[key] = weight
+            for fragment in fragments:
+                bisect.insort(self._fragments, fragment)
+        for prefix in {prefix for fragment, _ in fragments for prefix in _shallow_prefixes(fragment)}:
+            top = self._top.setdefault(prefix, [])
+            if key not in top:
+                top.append(key)
+            top.sort(key=self._rank)
+            del top[_TOP:]
+
+    def suggest(self, prefix: str, limit: int = 8) -> list[str]:
+        """Подсказки для введенного текста (без него самого)."""
+        prefix = normalize(prefix)
+        if not prefix:
+            return []
+        if len(prefix) <= _SHALLOW:
+            best = [key for key in self._top.get(prefix, ()) if key != prefix][:limit]
+        else:
+            fragments = self._fragments
+            low = bisect.bisect_left(fragments, (prefix,))
+            high = bisect.bisect_left(fragments, (prefix + _MAX_CHAR,), low)
+            keys = {fragments[i][1] for i in range(low, high)}
+            keys.discard(prefix)
+            best = heapq.nsmallest(limit, keys, key=self._rank)
+        return [self._texts[key] for key in best]
+
+    def _rank(self, key: str) -> tuple[int, int, str]:
+        # При равном весе короче — выше: она ближе к введенному.
+        return -self._weights[key], len(key), key
+
+
+def _fragments(key: str) -> list[tuple[str, str]]:
+    """Фрагменты ключа: с начала и с каждого следующего слова."""
+    fragments = [(key, key)]
+    start = key.find(" ")
+    while start != -1:
+        fragments.append((key[start + 1:], key))
+        start = key.find(" ", start + 1)
+    return fragments
+
+
+def _shallow_prefixes(fragment: str) -> list[str]:
+    """Короткие префиксы фрагмента, для которых хранятся готовые списки."""
+    return [fragment[:length] for length in range(1, min(_SHALLOW, len(fragment)) + 1)]